@@ -0,0 +1,105 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the compressed posting list implementations with respect to size and decoding speed,
+on synthetic posting lists of varying density. Run from the repository root:
+
+    python -m benchmarks.postinglists
+
+For each codec we report the memory used per posting, the throughput of raw block decoding
+into arrays, and the throughput of a full traversal through the posting list iterator.
+"""
+
+import random
+import time
+import tracemalloc
+from in3120 import Posting, CompressedInMemoryPostingList, BlockCompressedPostingList
+from in3120 import VariableByteCodec, FrameOfReferenceCodec
+
+
+BLOCK_SIZE = 128
+
+
+def synthesize(length, density, rng):
+    """
+    Produces a sorted synthetic posting list with roughly the given fraction of documents present,
+    and with Zipf-like term frequencies.
+    """
+    postings = []
+    document_id = 0
+    for _ in range(length):
+        document_id += 1 + int(rng.expovariate(density) if density < 1.0 else 0)
+        postings.append((document_id, min(1000, int(rng.paretovariate(1.5)))))
+    return postings
+
+
+def build(create_posting_list, postings):
+    """
+    Builds a posting list from the given (document identifier, term frequency) pairs, and returns
+    the list together with the number of bytes it occupies.
+    """
+    tracemalloc.start()
+    posting_list = create_posting_list()
+    for (document_id, term_frequency) in postings:
+        posting_list.append_posting(Posting(document_id, term_frequency))
+    posting_list.finalize_postings()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (posting_list, size)
+
+
+def encode_vb(document_ids, term_frequencies, document_id, destination):
+    """
+    Encodes a block of postings the way CompressedInMemoryPostingList does.
+    """
+    gaps = [b - a for (a, b) in zip([document_id, *document_ids], document_ids)]
+    VariableByteCodec.encode_many((n for pair in zip(gaps, term_frequencies) for n in pair), destination)
+
+
+def decode_throughput(encode, decode, postings):
+    """
+    Encodes the given postings block by block, and returns the number of postings per second
+    we can decode the blocks into arrays at.
+    """
+    buffer = bytearray()
+    offsets = []
+    previous = 0
+    for i in range(0, len(postings), BLOCK_SIZE):
+        block = postings[i : i + BLOCK_SIZE]
+        offsets.append((len(buffer), len(block), previous))
+        encode([d for (d, _) in block], [f for (_, f) in block], previous, buffer)
+        previous = block[-1][0]
+    start = time.perf_counter()
+    for (offset, count, document_id) in offsets:
+        decode(buffer, offset, count, document_id)
+    return len(postings) / (time.perf_counter() - start)
+
+
+def traversal_throughput(posting_list):
+    """
+    Returns the number of postings per second we can iterate over the given posting list at.
+    """
+    start = time.perf_counter()
+    count = sum(1 for _ in posting_list)
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    rng = random.Random(42)
+    codecs = {
+        "vb": (CompressedInMemoryPostingList, encode_vb, VariableByteCodec.decode_postings),
+        "block": (BlockCompressedPostingList, FrameOfReferenceCodec.encode_postings, FrameOfReferenceCodec.decode_postings),
+    }
+    print(f"{'density':>8} {'codec':>6} {'bytes/posting':>14} {'decode M/s':>11} {'traverse M/s':>13}")
+    for density in (1.0, 0.5, 0.1, 0.01, 0.001):
+        postings = synthesize(200000, density, rng)
+        for (name, (create_posting_list, encode, decode)) in codecs.items():
+            (posting_list, size) = build(create_posting_list, postings)
+            decode_rate = decode_throughput(encode, decode, postings)
+            traverse_rate = traversal_throughput(posting_list)
+            print(f"{density:>8} {name:>6} {size / len(postings):>14.2f} {decode_rate / 1e6:>11.2f} {traverse_rate / 1e6:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
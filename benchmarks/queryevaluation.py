@@ -0,0 +1,79 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+"""
+Compares the query evaluation strategies of SimpleSearchEngine, i.e., document-at-a-time with and
+without dynamic pruning and term-at-a-time, on a synthetic corpus with a Zipf-like vocabulary. Run
+from the repository root, with NumPy installed:
+
+    python -m benchmarks.queryevaluation
+
+For each kind of query and each strategy we report the average query latency. Short queries over
+frequent terms are where term-at-a-time evaluation should shine, while long queries over rarer terms
+favor document-at-a-time evaluation with pruning.
+"""
+
+import random
+import time
+from in3120 import InMemoryCorpus, InMemoryDocument, InMemoryInvertedIndex, SimpleSearchEngine
+from in3120 import BrainDeadNormalizer, BrainDeadTokenizer, BetterRanker
+
+
+DOCUMENTS = 100000
+VOCABULARY = 5000
+REPETITIONS = 5
+
+
+def synthesize(rng):
+    """
+    Produces a synthetic corpus, where word i occurs with a probability proportional to 1 / (i + 1).
+    """
+    words = [f"w{i}" for i in range(VOCABULARY)]
+    weights = [1.0 / (i + 1) for i in range(VOCABULARY)]
+    corpus = InMemoryCorpus()
+    for document_id in range(DOCUMENTS):
+        body = " ".join(rng.choices(words, weights, k=rng.randint(10, 100)))
+        corpus.add_document(InMemoryDocument(document_id, {"body": body, "static_quality_score": rng.random()}))
+    return corpus
+
+
+def latency(engine, ranker, queries, options):
+    """
+    Returns the average number of milliseconds it takes to evaluate one of the given queries.
+    """
+    start = time.perf_counter()
+    for _ in range(REPETITIONS):
+        for query in queries:
+            for _ in engine.evaluate(query, options, ranker):
+                pass
+    return 1000 * (time.perf_counter() - start) / (REPETITIONS * len(queries))
+
+
+def main():
+    rng = random.Random(42)
+    corpus = synthesize(rng)
+    kinds = {
+        "short, frequent": [f"w{rng.randrange(10)} w{rng.randrange(10)}" for _ in range(10)],
+        "long, mixed": [" ".join(f"w{rng.randrange(1000)}" for _ in range(8)) for _ in range(10)],
+    }
+    strategies = {
+        "daat": {},
+        "daat+maxscore": {"pruning": "maxscore"},
+        "daat+bmw": {"pruning": "bmw"},
+        "taat": {"strategy": "taat"},
+    }
+    print(f"{'compressed':>10} {'queries':>16} {'threshold':>10} {'strategy':>14} {'ms/query':>9}")
+    for compressed in (False, "block"):
+        index = InMemoryInvertedIndex(corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer(), compressed=compressed)
+        engine = SimpleSearchEngine(corpus, index)
+        ranker = BetterRanker(corpus, index)
+        for (kind, queries) in kinds.items():
+            for threshold in (0.0, 1.0):
+                for (strategy, options) in strategies.items():
+                    options = {"match_threshold": threshold, "hit_count": 10, **options}
+                    milliseconds = latency(engine, ranker, queries, options)
+                    print(f"{str(compressed):>10} {kind:>16} {threshold:>10} {strategy:>14} {milliseconds:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,33 @@
-from .normalizer import BrainDeadNormalizer
-from .tokenizer import BrainDeadTokenizer
-from .shinglegenerator import ShingleGenerator
-from .sieve import Sieve
-from .document import Document, InMemoryDocument
-from .corpus import Corpus, InMemoryCorpus
-from .dictionary import Dictionary, InMemoryDictionary
-from .posting import Posting
-from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList
-from .invertedindex import InvertedIndex, InMemoryInvertedIndex
-from .stringfinder import Trie, StringFinder
-from .suffixarray import SuffixArray
-from .postingsmerger import PostingsMerger
-from .simplesearchengine import SimpleSearchEngine
-from .ranker import Ranker, BrainDeadRanker
-from .betterranker import BetterRanker
-from .naivebayesclassifier import NaiveBayesClassifier
-from .variablebytecodec import VariableByteCodec
-from .expressioncomposer import ExpressionComposer
-from .shallowcaseextractor import ShallowCaseExtractor
-from .documentpipeline import DocumentPipeline
+from .normalizer import BrainDeadNormalizer
+from .tokenizer import BrainDeadTokenizer
+from .shinglegenerator import ShingleGenerator
+from .querycache import QueryCache
+from .querytrace import QueryTrace
+from .sieve import Sieve
+from .document import Document, InMemoryDocument
+from .corpus import Corpus, InMemoryCorpus, SubsetCorpus
+from .dictionary import Dictionary, InMemoryDictionary
+from .frozendictionary import FrozenDictionary
+from .perfecthashdictionary import PerfectHashDictionary
+from .wildcardexpander import WildcardExpander
+from .termstatistics import TermStatistics, TermStatisticsTable
+from .posting import Posting, PositionalPosting
+from .postinglist import PostingList, InMemoryPostingList, CompressedInMemoryPostingList, BlockCompressedPostingList, PositionalPostingList, DiskPostingList
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex, DiskInvertedIndex
+from .spimiindexbuilder import SpimiIndexBuilder
+from .segmentedinvertedindex import SegmentedInvertedIndex
+from .tieredinvertedindex import TieredInvertedIndex
+from .stringfinder import Trie, StringFinder
+from .suffixarray import SuffixArray
+from .postingsmerger import PostingsMerger
+from .simplesearchengine import SimpleSearchEngine
+from .shardedsearchengine import ShardedSearchEngine
+from .booleansearchengine import BooleanSearchEngine
+from .ranker import Ranker, BrainDeadRanker
+from .betterranker import BetterRanker
+from .naivebayesclassifier import NaiveBayesClassifier
+from .variablebytecodec import VariableByteCodec
+from .frameofreferencecodec import FrameOfReferenceCodec
+from .expressioncomposer import ExpressionComposer
+from .shallowcaseextractor import ShallowCaseExtractor
+from .documentpipeline import DocumentPipeline
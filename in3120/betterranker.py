@@ -1,66 +1,94 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from .ranker import Ranker
-from .corpus import Corpus
-from .posting import Posting
-from .invertedindex import InvertedIndex
-import math
-
-class BetterRanker(Ranker):
-    """
-    A ranker that does traditional TF-IDF ranking, possibly combining it with
-    a static document score (if present).
-
-    The static document score is assumed accessible in a document field named
-    "static_quality_score". If the field is missing or doesn't have a value, a
-    default value of 0.0 is assumed for the static document score.
-
-    See Section 7.1.4 in https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
-
-    implement a better ranker than the BrainDeadRanker class. For example,
-    inverse document frequency (i.e., considering how frequent the query terms
-    are across the corpus) and static rank
-    (i.e., a query-independent quality score per document) are two factors
-    that you should include.
-    """
-
-    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
-        self._score = 0.0
-        self._document_id = None
-        self._corpus = corpus
-        self._inverted_index = inverted_index
-        self._dynamic_score_weight = 1.0  # TODO: Make this configurable.
-        self._static_score_weight = 1.0  # TODO: Make this configurable.
-        # TODO: Make this configurable.
-        self._static_score_field_name = "static_quality_score"
-
-    def reset(self, document_id: int) -> None:
-        self._score = 0.0
-        self._document_id = document_id
-
-
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
-        """
-        net_rank(q, d) = dynamic_score(q, d) + static_score(d)
-        static_score = g(d), for each document d that is query independent,
-        quality measure between 0 and 1
-
-        dynamic_score -> query dependent
-        """
-        assert self._document_id == posting.document_id
-
-        tf = posting.term_frequency
-
-        N = len(self._corpus)
-        df = self._inverted_index.get_document_frequency(term)
-
-        self._score += tf * (math.log(N/df))
-
-    def evaluate(self) -> float:
-
-        doc = self._corpus.get_document(self._document_id)
-        self._static_score_weight = doc.get_field("static_quality_score", 0.0)
-
-        self._score += self._static_score_weight
-        return self._score
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from .ranker import Ranker
+from .corpus import Corpus
+from .posting import Posting
+from .invertedindex import InvertedIndex
+import math
+
+class BetterRanker(Ranker):
+    """
+    A ranker that does traditional TF-IDF ranking, possibly combining it with
+    a static document score (if present).
+
+    The static document score is assumed accessible in a document field named
+    "static_quality_score". If the field is missing or doesn't have a value, a
+    default value of 0.0 is assumed for the static document score.
+
+    See Section 7.1.4 in https://nlp.stanford.edu/IR-book/pdf/irbookonlinereading.pdf.
+
+    implement a better ranker than the BrainDeadRanker class. For example,
+    inverse document frequency (i.e., considering how frequent the query terms
+    are across the corpus) and static rank
+    (i.e., a query-independent quality score per document) are two factors
+    that you should include.
+    """
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+        self._score = 0.0
+        self._document_id = None
+        self._corpus = corpus
+        self._inverted_index = inverted_index
+        self._dynamic_score_weight = 1.0  # TODO: Make this configurable.
+        self._static_score_weight = 1.0  # TODO: Make this configurable.
+        # TODO: Make this configurable.
+        self._static_score_field_name = "static_quality_score"
+        self._inverse_document_frequencies = {}  # Looked up on first use, per term.
+
+    def reset(self, document_id: int) -> None:
+        self._score = 0.0
+        self._document_id = document_id
+
+
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        """
+        net_rank(q, d) = dynamic_score(q, d) + static_score(d)
+        static_score = g(d), for each document d that is query independent,
+        quality measure between 0 and 1
+
+        dynamic_score -> query dependent
+        """
+        assert self._document_id == posting.document_id
+
+        tf = posting.term_frequency
+
+        self._score += tf * self.__get_inverse_document_frequency(term)
+
+    def evaluate(self) -> float:
+
+        doc = self._corpus.get_document(self._document_id)
+        self._static_score_weight = doc.get_field("static_quality_score", 0.0)
+
+        self._score += self._static_score_weight
+        return self._score
+
+    def upper_bound(self, term: str, multiplicity: int, term_frequency: int) -> float:
+        return term_frequency * self.__get_inverse_document_frequency(term)
+
+    def static_upper_bound(self) -> float:
+        # Kept by the corpus, so that we don't scan the corpus for every query.
+        return self._corpus.get_field_maximum(self._static_score_field_name, 0.0)
+
+    def term_weight(self, term: str, multiplicity: int) -> float:
+        return self.__get_inverse_document_frequency(term)
+
+    def static_score(self, document_id: int) -> float:
+        return self._corpus.get_document(document_id).get_field(self._static_score_field_name, 0.0)
+
+    def __get_inverse_document_frequency(self, term: str) -> float:
+        """
+        Returns the precomputed inverse document frequency for the given term, as kept in the
+        index's term statistics. Looked up once per term, not once per posting.
+        """
+        idf = self._inverse_document_frequencies.get(term)
+        if idf is None:
+            statistics = self._inverted_index.get_term_statistics(term)
+            if statistics is None:
+                # Terms that aren't in the dictionary, e.g., phrases, have no statistics.
+                # Assume they're as rare as they can be.
+                idf = math.log(len(self._corpus))
+            else:
+                idf = statistics.inverse_document_frequency
+            self._inverse_document_frequencies[term] = idf
+        return idf
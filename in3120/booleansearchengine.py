@@ -0,0 +1,279 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import re
+from abc import abstractmethod
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from .corpus import Corpus
+from .invertedindex import InvertedIndex
+from .posting import Posting
+from .postingsmerger import PostingsMerger
+
+
+class BooleanSearchEngine:
+    """
+    A search engine for boolean queries like "a AND (b OR c) AND NOT d". NOT binds tighter than AND, which binds
+    tighter than OR, and parentheses can be used for grouping. Operands without an operator in between are ANDed
+    together. A negated operand must be ANDed with at least one operand that isn't negated, since we can't list
+    the documents that don't contain something.
+
+    A query is compiled into a tree of operators over the posting lists of the query terms. Each operator is in
+    turn an iterator over the postings of the documents it matches, that supports skipping ahead via advance_to.
+    Skips thus propagate down the tree, and the tree is evaluated lazily as the matches are consumed. The operands
+    of a conjunction are ordered by how many documents they can match at most, so that the most selective operand
+    drives the evaluation and the others are skipped through. A conjunction thus costs roughly as much as its most
+    selective operand. See Section 1.3 in https://nlp.stanford.edu/IR-book/pdf/01bool.pdf.
+    """
+
+    class Operator(Iterator[Posting]):
+        """
+        A node in an operator tree. Yields a posting per matching document, in order of increasing document
+        identifiers.
+        """
+
+        def __init__(self, cost: int):
+            self.cost = cost  # An upper bound on the number of matching documents.
+
+        @abstractmethod
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips forward to the first remaining match having a document identifier that is at least as large as
+            the given one, and returns its posting. Returns None if there is no such match.
+            """
+            pass
+
+    class Term(Operator):
+        """
+        Matches the documents in a posting list.
+        """
+
+        def __init__(self, postings: Iterator[Posting], cost: int):
+            super().__init__(cost)
+            self.__postings = postings
+
+        def __next__(self) -> Posting:
+            return next(self.__postings)
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            return PostingsMerger.advance(self.__postings, document_id)
+
+    class Conjunction(Operator):
+        """
+        Matches the documents that all the operands match. The least costly operand proposes candidates, and the
+        other operands skip ahead to them. An operand that skips past a candidate proposes a new one.
+        """
+
+        def __init__(self, operands: List["BooleanSearchEngine.Operator"]):
+            operands = sorted(operands, key=lambda o: o.cost)
+            super().__init__(operands[0].cost)
+            self.__operands = operands  # Least costly first.
+            self.__postings = [Posting(-1, 0) for _ in operands]  # The current posting of each operand.
+
+        def __next__(self) -> Posting:
+            posting = self.__align(next(self.__operands[0], None))
+            if posting is None:
+                raise StopIteration
+            return posting
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            return self.__align(self.__operands[0].advance_to(document_id))
+
+        def __align(self, candidate: Optional[Posting]) -> Optional[Posting]:
+            """
+            Returns the first candidate at or after the given one that all operands match, if any.
+            """
+            while candidate:
+                document_id = candidate.document_id
+                for (i, operand) in enumerate(self.__operands[1:], 1):
+                    posting = self.__postings[i]
+                    if posting and posting.document_id < document_id:
+                        posting = self.__postings[i] = operand.advance_to(document_id)
+                    if not posting:
+                        return None
+                    if posting.document_id > document_id:
+                        candidate = self.__operands[0].advance_to(posting.document_id)
+                        break
+                else:
+                    return candidate
+            return None
+
+    class Disjunction(Operator):
+        """
+        Matches the documents that any of the operands match. The operands are merged using a heap keyed on their
+        current document identifiers.
+        """
+
+        def __init__(self, operands: List["BooleanSearchEngine.Operator"]):
+            super().__init__(sum(o.cost for o in operands))
+            self.__operands = operands
+            self.__heap = None  # The (document identifier, operand index, posting) triples. Filled on first use.
+
+        def __next__(self) -> Posting:
+            if self.__heap is None:
+                self.__heapify(next(o, None) for o in self.__operands)
+            heap = self.__heap
+            if not heap:
+                raise StopIteration
+            document_id = heap[0][0]
+            term_frequency = 0
+            while heap and heap[0][0] == document_id:
+                (_, i, posting) = heap[0]
+                term_frequency += posting.term_frequency
+                posting = next(self.__operands[i], None)
+                if posting:
+                    heapq.heapreplace(heap, (posting.document_id, i, posting))
+                else:
+                    heapq.heappop(heap)
+            return Posting(document_id, term_frequency)
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            if self.__heap is None:
+                self.__heapify(o.advance_to(document_id) for o in self.__operands)
+            else:
+                postings = [None for _ in self.__operands]
+                for (_, i, posting) in self.__heap:
+                    postings[i] = posting if posting.document_id >= document_id else self.__operands[i].advance_to(document_id)
+                self.__heapify(postings)
+            return next(self, None)
+
+        def __heapify(self, postings: Iterator[Optional[Posting]]) -> None:
+            """
+            Rebuilds the heap, given the current posting of each operand.
+            """
+            self.__heap = [(p.document_id, i, p) for (i, p) in enumerate(postings) if p]
+            heapq.heapify(self.__heap)
+
+    class Difference(Operator):
+        """
+        Matches the documents that the first operand matches but the second one doesn't, i.e., AND-NOT. The second
+        operand skips ahead to the matches of the first.
+        """
+
+        def __init__(self, include: "BooleanSearchEngine.Operator", exclude: "BooleanSearchEngine.Operator"):
+            super().__init__(include.cost)
+            self.__include = include
+            self.__exclude = exclude
+            self.__excluded = Posting(-1, 0)  # The current posting of the second operand.
+
+        def __next__(self) -> Posting:
+            posting = self.__filter(next(self.__include, None))
+            if posting is None:
+                raise StopIteration
+            return posting
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            return self.__filter(self.__include.advance_to(document_id))
+
+        def __filter(self, posting: Optional[Posting]) -> Optional[Posting]:
+            """
+            Returns the first match of the first operand at or after the given one that the second operand doesn't match.
+            """
+            while posting:
+                excluded = self.__excluded
+                if excluded and excluded.document_id < posting.document_id:
+                    excluded = self.__excluded = self.__exclude.advance_to(posting.document_id)
+                if not excluded or excluded.document_id != posting.document_id:
+                    return posting
+                posting = next(self.__include, None)
+            return None
+
+    # Splits a query into parentheses and whatever is between them and whitespace.
+    __TOKENS = re.compile(r"\(|\)|[^\s()]+")
+
+    # The reserved words.
+    __OPERATORS = ("AND", "OR", "NOT")
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
+        self.__corpus = corpus
+        self.__inverted_index = inverted_index
+
+    def evaluate(self, query: str, options: dict) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given boolean query, and yields the matching documents in order of increasing document
+        identifiers as dictionaries having the key "document" (Document). Matches are found as they are consumed.
+
+        The client can supply a dictionary of options that controls this query evaluation process: The maximum
+        number of documents to return to the client can be limited via the "hit_count" (int) option.
+        """
+        if not query.strip():
+            return
+        for posting in itertools.islice(self.compile(query), options.get("hit_count")):
+            yield {"document": self.__corpus.get_document(posting.document_id)}
+
+    def compile(self, query: str) -> Operator:
+        """
+        Compiles the given boolean query into an operator tree, that can be iterated over to find the matches.
+        Raises ValueError if the query can't be parsed.
+        """
+        tokens = self.__TOKENS.findall(query)
+        (operator, position) = self.__parse_disjunction(tokens, 0)
+        if position < len(tokens):
+            raise ValueError(f"Unexpected '{tokens[position]}' at token {position} in query '{query}'")
+        return operator
+
+    def __parse_disjunction(self, tokens: List[str], position: int) -> Tuple[Operator, int]:
+        """
+        Parses operands separated by OR, starting at the given position in the token list. Returns the compiled
+        operands and the position after them.
+        """
+        operands = []
+        while True:
+            (operand, position) = self.__parse_conjunction(tokens, position)
+            operands.append(operand)
+            if position < len(tokens) and tokens[position] == "OR":
+                position += 1
+            else:
+                break
+        return (operands[0] if len(operands) == 1 else __class__.Disjunction(operands), position)
+
+    def __parse_conjunction(self, tokens: List[str], position: int) -> Tuple[Operator, int]:
+        """
+        Parses operands separated by AND or by nothing at all, starting at the given position in the token list.
+        Returns the compiled operands and the position after them. The negated operands are subtracted from the
+        conjunction of the others.
+        """
+        (included, excluded) = ([], [])
+        while True:
+            (negated, operand, position) = self.__parse_negation(tokens, position)
+            (excluded if negated else included).append(operand)
+            if position < len(tokens) and tokens[position] == "AND":
+                position += 1
+            elif position == len(tokens) or tokens[position] in (")", "OR"):
+                break
+        if not included:
+            raise ValueError(f"Negated operands need to be ANDed with something that isn't negated, before token {position}")
+        operator = included[0] if len(included) == 1 else __class__.Conjunction(included)
+        if excluded:
+            operator = __class__.Difference(operator, excluded[0] if len(excluded) == 1 else __class__.Disjunction(excluded))
+        return (operator, position)
+
+    def __parse_negation(self, tokens: List[str], position: int) -> Tuple[bool, Operator, int]:
+        """
+        Parses an operand that might be preceded by any number of NOTs, starting at the given position in the token
+        list. Returns whether the operand is negated, the compiled operand, and the position after it.
+        """
+        negated = False
+        while position < len(tokens) and tokens[position] == "NOT":
+            negated = not negated
+            position += 1
+        if position < len(tokens) and tokens[position] == "(":
+            (operand, position) = self.__parse_disjunction(tokens, position + 1)
+            if position == len(tokens) or tokens[position] != ")":
+                raise ValueError(f"Expected ')' at token {position}")
+            return (negated, operand, position + 1)
+        if position == len(tokens) or tokens[position] in (")", *self.__OPERATORS):
+            raise ValueError(f"Expected a term at token {position}")
+        return (negated, self.__compile_term(tokens[position]), position + 1)
+
+    def __compile_term(self, token: str) -> Operator:
+        """
+        Compiles a term in the query. The term is processed like the indexed text is, and if that yields several
+        terms, these are ANDed together. If it yields no terms at all, nothing matches.
+        """
+        terms = list(self.__inverted_index.get_terms(token))
+        if not terms:
+            return __class__.Term(iter(()), 0)
+        operands = [__class__.Term(self.__inverted_index.get_postings_iterator(t), self.__inverted_index.get_document_frequency(t)) for t in terms]
+        return operands[0] if len(operands) == 1 else __class__.Conjunction(operands)
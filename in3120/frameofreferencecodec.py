@@ -0,0 +1,173 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import sys
+from array import array
+from itertools import accumulate, islice, repeat
+from operator import add
+from typing import Iterable, Sequence, Tuple
+from .variablebytecodec import VariableByteCodec
+
+
+class FrameOfReferenceCodec:
+    """
+    A simple encoder/decoder for blocks of integers, using patched frame-of-reference encoding
+    ("PForDelta"). See Zukowski et al., "Super-Scalar RAM-CPU Cache Compression", ICDE 2006, and
+    Section 5.3 in https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for the gap encoding.
+
+    All numbers in a block are stored relative to the block's smallest number (the "frame of
+    reference"), using the same number of bits. The width is chosen so that the block gets as small
+    as possible. Numbers too large for that width are stored separately as exceptions, and patched
+    in after decoding.
+
+    Widths are restricted to 0, 1, 2, 4, 8, 16 and 32 bits. That way, a whole block decodes using
+    a handful of operations that each process all numbers at once (translation tables for the
+    sub-byte widths, typed arrays for the others) instead of a loop over every number, which is what
+    matters when decoding in pure Python.
+
+    The layout of an encoded block is:
+
+        <width> <reference> <exception count> (<index> <value>)* <payload>
+
+    The width is a single byte, the reference and the exceptions are variable-byte encoded, and the
+    payload holds the numbers bit-packed (highest bits first) or as little-endian integers.
+    """
+
+    # The widths we support, in bits.
+    __WIDTHS = (0, 1, 2, 4, 8, 16, 32)
+
+    # Maps a width in bits to the array type code of that size.
+    __TYPECODES = {16: "H", 32: "I"}
+
+    # Maps a sub-byte width to one translation table per number packed into a byte. Translating
+    # a packed buffer with the i-th table extracts the i-th number from every byte.
+    __UNPACK_TABLES = {
+        width: [
+            bytes((byte >> (width * (8 // width - 1 - i))) & ((1 << width) - 1) for byte in range(256))
+            for i in range(8 // width)
+        ]
+        for width in (1, 2, 4)
+    }
+
+    @staticmethod
+    def encode(numbers: Sequence[int], destination: bytearray) -> int:
+        """
+        Encodes the given block of numbers, and appends the resulting bytes to the given
+        destination buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        assert len(numbers) > 0
+        assert min(numbers) >= 0 and max(numbers) < 2**32
+        size = len(destination)
+        reference = min(numbers)
+        offsets = [n - reference for n in numbers]
+        width = min(__class__.__WIDTHS, key=lambda w: __class__.__cost(offsets, w))
+        limit = 1 << width
+        exceptions = [(i, n) for (i, n) in enumerate(offsets) if n >= limit]
+        packed = [0 if n >= limit else n for n in offsets]
+        destination.append(width)
+        VariableByteCodec.encode_many((reference, len(exceptions)), destination)
+        VariableByteCodec.encode_many((x for exception in exceptions for x in exception), destination)
+        if 0 < width < 8:
+            per_byte = 8 // width
+            packed.extend([0] * (-len(packed) % per_byte))
+            for i in range(0, len(packed), per_byte):
+                byte = 0
+                for n in packed[i : i + per_byte]:
+                    byte = (byte << width) | n
+                destination.append(byte)
+        elif width == 8:
+            destination.extend(packed)
+        elif width > 8:
+            payload = array(__class__.__TYPECODES[width], packed)
+            if sys.byteorder == "big":
+                payload.byteswap()
+            destination.extend(payload.tobytes())
+        return len(destination) - size
+
+    @staticmethod
+    def decode(source: bytes, start: int, count: int) -> Tuple[array, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next block of count
+        numbers. Returns a pair comprised of an array holding the decoded numbers, and the number
+        of bytes read from the source buffer.
+        """
+        (numbers, increment) = __class__.__unpack(source, start, count)
+        return (array("I", iter(numbers)), increment)
+
+    @staticmethod
+    def encode_postings(document_ids: Sequence[int], term_frequencies: Sequence[int], document_id: int, destination: bytearray) -> int:
+        """
+        Encodes the given block of postings, and appends the resulting bytes to the given destination
+        buffer. The document identifiers are gap encoded, with the first gap being relative to the given
+        document identifier. Returns the number of bytes that were appended.
+        """
+        assert len(document_ids) == len(term_frequencies)
+        gaps = [b - a for (a, b) in zip([document_id, *document_ids], document_ids)]
+        return __class__.encode(gaps, destination) + __class__.encode(term_frequencies, destination)
+
+    @staticmethod
+    def decode_postings(source: bytes, start: int, count: int, document_id: int = 0) -> Tuple[array, array, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next block of count postings.
+        Returns a triple comprised of an array holding the decoded document identifiers, an array holding
+        the decoded term frequencies, and the number of bytes read from the source buffer.
+
+        Mirrors the signature of VariableByteCodec.decode_postings, so that the two are interchangeable.
+        """
+        (gaps, increment1) = __class__.__unpack(source, start, count)
+        (term_frequencies, increment2) = __class__.__unpack(source, start + increment1, count)
+        document_ids = array("I", islice(accumulate(gaps, initial=document_id), 1, None))
+        return (document_ids, array("I", iter(term_frequencies)), increment1 + increment2)
+
+    @staticmethod
+    def __unpack(source: bytes, start: int, count: int) -> Tuple[Iterable[int], int]:
+        """
+        Starting at the given position in the source buffer, decodes the next block of count numbers.
+        Returns a pair comprised of an iterable over the decoded numbers, and the number of bytes read
+        from the source buffer. The iterable is lazy where possible, so that the caller can chain further
+        processing onto it without materializing intermediate arrays.
+
+        Note that the iterable might be a bytes-like object, and that array("I", ...) interprets such
+        objects as raw machine values. Use array("I", iter(...)) to convert it.
+        """
+        assert source is not None
+        assert start >= 0
+        assert count > 0
+        width = source[start]
+        where = start + 1
+        ((reference, exception_count), increment) = VariableByteCodec.decode_many(source, where, 2)
+        where += increment
+        (exceptions, increment) = VariableByteCodec.decode_many(source, where, 2 * exception_count)
+        where += increment
+        size = (count * width + 7) // 8
+        payload = bytes(source[where : where + size])
+        where += size
+        if width == 0:
+            numbers = bytes(count)
+        elif width < 8:
+            per_byte = 8 // width
+            numbers = bytearray(size * per_byte)
+            for (i, table) in enumerate(__class__.__UNPACK_TABLES[width]):
+                numbers[i::per_byte] = payload.translate(table)
+            del numbers[count:]
+        elif width == 8:
+            numbers = payload
+        else:
+            numbers = array(__class__.__TYPECODES[width])
+            numbers.frombytes(payload)
+            if sys.byteorder == "big":
+                numbers.byteswap()
+        if exceptions:
+            numbers = array("I", iter(numbers))
+            for i in range(0, len(exceptions), 2):
+                numbers[exceptions[i]] = exceptions[i + 1]
+        return (map(add, numbers, repeat(reference)) if reference else numbers, where - start)
+
+    @staticmethod
+    def __cost(numbers: Sequence[int], width: int) -> int:
+        """
+        Returns the approximate number of bytes needed to encode the given block using the given width.
+        """
+        limit = 1 << width
+        return (len(numbers) * width + 7) // 8 + sum(2 + (n.bit_length() + 6) // 7 for n in numbers if n >= limit)
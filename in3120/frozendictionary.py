@@ -0,0 +1,143 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from array import array
+from bisect import bisect_right
+from typing import Iterable, Iterator, Optional, Tuple
+from .dictionary import Dictionary
+from .variablebytecodec import VariableByteCodec
+
+
+class FrozenDictionary(Dictionary):
+    """
+    An immutable dictionary for large vocabularies, that stores its terms compactly in a single
+    byte buffer instead of as individual string objects in a hash table.
+
+    The terms are sorted, and term identifiers are assigned in sorted order. The sorted terms are
+    divided into blocks of a fixed number of terms, and each block is front-coded: The first term
+    in a block is stored in full, while each following term is stored as the length of the prefix
+    it shares with the preceding term plus the remaining suffix. See Section 5.2.2 in
+    https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    A lookup binary searches over the first terms of the blocks, and then decodes the single
+    block where the term would be. Lookups are thus logarithmic in the number of blocks, and
+    linear in the block size.
+
+    The layout of a block in the buffer is as follows, with all integers variable-byte encoded
+    and with the terms UTF-8 encoded:
+
+        <length> <term> (<shared prefix length> <suffix length> <suffix>)*
+
+    Since UTF-8 preserves the ordering of code points, we can compare encoded terms directly.
+    """
+
+    def __init__(self, terms: Iterable[str], block_size: int = 16):
+        assert block_size > 0
+        self.__block_size = block_size  # How many terms there are per block.
+        self.__buffer = b""  # The front-coded blocks.
+        self.__offsets = array("Q")  # Where each block starts in the buffer.
+        self.__size = 0
+        self.__build(terms)
+
+    def __build(self, terms: Iterable[str]) -> None:
+        """
+        Sorts the terms and front-codes them into blocks.
+        """
+        buffer = bytearray()
+        previous = b""
+        for (i, term) in enumerate(sorted(set(t.encode("utf-8") for t in terms))):
+            if i % self.__block_size == 0:
+                self.__offsets.append(len(buffer))
+                VariableByteCodec.encode_many((len(term),), buffer)
+                buffer.extend(term)
+            else:
+                shared = 0
+                limit = min(len(previous), len(term))
+                while shared < limit and previous[shared] == term[shared]:
+                    shared += 1
+                VariableByteCodec.encode_many((shared, len(term) - shared), buffer)
+                buffer.extend(term[shared:])
+            previous = term
+            self.__size += 1
+        self.__buffer = bytes(buffer)
+
+    def __iter__(self):
+        for block in range(len(self.__offsets)):
+            for (term_id, term) in self.__decode_block(block):
+                yield (term.decode("utf-8"), term_id)
+
+    def __repr__(self):
+        return str(dict(self))
+
+    def __decode_number(self, position: int) -> Tuple[int, int]:
+        """
+        Decodes the number at the given position in the buffer. Returns a pair comprised of the
+        number and its encoded length. Lengths are nearly always small enough to fit in a single
+        byte, so we special-case that.
+        """
+        byte = self.__buffer[position]
+        if byte >= 128:
+            return (byte - 128, 1)
+        (numbers, n) = VariableByteCodec.decode_many(self.__buffer, position, 1)
+        return (numbers[0], n)
+
+    def __get_head(self, block: int) -> bytes:
+        """
+        Returns the first term in the given block, i.e., the term that is stored in full.
+        """
+        (length, n) = self.__decode_number(self.__offsets[block])
+        start = self.__offsets[block] + n
+        return self.__buffer[start:start + length]
+
+    def __decode_block(self, block: int) -> Iterator[Tuple[int, bytes]]:
+        """
+        Decodes the terms in the given block, and yields them together with their term identifiers.
+        """
+        term_id = block * self.__block_size
+        position = self.__offsets[block]
+        (length, n) = self.__decode_number(position)
+        term = self.__buffer[position + n:position + n + length]
+        position += n + length
+        yield (term_id, term)
+        end = self.__offsets[block + 1] if block + 1 < len(self.__offsets) else len(self.__buffer)
+        while position < end:
+            (shared, n) = self.__decode_number(position)
+            position += n
+            (length, n) = self.__decode_number(position)
+            position += n
+            term = term[:shared] + self.__buffer[position:position + length]
+            position += length
+            term_id += 1
+            yield (term_id, term)
+
+    def size(self) -> int:
+        return self.__size
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise NotImplementedError("Frozen dictionaries can't be added to")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        if not self.__offsets:
+            return None
+        key = term.encode("utf-8")
+        block = bisect_right(range(len(self.__offsets)), key, key=self.__get_head) - 1
+        if block < 0:
+            return None
+        for (term_id, candidate) in self.__decode_block(block):
+            if candidate == key:
+                return term_id
+            if candidate > key:
+                break
+        return None
+
+    def get_term(self, term_id: int) -> str:
+        """
+        Returns the term having the given identifier. This is the inverse of get_term_id.
+        """
+        assert 0 <= term_id < self.__size
+        for (i, term) in self.__decode_block(term_id // self.__block_size):
+            if i == term_id:
+                return term.decode("utf-8")
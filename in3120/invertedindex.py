@@ -1,122 +1,520 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-import itertools
-from abc import ABC, abstractmethod
-from .dictionary import InMemoryDictionary
-from .normalizer import Normalizer
-from .tokenizer import Tokenizer
-from .corpus import Corpus
-from .posting import Posting
-from .postinglist import CompressedInMemoryPostingList, InMemoryPostingList, PostingList
-from collections import Counter
-from typing import Iterable, Iterator, List
-
-
-class InvertedIndex(ABC):
-    """
-    Abstract base class for a simple inverted index.
-    """
-
-    def __getitem__(self, term: str) -> Iterator[Posting]:
-        return self.get_postings_iterator(term)
-
-    def __contains__(self, term: str) -> bool:
-        return self.get_document_frequency(term) > 0
-
-    @abstractmethod
-    def get_terms(self, buffer: str) -> Iterator[str]:
-        """
-        Processes the given text buffer and returns an iterator that yields normalized
-        terms as they are indexed. Both query strings and documents need to be
-        identically processed.
-        """
-        pass
-
-    @abstractmethod
-    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
-        """
-        Returns an iterator that can be used to iterate over the term's associated
-        posting list. For out-of-vocabulary terms we associate empty posting lists.
-        """
-        pass
-
-    @abstractmethod
-    def get_document_frequency(self, term: str) -> int:
-        """
-        Returns the number of documents in the indexed corpus that contains the given term.
-        """
-        pass
-
-
-class InMemoryInvertedIndex(InvertedIndex):
-    """
-    A simple in-memory implementation of an inverted index, suitable for small corpora.
-
-    In a serious application we'd have configuration to allow for field-specific NLP,
-    scale beyond current memory constraints, have a positional index, and so on.
-
-    If index compression is enabled, only the posting lists are compressed. Dictionary
-    compression is currently not supported.
-    """
-
-    def __init__(
-        self,
-        corpus: Corpus,
-        fields: Iterable[str],
-        normalizer: Normalizer,
-        tokenizer: Tokenizer,
-        compressed: bool = False,
-    ):
-        self.__corpus = corpus
-        self.__normalizer = normalizer
-        self.__tokenizer = tokenizer
-        self.__posting_lists: List[PostingList] = []
-        self.__dictionary = InMemoryDictionary()
-        # Constructs __posting_lists and __dictionary.
-        self.__build_index(fields, compressed)
-
-    def __repr__(self):
-        return str({term: self.__posting_lists[term_id] for (term, term_id) in self.__dictionary})
-
-    def __build_index(self, fields: Iterable[str], compressed: bool) -> None:
-        """
-        Builds a simple inverted index from the named fields in the document
-        collection. The dictionary implementation is assumed to produce term
-        identifiers in the range {0, ..., N - 1}.
-        """
-        for document in self.__corpus:
-            terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
-            frequencies = Counter(terms)
-
-            for (term, frequency) in frequencies.items():
-                #if term doesn't have identifier we assign one
-
-                id = self.__dictionary.add_if_absent(term)
-
-                #locates the postinglist for the given term
-                if id >= len(self.__posting_lists):
-                    self.__posting_lists.extend(( InMemoryPostingList() for _ in range((len(self.__posting_lists))- id + 1)))
-                posting_list = self.__posting_lists[id]
-
-
-                posting_list.append_posting(Posting(document.document_id, frequency))
-
-    def get_terms(self, buffer: str) -> Iterator[str]:
-        # In a serious large-scale application there could be field-specific tokenizers.
-        # We choose to keep it simple here.
-        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
-        return (self.__normalizer.normalize(t) for t in tokens)
-
-    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
-        # Assume that everything fits in memory. This would not be the case in a serious
-        # large-scale application, even with compression.
-        term_id = self.__dictionary.get_term_id(term)
-        return iter([]) if term_id is None else iter(self.__posting_lists[term_id])
-
-    def get_document_frequency(self, term: str) -> int:
-        # In a serious large-scale application we'd store this number explicitly, e.g., as part of the dictionary.
-        # That way, we can look up the document frequency without having to access the posting lists
-        # themselves. Imagine if the posting lists don't even reside in memory!
-        term_id = self.__dictionary.get_term_id(term)
-        return 0 if term_id is None else self.__posting_lists[term_id].get_length()
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import itertools
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from .dictionary import Dictionary, InMemoryDictionary
+from .frozendictionary import FrozenDictionary
+from .perfecthashdictionary import PerfectHashDictionary
+from .normalizer import Normalizer
+from .termstatistics import TermStatistics, TermStatisticsTable
+from .tokenizer import Tokenizer
+from .corpus import Corpus, InMemoryCorpus
+from .document import Document
+from .posting import Posting, PositionalPosting
+from .postinglist import BlockCompressedPostingList, CompressedInMemoryPostingList, DiskPostingList, InMemoryPostingList, PositionalPostingList, PostingList
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class InvertedIndex(ABC):
+    """
+    Abstract base class for a simple inverted index.
+    """
+
+    def __getitem__(self, term: str) -> Iterator[Posting]:
+        return self.get_postings_iterator(term)
+
+    def __contains__(self, term: str) -> bool:
+        return self.get_document_frequency(term) > 0
+
+    @abstractmethod
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        """
+        Processes the given text buffer and returns an iterator that yields normalized
+        terms as they are indexed. Both query strings and documents need to be
+        identically processed.
+        """
+        pass
+
+    @abstractmethod
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        """
+        Returns an iterator that can be used to iterate over the term's associated
+        posting list. For out-of-vocabulary terms we associate empty posting lists.
+        """
+        pass
+
+    @abstractmethod
+    def get_document_frequency(self, term: str) -> int:
+        """
+        Returns the number of documents in the indexed corpus that contains the given term.
+        """
+        pass
+
+    def is_positional(self) -> bool:
+        """
+        Returns True iff the index is positional, i.e., if the posting iterators yield
+        positional postings so that phrase and proximity queries can be evaluated.
+        """
+        return False
+
+    def get_vocabulary(self) -> Optional[Iterator[str]]:
+        """
+        Returns an iterator over all the terms in the index, i.e., the terms that have
+        non-empty posting lists. Returns None if the index can't list its terms, which
+        is what the default implementation does.
+        """
+        return None
+
+    def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+        """
+        Returns the corpus-level statistics for the given term, without touching the term's
+        posting list. Returns None for out-of-vocabulary terms, and for all terms if the
+        index doesn't keep term statistics, which is what the default implementation does.
+        """
+        return None
+
+    def get_generation(self) -> int:
+        """
+        Returns a number that increases whenever the contents of the index change, so that clients
+        can tell if results they have computed from the index are still valid. Indexes that can't
+        be updated always return 0.
+        """
+        return 0
+
+
+class InMemoryInvertedIndex(InvertedIndex):
+    """
+    A simple in-memory implementation of an inverted index, suitable for small corpora.
+
+    In a serious application we'd have configuration to allow for field-specific NLP,
+    scale beyond current memory constraints, and so on.
+
+    If the index is positional, the postings record where in the document the terms occur.
+    Positions are counted in tokens across all the indexed fields, with a gap between the
+    fields so that phrases can't span across them.
+
+    If index compression is enabled, only the posting lists are compressed. Compression can
+    be enabled by passing a codec name, either "vb" for variable-byte encoding or "block" for
+    block-based patched frame-of-reference encoding. Passing True selects variable-byte encoding.
+    The dictionary can be compressed separately after the index has been built, by freezing it.
+
+    The index can be built in parallel by passing a number of worker processes. The corpus
+    is then divided into shards of consecutive documents, each shard is indexed by a worker,
+    and the shards are merged in order. The resulting index is identical to the one built
+    serially, including the term identifiers.
+    """
+
+    # Maps a codec name to the posting list implementation that uses that codec.
+    __POSTING_LISTS = {
+        "vb": CompressedInMemoryPostingList,
+        "block": BlockCompressedPostingList,
+    }
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        fields: Iterable[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        compressed: Union[bool, str] = False,
+        positional: bool = False,
+        workers: int = 1,
+    ):
+        self.__corpus = corpus
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__positional = positional
+        self.__posting_lists: List[PostingList] = []
+        self.__dictionary: Dictionary = InMemoryDictionary()
+        self.__statistics = TermStatisticsTable()
+        # Constructs __posting_lists, __dictionary and __statistics.
+        self.__build_index(fields, compressed, workers)
+
+    def __repr__(self):
+        return str({term: self.__posting_lists[term_id] for (term, term_id) in self.__dictionary})
+
+    @staticmethod
+    def build_parallel(
+        corpus: Corpus,
+        fields: Iterable[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        workers: int = None,
+        **kwargs,
+    ) -> InMemoryInvertedIndex:
+        """
+        Builds an in-memory inverted index using the given number of worker processes, or one
+        per CPU if not specified. Other keyword arguments are passed on to the constructor.
+        """
+        workers = workers or os.cpu_count() or 1
+        return InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer, workers=workers, **kwargs)
+
+    def __build_index(self, fields: Iterable[str], compressed: Union[bool, str], workers: int) -> None:
+        """
+        Builds a simple inverted index from the named fields in the document
+        collection. The dictionary implementation is assumed to produce term
+        identifiers in the range {0, ..., N - 1}.
+
+        Positional posting lists store their positions compressed, but their document
+        identifiers and term frequencies uncompressed regardless of the codec.
+        """
+        if compressed is True:
+            compressed = "vb"
+        if compressed and compressed not in self.__POSTING_LISTS:
+            raise ValueError(f"Unsupported codec: {compressed}")
+        create_posting_list = self.__POSTING_LISTS[compressed] if compressed else InMemoryPostingList
+        if self.__positional:
+            create_posting_list = PositionalPostingList
+        if workers > 1:
+            postings = self.__get_sharded_postings(fields, workers)
+        else:
+            postings = itertools.chain.from_iterable(self.__get_postings(d, fields) for d in self.__corpus)
+        for (term, posting) in postings:
+            #if term doesn't have identifier we assign one
+
+            id = self.__dictionary.add_if_absent(term)
+
+            #locates the postinglist for the given term
+            if id >= len(self.__posting_lists):
+                self.__posting_lists.extend(( create_posting_list() for _ in range((len(self.__posting_lists))- id + 1)))
+            posting_list = self.__posting_lists[id]
+
+
+            posting_list.append_posting(posting)
+            self.__statistics.add_posting(id, posting.term_frequency)
+
+        for posting_list in self.__posting_lists:
+            posting_list.finalize_postings()
+        self.__statistics.finalize(len(self.__corpus))
+
+    def __get_postings(self, document: Document, fields: Iterable[str]) -> Iterator[Tuple[str, Posting]]:
+        """
+        Produces the postings for the given document, one per unique term in the named fields,
+        in order of first occurrence.
+        """
+        if self.__positional:
+            return self.__get_positional_postings(document, fields)
+        terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
+        frequencies = Counter(terms)
+        return ((term, Posting(document.document_id, frequency)) for (term, frequency) in frequencies.items())
+
+    def __get_sharded_postings(self, fields: Iterable[str], workers: int) -> Iterator[Tuple[str, Posting]]:
+        """
+        Indexes shards of consecutive documents in parallel, and produces their postings shard by
+        shard, and term by term within each shard in order of first occurrence. Appending the postings
+        in that order yields the same term identifiers and posting lists as a serial build.
+
+        There are a few more shards than workers, to even out the load if some shards are slower
+        to index than others.
+        """
+        documents = list(self.__corpus)
+        shard_size = max(1, math.ceil(len(documents) / (4 * workers)))
+        shards = [documents[i:i + shard_size] for i in range(0, len(documents), shard_size)]
+        fields = list(fields)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = executor.map(
+                __class__._build_shard,
+                shards,
+                itertools.repeat(fields),
+                itertools.repeat(self.__normalizer),
+                itertools.repeat(self.__tokenizer),
+                itertools.repeat(self.__positional),
+            )
+            for result in results:
+                for (term, document_ids, term_frequencies, positions) in result:
+                    if positions is None:
+                        postings = map(Posting, document_ids, term_frequencies)
+                    else:
+                        postings = map(PositionalPosting, document_ids, term_frequencies, positions)
+                    yield from zip(itertools.repeat(term), postings)
+
+    @staticmethod
+    def _build_shard(
+        documents: List[Document],
+        fields: List[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        positional: bool,
+    ) -> List[Tuple[str, array, array, Optional[List[List[int]]]]]:
+        """
+        Indexes the given shard of documents, and returns its posting lists in term identifier order as
+        columns of document identifiers, term frequencies and, if positional, positions. Columns are
+        much cheaper to send between processes than posting objects.
+
+        Runs in a worker process. Not name-mangled, so that the worker process can look it up.
+        """
+        corpus = InMemoryCorpus()
+        for document in documents:
+            corpus.add_document(document, False)
+        index = InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer, positional=positional)
+        result = []
+        for term in index.get_vocabulary():
+            postings = list(index.get_postings_iterator(term))
+            document_ids = array("I", (p.document_id for p in postings))
+            term_frequencies = array("I", (p.term_frequency for p in postings))
+            positions = [p.positions for p in postings] if positional else None
+            result.append((term, document_ids, term_frequencies, positions))
+        return result
+
+    def __get_positional_postings(self, document: Document, fields: Iterable[str]) -> Iterator[Tuple[str, PositionalPosting]]:
+        """
+        Produces the positional postings for the given document, one per unique term in the named
+        fields, in order of first occurrence.
+        """
+        positions = defaultdict(list)
+        position = 0
+        for field in fields:
+            for term in self.get_terms(document.get_field(field, "")):
+                positions[term].append(position)
+                position += 1
+            # Leave a hole between the fields, so that phrases can't span across them.
+            position += 1
+        return ((term, PositionalPosting(document.document_id, len(p), p)) for (term, p) in positions.items())
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        # In a serious large-scale application there could be field-specific tokenizers.
+        # We choose to keep it simple here.
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        # Assume that everything fits in memory. This would not be the case in a serious
+        # large-scale application, even with compression.
+        term_id = self.__dictionary.get_term_id(term)
+        return iter([]) if term_id is None else iter(self.__posting_lists[term_id])
+
+    def get_document_frequency(self, term: str) -> int:
+        # Looked up in the term statistics, so that we don't have to access the posting lists
+        # themselves. Imagine if the posting lists don't even reside in memory!
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__statistics.get_document_frequency(term_id)
+
+    def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+        term_id = self.__dictionary.get_term_id(term)
+        return None if term_id is None else self.__statistics.get_term_statistics(term_id)
+
+    def is_positional(self) -> bool:
+        return self.__positional
+
+    def get_vocabulary(self) -> Iterator[str]:
+        return (term for (term, _) in self.__dictionary)
+
+    def freeze_dictionary(self, block_size: int = 16, perfect_hash: bool = False) -> None:
+        """
+        Replaces the dictionary with a front-coded FrozenDictionary, which takes much less memory
+        for large vocabularies. Term identifiers are reassigned in sorted order, so the posting
+        lists and term statistics are reordered accordingly. The index can't be added to afterwards,
+        which is fine since it is never added to after it has been built anyway.
+
+        Lookups in a frozen dictionary take logarithmic time. If perfect_hash is set, a minimal
+        perfect hash function is built on top, so that query-time lookups take constant time, at
+        the cost of a few bytes per term. Term identifiers are then reassigned once more, in hash
+        order, while the frozen dictionary is still used for enumerating the terms in sorted order.
+        """
+        if not isinstance(self.__dictionary, (FrozenDictionary, PerfectHashDictionary)):
+            order = [term_id for (_, term_id) in sorted(self.__dictionary)]
+            self.__dictionary = FrozenDictionary(self.get_vocabulary(), block_size)
+            self.__reorder(order)
+        if perfect_hash and not isinstance(self.__dictionary, PerfectHashDictionary):
+            dictionary = PerfectHashDictionary(self.__dictionary)
+            order = [0] * len(dictionary)
+            for (term, term_id) in self.__dictionary:
+                order[dictionary.get_term_id(term)] = term_id
+            self.__dictionary = dictionary
+            self.__reorder(order)
+
+    def __reorder(self, order: List[int]) -> None:
+        """
+        Reassigns term identifiers, so that the posting list and term statistics for term identifier i
+        become those that were previously associated with term identifier order[i].
+        """
+        self.__posting_lists = [self.__posting_lists[term_id] for term_id in order]
+        self.__statistics.reorder(order)
+
+    def save(self, filename: str, compressed: str = "vb") -> None:
+        """
+        Writes the index to the named file as a persistent index segment, with the posting
+        lists compressed using the named codec. The segment can then be opened and served
+        by a DiskInvertedIndex.
+
+        Positional indexes can currently not be saved.
+        """
+        if self.__positional:
+            raise ValueError("Positional indexes can't be saved")
+        posting_lists = ((term, iter(self.__posting_lists[term_id])) for (term, term_id) in self.__dictionary)
+        DiskInvertedIndex.write(filename, posting_lists, len(self.__corpus), compressed)
+
+
+class DiskInvertedIndex(InvertedIndex):
+    """
+    An implementation of an inverted index that is served from a persistent index segment on
+    disk, suitable for corpora whose postings don't fit in memory.
+
+    A segment is a single versioned file that holds the dictionary, the term statistics, and
+    the compressed posting lists. Opening a segment only reads its header, its dictionary
+    and a small directory of where each posting list is located, so opening is near-instant
+    regardless of how many postings there are. The rest of the file is memory-mapped, and
+    postings are decoded straight from the mapped file the first time they are traversed. The
+    headers and skip tables of the most recently used posting lists are kept around, so that the
+    posting lists of frequent query terms aren't set up anew for every query. Otherwise the
+    operating system's page cache does the caching, so the index can be larger than the
+    available memory, and several processes can share one physical copy of it.
+
+    The layout of a segment is as follows, with all integers little-endian:
+
+        <header> <posting lists> <dictionary> <directory>
+
+    The header records where the dictionary and directory start, and how many documents the
+    corpus has. The dictionary is the UTF-8 encoded terms separated by NUL characters, in term
+    identifier order. The directory is N + 1 64-bit offsets of the posting lists relative to
+    where the first one starts, followed by the term statistics table.
+
+    Segments are written using write(), or by save() on an in-memory inverted index.
+    """
+
+    # Identifies the file as an index segment.
+    __MAGIC = b"IN3120SG"
+
+    # The segment format version. Bump this if the layout changes.
+    __VERSION = 2
+
+    # The magic, the version, the number of terms, the offsets of the dictionary and directory, and the number of documents.
+    __HEADER = struct.Struct("<8sIIQQQ")
+
+    def __init__(self, filename: str, normalizer: Normalizer, tokenizer: Tokenizer, cache_size: int = 1000):
+        """
+        Opens the named segment. At most cache_size posting lists are kept set up at a time, the
+        least recently used ones being dropped first.
+        """
+        assert cache_size > 0
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__file = open(filename, mode="rb")
+        self.__buffer = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        # Constructs __dictionary, __offsets and __statistics.
+        self.__open_segment(filename)
+        self.__cache_size = cache_size  # The maximum number of posting lists we keep around.
+        self.__posting_lists: OrderedDict = OrderedDict()  # Maps term identifiers to set up posting lists, least recently used first.
+        self.__lock = threading.Lock()  # Guards __posting_lists, since the index can be shared between threads.
+
+    def __open_segment(self, filename: str) -> None:
+        """
+        Reads the header, the dictionary and the directory of the segment. The posting lists
+        are left untouched.
+        """
+        if len(self.__buffer) < self.__HEADER.size:
+            raise IOError(f"Not an index segment: {filename}")
+        (magic, version, size, dictionary, directory, documents) = self.__HEADER.unpack_from(self.__buffer, 0)
+        if magic != self.__MAGIC:
+            raise IOError(f"Not an index segment: {filename}")
+        if version != self.__VERSION:
+            raise IOError(f"Unsupported index segment version {version}: {filename}")
+        terms = self.__buffer[dictionary:directory].decode("utf-8")
+        self.__dictionary = InMemoryDictionary(terms.split("\0") if size else ())
+        self.__offsets = array("Q")  # Where in the file the posting list for a term identifier starts.
+        self.__offsets.frombytes(self.__buffer[directory:directory + 8 * (size + 1)])
+        if sys.byteorder != "little":
+            self.__offsets.byteswap()
+        # So that we don't have to touch the posting lists.
+        self.__statistics = TermStatisticsTable.read(self.__buffer, directory + 8 * (size + 1), size, documents)
+        self.__postings = self.__HEADER.size  # Where in the file the first posting list starts.
+
+    @staticmethod
+    def write(
+        filename: str,
+        posting_lists: Iterable[Tuple[str, Iterable[Posting]]],
+        document_count: int,
+        compressed: str = "vb",
+    ) -> None:
+        """
+        Writes an index segment to the named file. The posting lists are given as (term, postings)
+        pairs, one per unique term, with the postings sorted by document identifier. The posting
+        lists must be non-empty. The term identifiers are assigned in the given order. The number
+        of documents in the indexed corpus is needed to compute the term statistics.
+
+        The posting lists are streamed straight to the file, so that they don't all need to fit
+        in memory.
+        """
+        header = DiskInvertedIndex.__HEADER
+        terms = []
+        offsets = array("Q", [0])
+        statistics = TermStatisticsTable()
+
+        def account(term_id: int, postings: Iterable[Posting]) -> Iterator[Posting]:
+            for posting in postings:
+                statistics.add_posting(term_id, posting.term_frequency)
+                yield posting
+
+        with open(filename, mode="wb") as f:
+            f.write(bytes(header.size))
+            for (term, postings) in posting_lists:
+                assert "\0" not in term, "Terms can't contain NUL characters"
+                length = DiskPostingList.write(account(len(terms), postings), f, compressed)
+                terms.append(term)
+                offsets.append(offsets[-1] + length)
+                assert len(statistics) == len(terms), "Posting lists can't be empty"
+            statistics.finalize(document_count)
+            dictionary = header.size + offsets[-1]
+            f.write("\0".join(terms).encode("utf-8"))
+            directory = f.tell()
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            f.write(offsets.tobytes())
+            statistics.write(f)
+            f.seek(0)
+            f.write(header.pack(
+                DiskInvertedIndex.__MAGIC, DiskInvertedIndex.__VERSION, len(terms), dictionary, directory, document_count
+            ))
+
+    def close(self) -> None:
+        """
+        Unmaps and closes the underlying file. The index cannot be used afterwards, and all
+        posting iterators obtained from it must have been released.
+        """
+        self.__posting_lists.clear()
+        self.__buffer.close()
+        self.__file.close()
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        term_id = self.__dictionary.get_term_id(term)
+        if term_id is None:
+            return iter([])
+        # Decode the header and skip table once per frequent term, rather than once per lookup.
+        with self.__lock:
+            posting_list = self.__posting_lists.get(term_id)
+            if posting_list is not None:
+                self.__posting_lists.move_to_end(term_id)
+        if posting_list is None:
+            offset = self.__postings + self.__offsets[term_id]
+            posting_list = DiskPostingList(self.__buffer, offset, self.__offsets[term_id + 1] - self.__offsets[term_id])
+            with self.__lock:
+                self.__posting_lists[term_id] = posting_list
+                if len(self.__posting_lists) > self.__cache_size:
+                    self.__posting_lists.popitem(last=False)
+        return iter(posting_list)
+
+    def get_document_frequency(self, term: str) -> int:
+        term_id = self.__dictionary.get_term_id(term)
+        return 0 if term_id is None else self.__statistics.get_document_frequency(term_id)
+
+    def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+        term_id = self.__dictionary.get_term_id(term)
+        return None if term_id is None else self.__statistics.get_term_statistics(term_id)
+
+    def get_vocabulary(self) -> Iterator[str]:
+        return (term for (term, _) in self.__dictionary)
@@ -0,0 +1,158 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+from array import array
+from hashlib import blake2b
+from typing import List, Optional, Tuple
+from .dictionary import Dictionary
+
+
+class PerfectHashDictionary(Dictionary):
+    """
+    An immutable dictionary that maps a static set of terms to term identifiers in constant time,
+    using a minimal perfect hash function. It is built on top of another dictionary that holds the
+    terms, e.g., a FrozenDictionary, and takes about 5.5 bytes per term on top of that: The hash
+    function itself takes 1.5 bytes per term, and the fingerprints take 4. The terms themselves
+    are never stored, and enumerating the terms is left to the dictionary underneath.
+
+    The hash function is built using the compress, hash and displace (CHD) algorithm. See Belazzougui,
+    Botelho and Dietzfelbinger, "Hash, displace, and compress", ESA 2009. The terms are hashed into
+    buckets of a few terms each, and for each bucket, largest buckets first, we search for a pair of
+    displacements (d0, d1) that maps every term in the bucket to a free slot via the slot function
+    (h1 + d0 * h2 + d1) mod N. Each of the N terms thus gets its own slot in {0, ..., N - 1}.
+
+    A perfect hash function maps terms it wasn't built from to arbitrary slots. To be able to tell
+    that a term is unknown, each slot also holds a 32-bit fingerprint of its term, so that an unknown
+    term is only mistaken for a known one with a probability of 1 in 2^32.
+
+    The term identifier of a term is its slot, so the term identifiers differ from the ones in the
+    dictionary underneath, and whatever is indexed by term identifier has to be reordered.
+    """
+
+    # The average number of terms per bucket. Larger buckets take less memory, but longer to build.
+    __BUCKET_SIZE = 4
+
+    # The largest first displacement we try, so that it fits in 16 bits.
+    __MAXIMUM_D0 = 0xFFFF
+
+    def __init__(self, dictionary: Dictionary):
+        self.__dictionary = dictionary  # Holds the terms, so that we can enumerate them.
+        self.__d0 = array("H")  # The first displacement per bucket.
+        self.__d1 = array("I")  # The second displacement per bucket.
+        self.__fingerprints = array("I")  # The fingerprint of the term in each slot.
+        self.__seed = 0  # Picks the hash function. Changed if the build fails.
+        self.__build([term for (term, _) in dictionary])
+
+    def __hash(self, term: str) -> Tuple[int, int, int, int]:
+        """
+        Hashes the given term, and returns its bucket, the two hash values used by the slot function,
+        and its fingerprint. A single cryptographic hash is sliced up, since computing one hash in C
+        is faster than computing several in Python. Unlike Python's built-in string hash, it doesn't
+        change between processes.
+        """
+        n = len(self.__fingerprints)
+        digest = blake2b(term.encode("utf-8"), digest_size=16, salt=self.__seed.to_bytes(16, "little")).digest()
+        value = int.from_bytes(digest, "little")
+        bucket = (value & 0xFFFFFFFF) % len(self.__d0)
+        h1 = ((value >> 32) & 0xFFFFFFFF) % n
+        h2 = ((value >> 64) & 0xFFFFFFFF) % max(1, n - 1) + 1
+        return (bucket, h1, h2, value >> 96)
+
+    def __build(self, terms: list) -> None:
+        """
+        Builds the hash function for the given terms, retrying with a different hash function in the
+        unlikely case that two terms in the same bucket collide on both hash values, or that a bucket
+        can't be placed with a first displacement that fits in 16 bits.
+        """
+        assert len(set(terms)) == len(terms), "Terms must be unique"
+        n = len(terms)
+        if n == 0:
+            return
+        while not self.__try_build(terms):
+            self.__seed += 1
+
+    def __try_build(self, terms: list) -> bool:
+        """
+        Tries to build the hash function for the given terms. Returns False if the current hash
+        function won't do.
+        """
+        n = len(terms)
+        buckets = max(1, math.ceil(n / self.__BUCKET_SIZE))
+        self.__d0 = array("H", bytes(2 * buckets))
+        self.__d1 = array("I", bytes(4 * buckets))
+        self.__fingerprints = array("I", bytes(4 * n))
+        members = [[] for _ in range(buckets)]
+        for term in terms:
+            (bucket, h1, h2, fingerprint) = self.__hash(term)
+            members[bucket].append((h1, h2, fingerprint))
+        taken = bytearray(n)
+        for bucket in sorted(range(buckets), key=lambda b: len(members[b]), reverse=True):
+            entries = members[bucket]
+            if not entries:
+                break
+            if len({(h1, h2) for (h1, h2, _) in entries}) < len(entries):
+                return False
+            for d0 in range(min(n, self.__MAXIMUM_D0 + 1)):
+                slots = [(h1 + d0 * h2) % n for (h1, h2, _) in entries]
+                if len(set(slots)) < len(slots):
+                    continue
+                d1 = self.__find_shift(taken, slots)
+                if d1 is not None:
+                    break
+            else:
+                return False
+            self.__d0[bucket] = d0
+            self.__d1[bucket] = d1
+            for (s, (_, _, fingerprint)) in zip(slots, entries):
+                slot = (s + d1) % n
+                taken[slot] = 1
+                self.__fingerprints[slot] = fingerprint
+        return True
+
+    @staticmethod
+    def __find_shift(taken: bytearray, slots: List[int]) -> Optional[int]:
+        """
+        Finds a shift that moves all the given slots to free slots, by shifting the first slot to
+        each free slot in turn and checking the others. Returns None if there is no such shift.
+
+        The search for free slots starts where the first slot is rather than at the start of the
+        table, since always starting at the start would pack the start of the table so tightly that
+        the searches for later buckets would take much longer.
+        """
+        n = len(taken)
+        start = taken.find(0, slots[0])
+        if start == -1:
+            start = taken.find(0)
+        free = start
+        while True:
+            d1 = (free - slots[0]) % n
+            if all(not taken[(s + d1) % n] for s in slots[1:]):
+                return d1
+            free = taken.find(0, free + 1)
+            if free == -1:
+                free = taken.find(0)
+            if free == start:
+                return None
+
+    def __iter__(self):
+        # In the order of the dictionary underneath, e.g., sorted for a FrozenDictionary.
+        for (term, _) in self.__dictionary:
+            yield (term, self.get_term_id(term))
+
+    def size(self) -> int:
+        return len(self.__fingerprints)
+
+    def add_if_absent(self, term: str) -> int:
+        term_id = self.get_term_id(term)
+        if term_id is None:
+            raise ValueError(f"Can't add the term '{term}', since perfect hash dictionaries are immutable")
+        return term_id
+
+    def get_term_id(self, term: str) -> Optional[int]:
+        n = len(self.__fingerprints)
+        if n == 0:
+            return None
+        (bucket, h1, h2, fingerprint) = self.__hash(term)
+        slot = (h1 + self.__d0[bucket] * h2 + self.__d1[bucket]) % n
+        return slot if self.__fingerprints[slot] == fingerprint else None
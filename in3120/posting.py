@@ -1,15 +1,39 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-
-class Posting:
-    """
-    A very simple posting entry in a non-positional inverted index.
-    """
-
-    def __init__(self, document_id: int, term_frequency: int):
-        self.document_id = document_id
-        self.term_frequency = term_frequency
-
-    def __repr__(self):
-        return str({"document_id": self.document_id, "term_frequency": self.term_frequency})
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from typing import Sequence
+
+
+class Posting:
+    """
+    A very simple posting entry in a non-positional inverted index.
+
+    Posting lists typically store their postings in a more compact representation, and
+    create posting objects on the fly as they are iterated over. Slots keep these objects
+    small and cheap to create.
+    """
+
+    __slots__ = ("document_id", "term_frequency")
+
+    def __init__(self, document_id: int, term_frequency: int):
+        self.document_id = document_id
+        self.term_frequency = term_frequency
+
+    def __repr__(self):
+        return str({"document_id": self.document_id, "term_frequency": self.term_frequency})
+
+
+class PositionalPosting(Posting):
+    """
+    A posting entry in a positional inverted index. In addition to the term frequency, the
+    posting records the sorted positions where the term occurs in the document.
+    """
+
+    __slots__ = ("positions",)
+
+    def __init__(self, document_id: int, term_frequency: int, positions: Sequence[int]):
+        super().__init__(document_id, term_frequency)
+        self.positions = positions
+
+    def __repr__(self):
+        return str({"document_id": self.document_id, "term_frequency": self.term_frequency, "positions": list(self.positions)})
@@ -1,123 +1,586 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from abc import ABC, abstractmethod
-from .posting import Posting
-from .variablebytecodec import VariableByteCodec
-from typing import Iterator, List
-
-
-class PostingList(ABC):
-    """
-    Abstract base class for a simple posting list.
-    """
-
-    def __iter__(self):
-        return self.get_iterator()
-
-    def __len__(self):
-        return self.get_length()
-
-    @abstractmethod
-    def get_length(self) -> int:
-        """
-        Returns the length of the posting list, i.e., the number of postings it contains.
-        """
-        pass
-
-    @abstractmethod
-    def get_iterator(self) -> Iterator[Posting]:
-        """
-        Returns an iterator that can be used to iterate over the posting list.
-        """
-        pass
-
-    @abstractmethod
-    def append_posting(self, posting: Posting) -> None:
-        """
-        Appends a posting to the posting list.
-        """
-        pass
-
-    @abstractmethod
-    def finalize_postings(self) -> None:
-        """
-        Signals that there will be no more postings added to the posting list, e.g.,
-        so that we can finalize any unprocessed chunks or otherwise tie up any loose
-        ends.
-        """
-        pass
-
-
-class InMemoryPostingList(PostingList):
-    """
-    A simple in-memory implementation of a posting list.
-    """
-
-    def __init__(self):
-        self.__postings: List[Posting] = []
-
-    def get_length(self) -> int:
-        return len(self.__postings)
-
-    def get_iterator(self) -> Iterator[Posting]:
-        return iter(self.__postings)
-
-    def append_posting(self, posting: Posting) -> None:
-        assert len(self.__postings) == 0 or self.__postings[-1].document_id < posting.document_id
-        self.__postings.append(posting)
-
-    def finalize_postings(self) -> None:
-        pass
-
-
-class CompressedInMemoryPostingList(PostingList):
-    """
-    A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
-    with variable-byte encoding.
-    """
-
-    class CompressedInMemoryPostingListIterator(Iterator[Posting]):
-        """
-        A custom iterator that decodes the compressed integers as we traverse the underlying byte
-        array. The decoding logic needs to mirror the encoding logic that happens when postings are
-        appended to the byte array.
-        """
-
-        def __init__(self, data: bytearray):
-            self.__data = data  # The buffer holding all the compressed posting data.
-            self.__where = 0  # Our current position in the buffer.
-            self.__document_id = 0  # We encoded the gaps, so accumulate them when decoding.
-
-        def __next__(self) -> Posting:
-            if self.__where < len(self.__data):
-                (gap, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                self.__document_id += gap
-                (term_frequency, increment) = VariableByteCodec.decode(self.__data, self.__where)
-                self.__where += increment
-                return Posting(self.__document_id, term_frequency)
-            else:
-                raise StopIteration
-
-    def __init__(self):
-        self.__logical_length = 0  # The number of posting entries encoded in the byte array.
-        self.__previous_document_id = 0  # So that we can gap encode.
-        self.__data = bytearray()  # All posting entries, compressed.
-
-    def get_length(self) -> int:
-        return self.__logical_length
-
-    def get_iterator(self) -> Iterator[Posting]:
-        return __class__.CompressedInMemoryPostingListIterator(self.__data)
-
-    def append_posting(self, posting: Posting) -> None:
-        assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
-        gap = posting.document_id - self.__previous_document_id
-        VariableByteCodec.encode(gap, self.__data)
-        VariableByteCodec.encode(posting.term_frequency, self.__data)
-        self.__logical_length += 1
-        self.__previous_document_id = posting.document_id
-
-    def finalize_postings(self) -> None:
-        pass
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_left
+from itertools import accumulate, islice
+from .posting import Posting, PositionalPosting
+from .ranker import Ranker
+from .variablebytecodec import VariableByteCodec
+from .frameofreferencecodec import FrameOfReferenceCodec
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional, Sequence, Tuple
+
+
+class PostingList(ABC):
+    """
+    Abstract base class for a simple posting list.
+    """
+
+    def __iter__(self):
+        return self.get_iterator()
+
+    def __len__(self):
+        return self.get_length()
+
+    @abstractmethod
+    def get_length(self) -> int:
+        """
+        Returns the length of the posting list, i.e., the number of postings it contains.
+        """
+        pass
+
+    @abstractmethod
+    def get_iterator(self) -> Iterator[Posting]:
+        """
+        Returns an iterator that can be used to iterate over the posting list.
+        """
+        pass
+
+    @abstractmethod
+    def append_posting(self, posting: Posting) -> None:
+        """
+        Appends a posting to the posting list.
+        """
+        pass
+
+    @abstractmethod
+    def finalize_postings(self) -> None:
+        """
+        Signals that there will be no more postings added to the posting list, e.g.,
+        so that we can finalize any unprocessed chunks or otherwise tie up any loose
+        ends.
+        """
+        pass
+
+
+class InMemoryPostingList(PostingList):
+    """
+    A simple in-memory implementation of a posting list.
+
+    The postings are stored column-wise in two arrays of machine integers rather than as a
+    list of posting objects, which cuts the memory usage per posting down to 8 bytes. Posting
+    objects are created on the fly as the posting list is iterated over.
+    """
+
+    class InMemoryPostingListIterator(Iterator[Posting]):
+        """
+        A custom iterator that creates posting objects from the underlying arrays as we
+        traverse them.
+        """
+
+        def __init__(self, document_ids: array, term_frequencies: array):
+            self.__document_ids = document_ids  # Sorted document identifiers.
+            self.__term_frequencies = term_frequencies  # Corresponding term frequencies.
+            self.__index = 0  # Our current position in the arrays.
+
+        def __next__(self) -> Posting:
+            index = self.__index
+            if index == len(self.__document_ids):
+                raise StopIteration
+            self.__index += 1
+            return Posting(self.__document_ids[index], self.__term_frequencies[index])
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips forward to the first remaining posting having a document identifier that is at least
+            as large as the given one, and returns that posting. Returns None if there is no such posting.
+            """
+            self.__index = bisect_left(self.__document_ids, document_id, self.__index)
+            return next(self, None)
+
+        def next_batch(self) -> Tuple[array, array]:
+            """
+            Returns the document identifiers and term frequencies of all the remaining postings, and
+            moves past them. Returns empty arrays once we're exhausted. Lets clients consume the posting
+            list in bulk instead of a posting at a time.
+            """
+            index = self.__index
+            self.__index = len(self.__document_ids)
+            return (self.__document_ids[index:], self.__term_frequencies[index:])
+
+    def __init__(self):
+        self.__document_ids = array("I")
+        self.__term_frequencies = array("I")
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return __class__.InMemoryPostingListIterator(self.__document_ids, self.__term_frequencies)
+
+    def append_posting(self, posting: Posting) -> None:
+        assert len(self.__document_ids) == 0 or self.__document_ids[-1] < posting.document_id
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+
+    def finalize_postings(self) -> None:
+        pass
+
+
+class BlockPostingListIterator(Iterator[Posting]):
+    """
+    A custom iterator for compressed posting lists that are organized into fixed-size blocks, that
+    decodes the compressed integers as we traverse the underlying byte array. The decoding logic is
+    supplied by the posting list, and needs to mirror the encoding logic that happens when postings
+    are appended to the byte array.
+
+    Postings are decoded in bulk, a block at a time, so that the per-posting cost is dominated
+    by a tight decoding loop instead of by method call overhead. Blocks that advance_to can
+    tell don't contain what we're looking for are never decoded at all.
+
+    Per-block metadata lets the iterator provide upper bounds on the scores in the current block,
+    for block-max WAND style dynamic pruning. See Ding and Suel, "Faster Top-k Document Retrieval
+    Using Block-Max Indexes", SIGIR 2011. The iterator then keeps track of two positions: The
+    posting we have decoded, and a "shallow" block that we have inspected the metadata of.
+    """
+
+    def __init__(
+        self,
+        data: bytes,
+        length: int,
+        skip_interval: int,
+        skip_document_ids: array,
+        skip_offsets: array,
+        block_max_term_frequencies: array,
+        last_document_id: int,
+        decoder: Callable[[bytes, int, int, int], Tuple[array, array, int]],
+    ):
+        self.__data = data  # The buffer holding all the compressed posting data.
+        self.__length = length  # The total number of postings in the buffer.
+        self.__skip_interval = skip_interval  # The number of postings per block.
+        self.__skip_document_ids = skip_document_ids  # Per block, what the first gap is relative to.
+        self.__skip_offsets = skip_offsets  # Per block, where in the buffer the block starts.
+        self.__block_max_term_frequencies = block_max_term_frequencies  # Per block, the largest term frequency.
+        self.__last_document_id = last_document_id  # The largest document identifier in the last block.
+        self.__decoder = decoder  # Decodes a block, given where it starts, its size and what its gaps are relative to.
+        self.__block = -1  # The block we have currently decoded, if any.
+        self.__shallow_block = 0  # The block we have inspected the metadata of.
+        self.__document_ids = ()  # The decoded document identifiers of the current block.
+        self.__term_frequencies = ()  # The decoded term frequencies of the current block.
+        self.__index = 0  # Our current position in the current block.
+
+    def __next__(self) -> Posting:
+        if self.__index == len(self.__document_ids):
+            if not self.__decode_block(self.__block + 1):
+                raise StopIteration
+        index = self.__index
+        self.__index += 1
+        return Posting(self.__document_ids[index], self.__term_frequencies[index])
+
+    def advance_to(self, document_id: int) -> Optional[Posting]:
+        """
+        Skips forward to the first remaining posting having a document identifier that is at least
+        as large as the given one, and returns that posting. Returns None if there is no such posting.
+        """
+        document_ids = self.__document_ids
+        if not document_ids or document_ids[-1] < document_id:
+            # The last block whose first gap is relative to something smaller than the target is the
+            # only block that can contain the posting we're looking for.
+            block = max(self.__block + 1, bisect_left(self.__skip_document_ids, document_id) - 1)
+            if not self.__decode_block(block):
+                return None
+            document_ids = self.__document_ids
+        index = bisect_left(document_ids, document_id, self.__index)
+        if index == len(document_ids):
+            # Everything in the next block, if any, comes after the target.
+            self.__index = index
+            return next(self, None)
+        self.__index = index + 1
+        return Posting(document_ids[index], self.__term_frequencies[index])
+
+    def next_batch(self) -> Tuple[Sequence[int], Sequence[int]]:
+        """
+        Returns the document identifiers and term frequencies of the remaining postings in the current
+        block, decoding the next block if we're at the end of the current one, and moves past them.
+        Returns empty sequences once we're exhausted. Lets clients consume the posting list in bulk
+        instead of a posting at a time.
+        """
+        if self.__index == len(self.__document_ids):
+            if not self.__decode_block(self.__block + 1):
+                return ((), ())
+        index = self.__index
+        self.__index = len(self.__document_ids)
+        return (self.__document_ids[index:], self.__term_frequencies[index:])
+
+    def next_shallow(self, document_id: int) -> Optional[int]:
+        """
+        Moves the shallow pointer forward to the block that would contain the given document identifier,
+        without decoding anything. Returns the largest document identifier in that block, or None if the
+        document identifier comes after all the blocks.
+        """
+        if document_id > self.__last_document_id or not self.__skip_offsets:
+            return None
+        block = max(self.__shallow_block, bisect_left(self.__skip_document_ids, document_id) - 1)
+        self.__shallow_block = block
+        return self.block_last_document_id()
+
+    def block_last_document_id(self) -> int:
+        """
+        Returns the largest document identifier in the block that the shallow pointer is at.
+        """
+        block = self.__shallow_block + 1
+        return self.__skip_document_ids[block] if block < len(self.__skip_offsets) else self.__last_document_id
+
+    def block_max_score(self, ranker: Ranker, term: str, multiplicity: int) -> float:
+        """
+        Returns an upper bound on the score that the given query term can contribute for any document in
+        the block that the shallow pointer is at, according to the given ranker.
+        """
+        return ranker.upper_bound(term, multiplicity, self.__block_max_term_frequencies[self.__shallow_block])
+
+    def max_score(self, ranker: Ranker, term: str, multiplicity: int) -> float:
+        """
+        Returns an upper bound on the score that the given query term can contribute for any document in
+        the posting list, according to the given ranker.
+        """
+        term_frequency = max(self.__block_max_term_frequencies) if self.__block_max_term_frequencies else 0
+        return ranker.upper_bound(term, multiplicity, term_frequency)
+
+    def __decode_block(self, block: int) -> bool:
+        """
+        Decodes the given block, and positions us at the start of it. Returns False if we're
+        out of blocks, in which case the iterator is exhausted.
+        """
+        self.__block = block
+        self.__index = 0
+        if block >= len(self.__skip_offsets):
+            self.__document_ids = ()
+            self.__term_frequencies = ()
+            return False
+        count = min(self.__skip_interval, self.__length - block * self.__skip_interval)
+        (self.__document_ids, self.__term_frequencies, _) = self.__decoder(
+            self.__data, self.__skip_offsets[block], count, self.__skip_document_ids[block]
+        )
+        return True
+
+
+class CompressedInMemoryPostingList(PostingList):
+    """
+    A simple in-memory implementation of a compressed posting list. Combines simple gap encoding
+    with variable-byte encoding.
+
+    The postings are grouped into fixed-size blocks, and a skip table records where each block
+    starts. That way an iterator can jump ahead to a given document identifier without decoding
+    all the postings in between. See Section 2.3 in https://nlp.stanford.edu/IR-book/pdf/02voc.pdf.
+    """
+
+    def __init__(self, skip_interval: int = 128):
+        assert skip_interval > 0
+        self.__logical_length = 0  # The number of posting entries encoded in the byte array.
+        self.__previous_document_id = 0  # So that we can gap encode.
+        self.__data = bytearray()  # All posting entries, compressed.
+        self.__skip_interval = skip_interval  # The number of postings between skip table entries.
+        self.__skip_document_ids = array("I")  # The skip table, part 1: What the block's gaps are relative to.
+        self.__skip_offsets = array("I")  # The skip table, part 2: Where the block starts in the byte array.
+        self.__block_max_term_frequencies = array("I")  # The skip table, part 3: The block's largest term frequency.
+
+    def get_length(self) -> int:
+        return self.__logical_length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        return BlockPostingListIterator(
+            self.__data,
+            self.__logical_length,
+            self.__skip_interval,
+            self.__skip_document_ids,
+            self.__skip_offsets,
+            self.__block_max_term_frequencies,
+            self.__previous_document_id,
+            VariableByteCodec.decode_postings,
+        )
+
+    def append_posting(self, posting: Posting) -> None:
+        assert self.__logical_length == 0 or posting.document_id > self.__previous_document_id
+        if self.__logical_length % self.__skip_interval == 0:
+            # Every block is decodable on its own, so that we can jump straight to it.
+            self.__skip_document_ids.append(self.__previous_document_id)
+            self.__skip_offsets.append(len(self.__data))
+            self.__block_max_term_frequencies.append(posting.term_frequency)
+        elif self.__block_max_term_frequencies[-1] < posting.term_frequency:
+            self.__block_max_term_frequencies[-1] = posting.term_frequency
+        gap = posting.document_id - self.__previous_document_id
+        VariableByteCodec.encode_many((gap, posting.term_frequency), self.__data)
+        self.__logical_length += 1
+        self.__previous_document_id = posting.document_id
+
+    def finalize_postings(self) -> None:
+        pass
+
+
+class BlockCompressedPostingList(PostingList):
+    """
+    An in-memory implementation of a compressed posting list, where the postings are packed into
+    fixed-size blocks. Within a block, gaps and term frequencies are encoded using patched frame-of-reference
+    encoding. Compared to variable-byte encoding, dense posting lists compress better and a block decodes
+    in a handful of array operations instead of in a loop over every byte.
+
+    Postings are buffered until a full block is available, so finalize_postings must be invoked before
+    the posting list can be iterated over.
+    """
+
+    def __init__(self, block_size: int = 128):
+        assert block_size > 0
+        self.__logical_length = 0  # The number of postings appended, including the ones not yet encoded.
+        self.__previous_document_id = 0  # The last document identifier in the last encoded block.
+        self.__data = bytearray()  # All encoded blocks.
+        self.__block_size = block_size  # The number of postings per block. The last block might have fewer.
+        self.__skip_document_ids = array("I")  # The skip table, part 1: What the block's gaps are relative to.
+        self.__skip_offsets = array("I")  # The skip table, part 2: Where the block starts in the byte array.
+        self.__block_max_term_frequencies = array("I")  # The skip table, part 3: The block's largest term frequency.
+        self.__pending_document_ids = array("I")  # Postings waiting for their block to fill up, part 1.
+        self.__pending_term_frequencies = array("I")  # Postings waiting for their block to fill up, part 2.
+        self.__finalized = False  # Once the last block has been encoded, the list is immutable.
+
+    def get_length(self) -> int:
+        return self.__logical_length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        assert self.__finalized or self.__logical_length == 0, "Invoke finalize_postings before iterating"
+        return BlockPostingListIterator(
+            self.__data,
+            self.__logical_length,
+            self.__block_size,
+            self.__skip_document_ids,
+            self.__skip_offsets,
+            self.__block_max_term_frequencies,
+            self.__previous_document_id,
+            FrameOfReferenceCodec.decode_postings,
+        )
+
+    def append_posting(self, posting: Posting) -> None:
+        assert not self.__finalized
+        assert self.__logical_length == 0 or posting.document_id > (
+            self.__pending_document_ids[-1] if self.__pending_document_ids else self.__previous_document_id
+        )
+        self.__pending_document_ids.append(posting.document_id)
+        self.__pending_term_frequencies.append(posting.term_frequency)
+        self.__logical_length += 1
+        if len(self.__pending_document_ids) == self.__block_size:
+            self.__encode_block()
+
+    def finalize_postings(self) -> None:
+        if self.__pending_document_ids:
+            self.__encode_block()
+        self.__finalized = True
+
+    def __encode_block(self) -> None:
+        """
+        Encodes the pending postings as a new block, and records the block in the skip table.
+        """
+        self.__skip_document_ids.append(self.__previous_document_id)
+        self.__skip_offsets.append(len(self.__data))
+        self.__block_max_term_frequencies.append(max(self.__pending_term_frequencies))
+        FrameOfReferenceCodec.encode_postings(
+            self.__pending_document_ids, self.__pending_term_frequencies, self.__previous_document_id, self.__data
+        )
+        self.__previous_document_id = self.__pending_document_ids[-1]
+        del self.__pending_document_ids[:]
+        del self.__pending_term_frequencies[:]
+
+
+class PositionalPostingList(PostingList):
+    """
+    An in-memory implementation of a posting list for a positional inverted index. The postings
+    are stored column-wise like in InMemoryPostingList, and the positions of each posting are gap
+    encoded and compressed using variable-byte encoding.
+
+    The postings appended to the posting list need to be positional postings, and the postings
+    yielded when iterating over the posting list are positional postings. The positions of a posting
+    are only decoded if they are asked for, so that positional indexes are about as fast as ordinary
+    ones for queries that don't involve phrases.
+    """
+
+    class LazyPositionalPosting(PositionalPosting):
+        """
+        A positional posting that knows where in the positions buffer its positions are, and decodes
+        them the first time they are asked for.
+        """
+
+        __slots__ = ("__buffer", "__offset", "__positions")
+
+        def __init__(self, document_id: int, term_frequency: int, buffer: bytearray, offset: int):
+            Posting.__init__(self, document_id, term_frequency)
+            self.__buffer = buffer  # The compressed positions of all postings in the posting list.
+            self.__offset = offset  # Where in the buffer our positions start.
+            self.__positions = None  # Our positions, once decoded.
+
+        @property
+        def positions(self) -> Sequence[int]:
+            if self.__positions is None:
+                (gaps, _) = VariableByteCodec.decode_many(self.__buffer, self.__offset, self.term_frequency)
+                self.__positions = array("I", accumulate(gaps))
+            return self.__positions
+
+        def __reduce__(self):
+            # Pickled as an ordinary positional posting, rather than along with the whole buffer.
+            return (PositionalPosting, (self.document_id, self.term_frequency, self.positions))
+
+    class PositionalPostingListIterator(Iterator[PositionalPosting]):
+        """
+        A custom iterator that creates posting objects from the underlying arrays as we traverse
+        them. The positions of each posting are left to be decoded by the posting itself.
+        """
+
+        def __init__(self, document_ids: array, term_frequencies: array, offsets: array, positions: bytearray):
+            self.__document_ids = document_ids  # Sorted document identifiers.
+            self.__term_frequencies = term_frequencies  # Corresponding term frequencies.
+            self.__offsets = offsets  # Where in the positions buffer the posting's positions start.
+            self.__positions = positions  # The compressed positions of all postings.
+            self.__index = 0  # Our current position in the arrays.
+
+        def __next__(self) -> PositionalPosting:
+            index = self.__index
+            if index == len(self.__document_ids):
+                raise StopIteration
+            self.__index += 1
+            return PositionalPostingList.LazyPositionalPosting(
+                self.__document_ids[index], self.__term_frequencies[index], self.__positions, self.__offsets[index]
+            )
+
+        def advance_to(self, document_id: int) -> Optional[PositionalPosting]:
+            """
+            Skips forward to the first remaining posting having a document identifier that is at least
+            as large as the given one, and returns that posting. Returns None if there is no such posting.
+            """
+            self.__index = bisect_left(self.__document_ids, document_id, self.__index)
+            return next(self, None)
+
+        def next_batch(self) -> Tuple[array, array]:
+            """
+            Returns the document identifiers and term frequencies of all the remaining postings, but not
+            their positions, and moves past them. Returns empty arrays once we're exhausted. Lets clients
+            consume the posting list in bulk instead of a posting at a time.
+            """
+            index = self.__index
+            self.__index = len(self.__document_ids)
+            return (self.__document_ids[index:], self.__term_frequencies[index:])
+
+    def __init__(self):
+        self.__document_ids = array("I")
+        self.__term_frequencies = array("I")
+        self.__offsets = array("I")
+        self.__positions = bytearray()
+
+    def get_length(self) -> int:
+        return len(self.__document_ids)
+
+    def get_iterator(self) -> Iterator[PositionalPosting]:
+        return __class__.PositionalPostingListIterator(
+            self.__document_ids, self.__term_frequencies, self.__offsets, self.__positions
+        )
+
+    def append_posting(self, posting: PositionalPosting) -> None:
+        assert len(self.__document_ids) == 0 or self.__document_ids[-1] < posting.document_id
+        assert len(posting.positions) == posting.term_frequency
+        self.__document_ids.append(posting.document_id)
+        self.__term_frequencies.append(posting.term_frequency)
+        self.__offsets.append(len(self.__positions))
+        gaps = (b - a for (a, b) in zip([0, *posting.positions], posting.positions))
+        VariableByteCodec.encode_many(gaps, self.__positions)
+
+    def finalize_postings(self) -> None:
+        pass
+
+
+class DiskPostingList(PostingList):
+    """
+    A read-only posting list whose compressed postings reside in a buffer that we don't own,
+    typically a memory-mapped file. The posting list is a view into the buffer given an offset
+    and a length, and the postings are decoded straight from the buffer without first copying
+    the bytes. That way the operating system's page cache does the caching, and several processes
+    mapping the same file share one physical copy of it.
+
+    The layout of a posting list in the buffer is:
+
+        <codec> <length> <block size> <block count> <last document id>
+        (<skip document id gap> <skip offset gap> <block max term frequency>)* <blocks>
+
+    All header fields are variable-byte encoded. The skip table is gap encoded where it makes sense,
+    and the offsets are relative to where the blocks start. The blocks are encoded using either variable-byte
+    encoding or patched frame-of-reference encoding, as in the corresponding in-memory posting
+    lists. Use DiskPostingList.write to produce this layout.
+    """
+
+    # Maps a codec name to how the codec is identified in the layout, and how to decode a block.
+    __CODECS = {
+        "vb": (0, VariableByteCodec.decode_postings),
+        "block": (1, FrameOfReferenceCodec.decode_postings),
+    }
+
+    def __init__(self, buffer: bytes, offset: int, length: int):
+        self.__buffer = memoryview(buffer)[offset : offset + length]  # A view, not a copy.
+        (header, self.__where) = VariableByteCodec.decode_many(self.__buffer, 0, 5)
+        (codec, self.__length, self.__block_size, self.__block_count, self.__last_document_id) = header
+        self.__decoder = next(d for (c, d) in self.__CODECS.values() if c == codec)
+        self.__skip_document_ids = None  # The skip table is decoded on first use.
+        self.__skip_offsets = None  # The skip table is decoded on first use.
+        self.__block_max_term_frequencies = None  # The skip table is decoded on first use.
+        self.__data = None  # A view of the blocks, once we know where they start.
+
+    def get_length(self) -> int:
+        return self.__length
+
+    def get_iterator(self) -> Iterator[Posting]:
+        if self.__data is None:
+            (skip_table, increment) = VariableByteCodec.decode_many(self.__buffer, self.__where, 3 * self.__block_count)
+            self.__skip_document_ids = array("I", accumulate(skip_table[0::3]))
+            self.__skip_offsets = array("I", accumulate(skip_table[1::3]))
+            self.__block_max_term_frequencies = skip_table[2::3]
+            self.__data = self.__buffer[self.__where + increment :]
+        return BlockPostingListIterator(
+            self.__data,
+            self.__length,
+            self.__block_size,
+            self.__skip_document_ids,
+            self.__skip_offsets,
+            self.__block_max_term_frequencies,
+            self.__last_document_id,
+            self.__decoder,
+        )
+
+    def append_posting(self, posting: Posting) -> None:
+        raise NotImplementedError("Disk posting lists are read-only, use DiskPostingList.write")
+
+    def finalize_postings(self) -> None:
+        pass
+
+    @staticmethod
+    def write(postings: Iterable[Posting], destination: BinaryIO, codec: str = "vb", block_size: int = 128) -> int:
+        """
+        Encodes the given postings using the named codec ("vb" or "block"), and writes the resulting
+        posting list to the given binary stream. Returns the number of bytes written.
+        """
+        assert block_size > 0
+        if codec not in __class__.__CODECS:
+            raise ValueError(f"Unsupported codec: {codec}")
+        postings = iter(postings)
+        data = bytearray()
+        skip_table = []  # Interleaved (document identifier gap, offset gap, max term frequency) triples.
+        (skip_document_id, skip_offset) = (0, 0)
+        previous_document_id = 0
+        length = 0
+        while True:
+            block = list(islice(postings, block_size))
+            if not block:
+                break
+            document_ids = [p.document_id for p in block]
+            term_frequencies = [p.term_frequency for p in block]
+            assert length == 0 or previous_document_id < document_ids[0]
+            skip_table.extend((previous_document_id - skip_document_id, len(data) - skip_offset, max(term_frequencies)))
+            (skip_document_id, skip_offset) = (previous_document_id, len(data))
+            if codec == "vb":
+                gaps = (b - a for (a, b) in zip([previous_document_id, *document_ids], document_ids))
+                VariableByteCodec.encode_many((n for pair in zip(gaps, term_frequencies) for n in pair), data)
+            else:
+                FrameOfReferenceCodec.encode_postings(document_ids, term_frequencies, previous_document_id, data)
+            previous_document_id = document_ids[-1]
+            length += len(block)
+        header = bytearray()
+        VariableByteCodec.encode_many(
+            (__class__.__CODECS[codec][0], length, block_size, len(skip_table) // 3, previous_document_id), header
+        )
+        VariableByteCodec.encode_many(skip_table, header)
+        destination.write(header)
+        destination.write(data)
+        return len(header) + len(data)
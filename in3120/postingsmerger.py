@@ -1,71 +1,178 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from typing import Iterator
-from .posting import Posting
-
-
-class PostingsMerger:
-    """
-    Utility class for merging posting lists.
-    """
-
-    @staticmethod
-    def intersection(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
-        """
-        A generator that yields a simple AND of two posting lists, given
-        iterators over these.
-
-        The posting lists are assumed sorted in increasing order according
-        to the document identifiers.
-        """
-        list1 = next(p1, None)
-        list2 = next(p2, None)
-
-        while list1 and list2:
-
-            if list1.document_id == list2.document_id:
-                yield list1
-                list1 = next(p1, None)
-                list2 = next(p2, None)
-
-            elif list1.document_id < list2.document_id:
-                list1 = next(p1, None)
-
-            else:
-                list2 = next(p2, None)
-
-
-    @staticmethod
-    def union(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
-        """
-        A generator that yields a simple OR of two posting lists, given
-        iterators over these.
-
-        The posting lists are assumed sorted in increasing order according
-        to the document identifiers.
-        
-        """
-        list1 = next(p1, None)
-        list2 = next(p2, None)
-
-        while list1 and list2:
-
-            if list1.document_id == list2.document_id:
-                yield list1
-                list1 = next(p1, None)
-                list2 = next(p2, None)
-            elif list1.document_id < list2.document_id:
-                yield list1
-                list1 = next(p1, None)
-            else:
-                yield list2
-                list2 = next(p2, None)
-
-        while list1:
-            yield list1
-            list1 = next(p1, None)
-
-        while list2:
-            yield list2
-            list2 = next(p2, None)
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Optional
+from .posting import Posting, PositionalPosting
+
+
+class PostingsMerger:
+    """
+    Utility class for merging posting lists.
+    """
+
+    @staticmethod
+    def intersection(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        A generator that yields a simple AND of two posting lists, given
+        iterators over these.
+
+        The posting lists are assumed sorted in increasing order according
+        to the document identifiers.
+        """
+        list1 = next(p1, None)
+        list2 = next(p2, None)
+
+        while list1 and list2:
+
+            if list1.document_id == list2.document_id:
+                yield list1
+                list1 = next(p1, None)
+                list2 = next(p2, None)
+
+            elif list1.document_id < list2.document_id:
+                list1 = __class__.advance(p1, list2.document_id)
+
+            else:
+                list2 = __class__.advance(p2, list1.document_id)
+
+
+    @staticmethod
+    def advance(p: Iterator[Posting], document_id: int) -> Optional[Posting]:
+        """
+        Consumes postings from the given posting list iterator until we reach a posting
+        having a document identifier that is at least as large as the given one, and returns
+        that posting. Returns None if the iterator runs out of postings first.
+
+        Iterators that support skipping get to do so. That way, intersecting a short posting
+        list with a long one costs time proportional to the length of the short one.
+        """
+        advance_to = getattr(p, "advance_to", None)
+        if advance_to:
+            return advance_to(document_id)
+        posting = next(p, None)
+        while posting and posting.document_id < document_id:
+            posting = next(p, None)
+        return posting
+
+    @staticmethod
+    def union(p1: Iterator[Posting], p2: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        A generator that yields a simple OR of two posting lists, given
+        iterators over these.
+
+        The posting lists are assumed sorted in increasing order according
+        to the document identifiers.
+        
+        """
+        list1 = next(p1, None)
+        list2 = next(p2, None)
+
+        while list1 and list2:
+
+            if list1.document_id == list2.document_id:
+                yield list1
+                list1 = next(p1, None)
+                list2 = next(p2, None)
+            elif list1.document_id < list2.document_id:
+                yield list1
+                list1 = next(p1, None)
+            else:
+                yield list2
+                list2 = next(p2, None)
+
+        while list1:
+            yield list1
+            list1 = next(p1, None)
+
+        while list2:
+            yield list2
+            list2 = next(p2, None)
+
+    @staticmethod
+    def union_many(postings: List[Iterator[Posting]]) -> Iterator[Posting]:
+        """
+        A generator that yields an OR of any number of posting lists, given iterators over these,
+        e.g., the posting lists of all the terms that a wildcard term expands to.
+
+        The posting lists are merged lazily using a heap keyed on document identifiers, so that
+        the cost per posting is logarithmic in the number of posting lists. Postings for the same
+        document are combined into one, whose term frequency is the sum of theirs.
+        """
+        merged = heapq.merge(*postings, key=lambda p: p.document_id)
+        posting = next(merged, None)
+        while posting:
+            document_id = posting.document_id
+            term_frequency = 0
+            while posting and posting.document_id == document_id:
+                term_frequency += posting.term_frequency
+                posting = next(merged, None)
+            yield Posting(document_id, term_frequency)
+
+    @staticmethod
+    def phrase(postings: List[Iterator[PositionalPosting]]) -> Iterator[PositionalPosting]:
+        """
+        A generator that yields the documents where the terms occur as a phrase, i.e., in
+        the given order at consecutive positions, given iterators over the terms' positional
+        posting lists.
+
+        The yielded postings record where the phrase starts in the document, and the term
+        frequency is the number of times the phrase occurs in the document.
+
+        The posting lists are assumed sorted in increasing order according
+        to the document identifiers.
+        """
+        assert len(postings) > 0
+        current = [next(p, None) for p in postings]
+
+        while all(current):
+            document_id = max(c.document_id for c in current)
+
+            if all(c.document_id == document_id for c in current):
+                starts = set(current[0].positions)
+                for (offset, posting) in enumerate(current[1:], 1):
+                    starts.intersection_update(position - offset for position in posting.positions)
+                if starts:
+                    yield PositionalPosting(document_id, len(starts), sorted(starts))
+                current = [next(p, None) for p in postings]
+
+            else:
+                current = [c if c.document_id == document_id else __class__.advance(p, document_id) for (c, p) in zip(current, postings)]
+
+    @staticmethod
+    def proximity(p1: Iterator[PositionalPosting], p2: Iterator[PositionalPosting], window: int) -> Iterator[PositionalPosting]:
+        """
+        A generator that yields the documents where the two terms occur within the given
+        number of positions of each other, in any order, given iterators over the terms'
+        positional posting lists. See Figure 2.12 in https://nlp.stanford.edu/IR-book/pdf/02voc.pdf.
+
+        The yielded postings record the positions of the first term that have the second
+        term nearby, and the term frequency is the number of such positions.
+
+        The posting lists are assumed sorted in increasing order according
+        to the document identifiers.
+        """
+        assert window > 0
+        list1 = next(p1, None)
+        list2 = next(p2, None)
+
+        while list1 and list2:
+
+            if list1.document_id == list2.document_id:
+                positions2 = list2.positions
+                positions = [
+                    position
+                    for position in list1.positions
+                    if bisect_left(positions2, position - window) < bisect_right(positions2, position + window)
+                ]
+                if positions:
+                    yield PositionalPosting(list1.document_id, len(positions), positions)
+                list1 = next(p1, None)
+                list2 = next(p2, None)
+
+            elif list1.document_id < list2.document_id:
+                list1 = __class__.advance(p1, list2.document_id)
+
+            else:
+                list2 = __class__.advance(p2, list1.document_id)
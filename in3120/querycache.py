@@ -0,0 +1,109 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+
+class QueryCache:
+    """
+    A bounded cache of query results, to sit in front of a search engine. Query logs are typically
+    heavily skewed, so caching the results of the most frequent queries saves a lot of evaluation.
+
+    The least recently used entry is evicted when the cache is full, and entries can optionally
+    expire after a given number of seconds. The cached results are only valid for the contents
+    of the index they were computed from, so the cache is tagged with the index's generation.
+    If the generation changes, all entries are invalidated.
+
+    The cache doesn't know what its keys mean, so a cache should be used by a single search
+    engine only. It can be shared between threads.
+    """
+
+    def __init__(self, capacity: int = 1000, ttl: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        assert capacity > 0
+        assert ttl is None or ttl > 0
+        self.__capacity = capacity  # The maximum number of entries.
+        self.__ttl = ttl  # How many seconds an entry lives, if not forever.
+        self.__clock = clock  # Tells the time, for expiring entries.
+        self.__entries: OrderedDict = OrderedDict()  # Maps keys to (expiry time, results), least recently used first.
+        self.__generation = None  # The generation of the index that the entries are valid for.
+        self.__hits = 0
+        self.__misses = 0
+        self.__lock = threading.Lock()
+
+    def __getstate__(self):
+        # Locks can't be pickled, so a copy of the cache gets a lock of its own.
+        state = self.__dict__.copy()
+        del state["_QueryCache__lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key: Hashable, generation: int = 0) -> Optional[List[Tuple[Any, Any]]]:
+        """
+        Returns the cached results for the given key, or None if there are no valid cached results.
+        The generation is that of the index the client would evaluate the query against.
+        """
+        with self.__lock:
+            self.__validate(generation)
+            entry = self.__entries.get(key)
+            if entry is not None and entry[0] is not None and entry[0] <= self.__clock():
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, results: List[Tuple[Any, Any]], generation: int = 0) -> None:
+        """
+        Caches the given results for the given key, evicting the least recently used entry if the
+        cache is full. The generation is that of the index the results were computed from, as seen
+        before the query was evaluated. Generations are assumed to increase, so results computed from
+        an index that has since changed are not cached.
+        """
+        with self.__lock:
+            if self.__generation is not None and generation < self.__generation:
+                return
+            self.__validate(generation)
+            expiry = None if self.__ttl is None else self.__clock() + self.__ttl
+            self.__entries[key] = (expiry, results)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__capacity:
+                self.__entries.popitem(last=False)
+
+    def __validate(self, generation: int) -> None:
+        """
+        Drops all entries if the index has changed since they were cached. Assumes that the lock is held.
+        """
+        if generation != self.__generation:
+            self.__entries.clear()
+            self.__generation = generation
+
+    def clear(self) -> None:
+        """
+        Drops all entries. The hit and miss counts are kept.
+        """
+        with self.__lock:
+            self.__entries.clear()
+
+    def get_hit_count(self) -> int:
+        """
+        Returns the number of lookups that were served from the cache.
+        """
+        return self.__hits
+
+    def get_miss_count(self) -> int:
+        """
+        Returns the number of lookups that weren't served from the cache.
+        """
+        return self.__misses
@@ -0,0 +1,213 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import time
+from typing import Any, Dict, Iterator, Optional, Tuple
+from .posting import Posting
+from .ranker import Ranker
+from .sieve import Sieve, Number
+
+
+class QueryTrace:
+    """
+    Collects statistics about how a single query was evaluated, for finding out why a query is slow.
+
+    We record the time spent in each phase of the evaluation, i.e., in processing the query terms,
+    in traversing the posting lists, in ranking documents and in selecting the best ones via a sieve,
+    as well as the total time. We also count the postings we get from the posting lists, the candidates,
+    i.e., the distinct documents that the traversal lands on, the documents the ranker scores, and how
+    many times the sieve's worst of the best is replaced by a better document.
+
+    The statistics are gathered by wrapping the posting lists, the ranker and the sieve that the search
+    engine uses, so nothing is measured unless tracing is asked for. Note that the time it takes to
+    measure is included in the timings, so these are best compared relative to each other.
+    """
+
+    # The phases of query evaluation that we time.
+    PHASES = ("term_processing", "postings_traversal", "ranking", "sieve_selection")
+
+    class TracedPostings(Iterator[Posting]):
+        """
+        Wraps a posting list iterator, and counts and times the postings we get from it. Whatever
+        else the wrapped iterator supports, e.g., skipping via advance_to, is passed on.
+        """
+
+        def __init__(self, postings: Iterator[Posting], trace: "QueryTrace"):
+            self.__postings = postings
+            self.__trace = trace
+
+        def __next__(self) -> Posting:
+            start = time.perf_counter()
+            try:
+                posting = next(self.__postings)
+            finally:
+                self.__trace.add_time("postings_traversal", time.perf_counter() - start)
+            self.__trace.see(posting)
+            return posting
+
+        def __getattr__(self, name: str) -> Any:
+            attribute = getattr(self.__postings, name)
+            if name == "advance_to":
+                return self.__advance_to
+            if name == "next_batch":
+                return self.__next_batch
+            return attribute
+
+        def __advance_to(self, document_id: int) -> Optional[Posting]:
+            start = time.perf_counter()
+            posting = self.__postings.advance_to(document_id)
+            self.__trace.add_time("postings_traversal", time.perf_counter() - start)
+            if posting is not None:
+                self.__trace.see(posting)
+            return posting
+
+        def __next_batch(self):
+            start = time.perf_counter()
+            (document_ids, term_frequencies) = self.__postings.next_batch()
+            self.__trace.add_time("postings_traversal", time.perf_counter() - start)
+            self.__trace.see_many(document_ids)
+            return (document_ids, term_frequencies)
+
+    class TracedRanker(Ranker):
+        """
+        Wraps a ranker, and counts and times the documents it scores.
+        """
+
+        def __init__(self, ranker: Ranker, trace: "QueryTrace"):
+            self.__ranker = ranker
+            self.__trace = trace
+
+        def reset(self, document_id: int) -> None:
+            start = time.perf_counter()
+            self.__ranker.reset(document_id)
+            self.__trace.add_time("ranking", time.perf_counter() - start)
+
+        def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+            start = time.perf_counter()
+            self.__ranker.update(term, multiplicity, posting)
+            self.__trace.add_time("ranking", time.perf_counter() - start)
+
+        def evaluate(self) -> float:
+            start = time.perf_counter()
+            score = self.__ranker.evaluate()
+            self.__trace.add_time("ranking", time.perf_counter() - start)
+            self.__trace.add_count("documents_scored")
+            return score
+
+        def upper_bound(self, term: str, multiplicity: int, term_frequency: int) -> float:
+            return self.__ranker.upper_bound(term, multiplicity, term_frequency)
+
+        def static_upper_bound(self) -> float:
+            return self.__ranker.static_upper_bound()
+
+        def term_weight(self, term: str, multiplicity: int) -> float:
+            return self.__ranker.term_weight(term, multiplicity)
+
+        def static_score(self, document_id: int) -> float:
+            # Used for term-at-a-time evaluation, where that's when a document gets its final score.
+            start = time.perf_counter()
+            score = self.__ranker.static_score(document_id)
+            self.__trace.add_time("ranking", time.perf_counter() - start)
+            self.__trace.add_count("documents_scored")
+            return score
+
+    class TracedSieve(Sieve):
+        """
+        A sieve that counts and times what gets sifted through it.
+        """
+
+        def __init__(self, size: int, after: Optional[Tuple[Number, Any]], trace: "QueryTrace"):
+            super().__init__(size, after)
+            self.__trace = trace
+
+        def sift(self, score: Number, item: Any) -> bool:
+            start = time.perf_counter()
+            full = self.threshold() != -math.inf
+            sifted = super().sift(score, item)
+            self.__trace.add_time("sieve_selection", time.perf_counter() - start)
+            if sifted and full:
+                self.__trace.add_count("sieve_replacements")
+            return sifted
+
+        def winners(self) -> Iterator[Tuple[Number, Any]]:
+            start = time.perf_counter()
+            winners = list(super().winners())
+            self.__trace.add_time("sieve_selection", time.perf_counter() - start)
+            return iter(winners)
+
+    def __init__(self, query: str, options: dict):
+        self.__query = query
+        self.__options = {k: v for (k, v) in options.items() if k != "debug"}
+        self.__timings = {phase: 0.0 for phase in __class__.PHASES}  # Seconds spent per phase.
+        self.__counts = {"postings_decoded": 0, "documents_scored": 0, "sieve_replacements": 0}
+        self.__candidates = set()  # The distinct documents seen so far.
+        self.__cached = False  # Whether the results came from a cache.
+        self.__results = None  # The number of results, once known.
+        self.__start = time.perf_counter()
+        self.__total = None  # Seconds spent in total, once done.
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """
+        Adds to the time spent in the given phase of query evaluation.
+        """
+        self.__timings[phase] += seconds
+
+    def add_count(self, name: str, count: int = 1) -> None:
+        """
+        Adds to the given counter.
+        """
+        self.__counts[name] += count
+
+    def see(self, posting: Posting) -> None:
+        """
+        Records that we've got the given posting from a posting list.
+        """
+        self.__counts["postings_decoded"] += 1
+        self.__candidates.add(posting.document_id)
+
+    def see_many(self, document_ids) -> None:
+        """
+        Records that we've got postings for the given documents from a posting list, in bulk.
+        """
+        self.__counts["postings_decoded"] += len(document_ids)
+        self.__candidates.update(int(d) for d in document_ids)
+
+    def postings(self, postings: Iterator[Posting]) -> Iterator[Posting]:
+        """
+        Returns the given posting list iterator wrapped so that it's traced.
+        """
+        return __class__.TracedPostings(postings, self)
+
+    def ranker(self, ranker: Ranker) -> Ranker:
+        """
+        Returns the given ranker wrapped so that it's traced.
+        """
+        return __class__.TracedRanker(ranker, self)
+
+    def sieve(self, size: int, after: Optional[Tuple[Number, Any]] = None) -> Sieve:
+        """
+        Returns a new sieve that's traced.
+        """
+        return __class__.TracedSieve(size, after, self)
+
+    def finish(self, results: int, cached: bool = False) -> None:
+        """
+        Records that the evaluation is done, having found the given number of results, possibly from a cache.
+        """
+        self.__total = time.perf_counter() - self.__start
+        self.__results = results
+        self.__cached = cached
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the trace as a dictionary of plain values, e.g., for logging it as JSON. Timings are in seconds.
+        """
+        return {
+            "query": self.__query,
+            "options": self.__options,
+            "cached": self.__cached,
+            "results": self.__results,
+            "timings": {**self.__timings, "total": self.__total},
+            "counts": {**self.__counts, "candidates": len(self.__candidates)},
+        }
@@ -1,58 +1,101 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from abc import ABC, abstractmethod
-from .posting import Posting
-
-
-class Ranker(ABC):
-    """
-    Abstract base class for rankers used together with document-at-a-time traversal.
-    """
-
-    @abstractmethod
-    def reset(self, document_id: int) -> None:
-        """
-        Resets the ranker, i.e., prepares it for evaluating another document.
-        """
-        pass
-
-    @abstractmethod
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
-        """
-        Tells the ranker to update its internals based on information from one
-        query term and the associated posting. This method might be invoked multiple
-        times if the query contains multiple unique terms. Since a query term might
-        occur multiple times in a query, the query term's multiplicity or occurrence
-        count in the query is also provided.
-        """
-        pass
-
-    @abstractmethod
-    def evaluate(self) -> float:
-        """
-        Returns the current document's relevancy score. I.e., evaluates how relevant
-        the current document is, given all the previous update invocations.
-        """
-        pass
-
-
-class BrainDeadRanker(Ranker):
-    """
-    A dead simple ranker.
-    """
-
-    def __init__(self):
-        self.__document_id = None
-        self.__score = 0.0
-
-    def reset(self, document_id: int) -> None:
-        self.__document_id = document_id
-        self.__score = 0.0
-
-    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
-        assert self.__document_id == posting.document_id
-        self.__score += multiplicity * posting.term_frequency
-
-    def evaluate(self) -> float:
-        return self.__score
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+from abc import ABC, abstractmethod
+from .posting import Posting
+
+
+class Ranker(ABC):
+    """
+    Abstract base class for rankers used together with document-at-a-time traversal.
+    """
+
+    @abstractmethod
+    def reset(self, document_id: int) -> None:
+        """
+        Resets the ranker, i.e., prepares it for evaluating another document.
+        """
+        pass
+
+    @abstractmethod
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        """
+        Tells the ranker to update its internals based on information from one
+        query term and the associated posting. This method might be invoked multiple
+        times if the query contains multiple unique terms. Since a query term might
+        occur multiple times in a query, the query term's multiplicity or occurrence
+        count in the query is also provided.
+        """
+        pass
+
+    @abstractmethod
+    def evaluate(self) -> float:
+        """
+        Returns the current document's relevancy score. I.e., evaluates how relevant
+        the current document is, given all the previous update invocations.
+        """
+        pass
+
+    def upper_bound(self, term: str, multiplicity: int, term_frequency: int) -> float:
+        """
+        Returns an upper bound on how much one query term can contribute to a document's
+        relevancy score, given an upper bound on the term's frequency in the document. Used
+        for dynamic pruning, i.e., for skipping documents that can't make it into the top
+        results without fully evaluating them.
+
+        A document's score must never exceed the sum of the upper bounds for its query terms
+        plus the static upper bound. The default implementation returns infinity, which
+        effectively disables pruning.
+        """
+        return math.inf
+
+    def static_upper_bound(self) -> float:
+        """
+        Returns an upper bound on the query-independent part of any document's relevancy score.
+        See upper_bound.
+        """
+        return 0.0
+
+    def term_weight(self, term: str, multiplicity: int) -> float:
+        """
+        For rankers whose scores are a static score plus a weighted sum of the query terms' frequencies
+        in the document, returns the weight of the given query term. Used for term-at-a-time evaluation,
+        where the scores are computed in bulk rather than a posting at a time.
+
+        The default implementation raises NotImplementedError, i.e., the ranker doesn't support that.
+        """
+        raise NotImplementedError("This ranker doesn't support term-at-a-time evaluation")
+
+    def static_score(self, document_id: int) -> float:
+        """
+        Returns the query-independent part of the given document's relevancy score. See term_weight.
+        """
+        return 0.0
+
+
+class BrainDeadRanker(Ranker):
+    """
+    A dead simple ranker.
+    """
+
+    def __init__(self):
+        self.__document_id = None
+        self.__score = 0.0
+
+    def reset(self, document_id: int) -> None:
+        self.__document_id = document_id
+        self.__score = 0.0
+
+    def update(self, term: str, multiplicity: int, posting: Posting) -> None:
+        assert self.__document_id == posting.document_id
+        self.__score += multiplicity * posting.term_frequency
+
+    def evaluate(self) -> float:
+        return self.__score
+
+    def upper_bound(self, term: str, multiplicity: int, term_frequency: int) -> float:
+        return multiplicity * term_frequency
+
+    def term_weight(self, term: str, multiplicity: int) -> float:
+        return multiplicity
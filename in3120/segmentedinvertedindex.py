@@ -0,0 +1,436 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import math
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+from .document import Document
+from .invertedindex import InvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .postinglist import InMemoryPostingList
+from .postingsmerger import PostingsMerger
+from .termstatistics import TermStatistics
+from .tokenizer import Tokenizer
+
+
+class SegmentedInvertedIndex(InvertedIndex):
+    """
+    An inverted index that can be updated incrementally, suitable for corpora that keep changing
+    at a steady rate, where rebuilding the whole index for every change is not an option.
+
+    The index is a list of small immutable segments, each of which is a tiny inverted index over
+    a batch of documents. New documents are buffered in a writable segment, which is sealed when it
+    holds enough documents. Deleting a document never touches the posting lists. Instead, the
+    document is marked as deleted in a tombstone bitmap of the segment that holds it, and postings
+    for deleted documents are skipped when the posting lists are traversed. Replacing a document is
+    a deletion followed by an addition.
+
+    To keep the number of segments small, a merge policy combines segments in the background. The
+    policy is logarithmic: Segments are grouped into levels according to how many documents they
+    hold, and when a level has accumulated enough segments they are merged into one segment on the
+    next level. Postings for deleted documents are dropped when segments are merged, and segments
+    that have many deleted documents are merged on their own to reclaim the space.
+
+    Posting lists span all live segments, including the writable one, so that documents can be
+    searched for as soon as they are added. Each segment keeps its own term statistics, so that these
+    can be combined without touching the posting lists. Document frequencies and the other term
+    statistics include deleted documents that have not yet been merged away, as is common for
+    indexes of this kind.
+    """
+
+    class Segment:
+        """
+        A small inverted index over a batch of documents. While a segment is writable, documents can
+        be added in any order. A segment is immutable once it has been sealed, except for its tombstones.
+        """
+
+        def __init__(self):
+            self.posting_lists: Dict[str, Union[InMemoryPostingList, List[Posting]]] = {}  # The posting lists of the segment, by term.
+            self.statistics: Dict[str, List[int]] = {}  # The document frequency, collection frequency and maximum term frequency, by term.
+            self.document_ids = array("I")  # The documents in the segment, in ascending order once sealed.
+            self.tombstones = bytearray()  # Bit i is set if document i has been deleted from this segment.
+            self.deletions = 0  # How many of the documents in the segment that have been deleted.
+            self.sealed = False  # Whether the posting lists have been sorted and frozen.
+
+        def size(self) -> int:
+            """
+            Returns the number of documents in the segment, including deleted ones.
+            """
+            return len(self.document_ids)
+
+        def is_deleted(self, document_id: int) -> bool:
+            """
+            Returns True iff the given document has been marked as deleted in this segment.
+            """
+            byte = document_id >> 3
+            return byte < len(self.tombstones) and bool(self.tombstones[byte] & (1 << (document_id & 7)))
+
+        def delete(self, document_id: int) -> None:
+            """
+            Marks the given document as deleted in this segment.
+            """
+            if not self.is_deleted(document_id):
+                self.tombstones[document_id >> 3] |= 1 << (document_id & 7)
+                self.deletions += 1
+
+        def add(self, document_id: int, frequencies: Dict[str, int]) -> None:
+            """
+            Adds the postings for the given document to the segment, which must still be writable.
+            """
+            assert not self.sealed
+            self.document_ids.append(document_id)
+            for (term, frequency) in frequencies.items():
+                self.posting_lists.setdefault(term, []).append(Posting(document_id, frequency))
+                self.account(term, frequency)
+            if len(self.tombstones) <= document_id >> 3:
+                self.tombstones.extend(bytes((document_id >> 3) + 1 - len(self.tombstones)))
+
+        def account(self, term: str, frequency: int) -> None:
+            """
+            Updates the term's statistics in this segment with another posting having the given term frequency.
+            """
+            statistics = self.statistics.get(term)
+            if statistics is None:
+                self.statistics[term] = [1, frequency, frequency]
+            else:
+                statistics[0] += 1
+                statistics[1] += frequency
+                statistics[2] = max(statistics[2], frequency)
+
+        def seal(self) -> None:
+            """
+            Sorts the postings by document identifier, and freezes the segment.
+            """
+            assert not self.sealed
+            self.document_ids = array("I", sorted(self.document_ids))
+            for (term, postings) in self.posting_lists.items():
+                posting_list = InMemoryPostingList()
+                for posting in sorted(postings, key=lambda p: p.document_id):
+                    posting_list.append_posting(posting)
+                self.posting_lists[term] = posting_list
+            self.sealed = True
+
+        def get_postings_iterator(self, term: str) -> Optional[Iterator[Posting]]:
+            """
+            Returns an iterator over the postings for non-deleted documents in the term's posting
+            list in this segment, or None if the term doesn't occur in the segment.
+            """
+            posting_list = self.posting_lists.get(term)
+            if posting_list is None:
+                return None
+            if self.sealed:
+                postings = iter(posting_list)
+            else:
+                postings = iter(sorted(posting_list, key=lambda p: p.document_id))
+            if self.deletions == 0:
+                return postings
+            return SegmentedInvertedIndex.LivePostingsIterator(postings, self)
+
+    class LivePostingsIterator(Iterator[Posting]):
+        """
+        Wraps an iterator over a posting list in a segment, and skips postings for documents
+        that have been deleted.
+        """
+
+        def __init__(self, postings: Iterator[Posting], segment: "SegmentedInvertedIndex.Segment"):
+            self.__postings = postings
+            self.__segment = segment
+
+        def __next__(self) -> Posting:
+            posting = next(self.__postings)
+            while self.__segment.is_deleted(posting.document_id):
+                posting = next(self.__postings)
+            return posting
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips forward to the first remaining live posting having a document identifier that is at
+            least as large as the given one, and returns that posting. Returns None if there is no such posting.
+            """
+            posting = PostingsMerger.advance(self.__postings, document_id)
+            if posting and self.__segment.is_deleted(posting.document_id):
+                posting = next(self, None)
+            return posting
+
+    class MergedPostingsIterator(Iterator[Posting]):
+        """
+        Merges iterators over posting lists from several segments into one iterator, using a
+        heap keyed on document identifiers. A document is live in at most one segment, so the
+        merged iterator never yields the same document twice.
+        """
+
+        def __init__(self, iterators: List[Iterator[Posting]]):
+            self.__iterators = iterators
+            self.__heads = []  # The current posting of each iterator, as a heap of (document_id, iterator, posting).
+            for (i, iterator) in enumerate(iterators):
+                self.__push(i, next(iterator, None))
+
+        def __push(self, i: int, posting: Optional[Posting]) -> None:
+            if posting is not None:
+                heapq.heappush(self.__heads, (posting.document_id, i, posting))
+
+        def __next__(self) -> Posting:
+            if not self.__heads:
+                raise StopIteration
+            (_, i, posting) = self.__heads[0]
+            following = next(self.__iterators[i], None)
+            if following is None:
+                heapq.heappop(self.__heads)
+            else:
+                heapq.heapreplace(self.__heads, (following.document_id, i, following))
+            return posting
+
+        def advance_to(self, document_id: int) -> Optional[Posting]:
+            """
+            Skips forward to the first remaining posting having a document identifier that is at least
+            as large as the given one, and returns that posting. Returns None if there is no such posting.
+            """
+            while self.__heads and self.__heads[0][0] < document_id:
+                (_, i, _) = heapq.heappop(self.__heads)
+                self.__push(i, PostingsMerger.advance(self.__iterators[i], document_id))
+            return next(self, None)
+
+    def __init__(
+        self,
+        fields: Iterable[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        segment_size: int = 1000,
+        merge_factor: int = 10,
+        background: bool = True,
+    ):
+        assert segment_size > 0
+        assert merge_factor > 1
+        self.__fields = list(fields)
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__segment_size = segment_size  # Seal the writable segment when it holds this many documents.
+        self.__merge_factor = merge_factor  # Merge this many segments of the same level into one.
+        self.__segments: List[SegmentedInvertedIndex.Segment] = []  # The sealed segments, oldest first.
+        self.__writable = __class__.Segment()  # Where new documents go.
+        self.__live: Dict[int, SegmentedInvertedIndex.Segment] = {}  # Which segment holds each live document.
+        self.__lock = threading.Lock()  # Guards the segment list and the tombstones against the merger.
+        self.__merges = threading.Condition(self.__lock)  # Signalled when there might be something to merge.
+        self.__closed = False
+        self.__merger = None
+        self.__generation = 0  # Bumped whenever a document is added or deleted.
+        if background:
+            self.__merger = threading.Thread(target=self.__merge_in_background, daemon=True)
+            self.__merger.start()
+
+    def add_document(self, document: Document) -> None:
+        """
+        Indexes the named fields of the given document. If a document with the same identifier
+        is already in the index, that document is replaced.
+        """
+        terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in self.__fields)
+        frequencies = Counter(terms)
+        with self.__lock:
+            # A segment holds at most one version of a document.
+            if self.__live.get(document.document_id) is self.__writable or self.__writable.is_deleted(document.document_id):
+                self.__seal()
+            self.__delete(document.document_id)
+            self.__writable.add(document.document_id, frequencies)
+            self.__live[document.document_id] = self.__writable
+            self.__generation += 1
+            if self.__writable.size() >= self.__segment_size:
+                self.__seal()
+
+    def delete_document(self, document_id: int) -> bool:
+        """
+        Removes the identified document from the index. Returns True iff the document was in the index.
+        """
+        with self.__lock:
+            return self.__delete(document_id)
+
+    def __delete(self, document_id: int) -> bool:
+        """
+        Marks the identified document as deleted in the segment that holds it. Assumes that the lock is held.
+        """
+        segment = self.__live.pop(document_id, None)
+        if segment is None:
+            return False
+        segment.delete(document_id)
+        self.__generation += 1
+        if segment is not self.__writable:
+            self.__merges.notify()
+        return True
+
+    def __seal(self) -> None:
+        """
+        Seals the writable segment and starts a new one. Assumes that the lock is held.
+        """
+        if self.__writable.size() > 0:
+            self.__writable.seal()
+            self.__segments.append(self.__writable)
+            self.__writable = __class__.Segment()
+            self.__merges.notify()
+            if self.__merger is None:
+                self.__merge_all_selected()
+
+    def flush(self) -> None:
+        """
+        Seals the writable segment, so that it becomes eligible for merging.
+        """
+        with self.__lock:
+            self.__seal()
+
+    def get_segment_count(self) -> int:
+        """
+        Returns the number of non-empty segments, including the writable one.
+        """
+        with self.__lock:
+            return len(self.__segments) + (1 if self.__writable.size() else 0)
+
+    def __get_level(self, segment: "SegmentedInvertedIndex.Segment") -> int:
+        """
+        Returns which level of the merge policy the segment belongs on.
+        """
+        level = 0
+        size = self.__segment_size * self.__merge_factor
+        while segment.size() >= size:
+            level += 1
+            size *= self.__merge_factor
+        return level
+
+    def __select_merge(self) -> List["SegmentedInvertedIndex.Segment"]:
+        """
+        Applies the merge policy, and returns the segments that should be merged next. Returns an
+        empty list if there is nothing to merge. Assumes that the lock is held.
+        """
+        levels = {}
+        for segment in self.__segments:
+            if 2 * segment.deletions >= segment.size():
+                return [segment]
+            levels.setdefault(self.__get_level(segment), []).append(segment)
+        for level in sorted(levels):
+            if len(levels[level]) >= self.__merge_factor:
+                return levels[level][:self.__merge_factor]
+        return []
+
+    def __merge_segments(self, segments: List["SegmentedInvertedIndex.Segment"]) -> "SegmentedInvertedIndex.Segment":
+        """
+        Merges the given segments into a new segment, leaving out deleted documents. Does not
+        require the lock to be held, since sealed segments are immutable except for their
+        tombstones. Documents deleted while merging are dealt with when the merged segment is
+        installed.
+        """
+        merged = __class__.Segment()
+        merged.sealed = True
+        documents = heapq.merge(*(zip(s.document_ids, itertools.repeat(s)) for s in segments), key=lambda e: e[0])
+        merged.document_ids.extend(d for (d, s) in documents if not s.is_deleted(d))
+        terms = sorted(set(itertools.chain.from_iterable(s.posting_lists for s in segments)))
+        for term in terms:
+            iterators = [i for i in (s.get_postings_iterator(term) for s in segments) if i is not None]
+            posting_list = InMemoryPostingList()
+            for posting in heapq.merge(*iterators, key=lambda p: p.document_id):
+                posting_list.append_posting(posting)
+                merged.account(term, posting.term_frequency)
+            if posting_list.get_length() > 0:
+                merged.posting_lists[term] = posting_list
+        if merged.document_ids:
+            merged.tombstones.extend(bytes((merged.document_ids[-1] >> 3) + 1))
+        return merged
+
+    def __install(self, segments: List["SegmentedInvertedIndex.Segment"], merged: "SegmentedInvertedIndex.Segment") -> None:
+        """
+        Replaces the given segments with the segment they were merged into. Documents that were
+        deleted or replaced while the segments were being merged are marked as deleted in the
+        merged segment. Assumes that the lock is held.
+        """
+        sources = set(map(id, segments))
+        for document_id in merged.document_ids:
+            if id(self.__live.get(document_id)) in sources:
+                self.__live[document_id] = merged
+            else:
+                merged.delete(document_id)
+        position = self.__segments.index(segments[0])
+        self.__segments = [s for s in self.__segments if id(s) not in sources]
+        if merged.size() > merged.deletions:
+            self.__segments.insert(position, merged)
+
+    def __merge_all_selected(self) -> None:
+        """
+        Merges segments synchronously, for as long as the merge policy selects something to
+        merge. Assumes that the lock is held.
+        """
+        segments = self.__select_merge()
+        while segments:
+            self.__install(segments, self.__merge_segments(segments))
+            segments = self.__select_merge()
+
+    def __merge_in_background(self) -> None:
+        """
+        The body of the background merge thread. Waits until the merge policy selects something
+        to merge, and then merges it without holding the lock while doing so.
+        """
+        with self.__lock:
+            while not self.__closed:
+                segments = self.__select_merge()
+                if not segments:
+                    self.__merges.wait()
+                    continue
+                self.__lock.release()
+                try:
+                    merged = self.__merge_segments(segments)
+                finally:
+                    self.__lock.acquire()
+                self.__install(segments, merged)
+
+    def close(self) -> None:
+        """
+        Stops the background merge thread, if any. Any merge in progress is completed first.
+        """
+        with self.__lock:
+            self.__closed = True
+            self.__merges.notify()
+        if self.__merger is not None:
+            self.__merger.join()
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        with self.__lock:
+            segments = [*self.__segments, self.__writable]
+            iterators = [i for i in (s.get_postings_iterator(term) for s in segments) if i is not None]
+        if not iterators:
+            return iter([])
+        if len(iterators) == 1:
+            return iterators[0]
+        return __class__.MergedPostingsIterator(iterators)
+
+    def get_document_frequency(self, term: str) -> int:
+        with self.__lock:
+            segments = [*self.__segments, self.__writable]
+            return sum(len(s.posting_lists[term]) for s in segments if term in s.posting_lists)
+
+    def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+        # Combined from the statistics that each segment keeps, without touching the posting lists. Like the
+        # document frequency, these statistics include deleted documents that have not yet been merged away, so
+        # the maximum term frequency is an upper bound.
+        with self.__lock:
+            segments = [*self.__segments, self.__writable]
+            document_count = sum(s.size() for s in segments)
+            statistics = [s.statistics[term] for s in segments if term in s.statistics]
+        if not statistics:
+            return None
+        document_frequency = sum(s[0] for s in statistics)
+        collection_frequency = sum(s[1] for s in statistics)
+        maximum_term_frequency = max(s[2] for s in statistics)
+        idf = math.log(document_count / document_frequency)
+        return TermStatistics(document_frequency, collection_frequency, maximum_term_frequency, idf)
+
+    def get_generation(self) -> int:
+        return self.__generation
+
+    def get_vocabulary(self) -> Iterator[str]:
+        with self.__lock:
+            segments = [*self.__segments, self.__writable]
+        return iter(sorted(set(itertools.chain.from_iterable(s.posting_lists for s in segments))))
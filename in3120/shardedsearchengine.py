@@ -0,0 +1,193 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import math
+import multiprocessing
+import multiprocessing.connection
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+from .corpus import Corpus, SubsetCorpus
+from .dictionary import InMemoryDictionary
+from .document import Document
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .ranker import Ranker
+from .sieve import Sieve
+from .simplesearchengine import SimpleSearchEngine
+from .termstatistics import TermStatistics, TermStatisticsTable
+from .tokenizer import Tokenizer
+
+
+class ShardedSearchEngine:
+    """
+    A search engine that splits the corpus into shards by document identifier, and that serves each
+    shard from its own worker process. That way query evaluation is not limited by a single interpreter
+    lock, and query latency falls roughly with the number of shards.
+
+    Queries are evaluated scatter-gather style: The query is sent to all shards in parallel, each
+    shard evaluates it against its own inverted index using a SimpleSearchEngine, and the top results
+    from each shard are merged into the global top results.
+
+    Rankers that use corpus-level statistics such as the inverse document frequency would rank the
+    same document differently depending on which shard it is in, if each shard only knew its own
+    statistics. The statistics of the shards are therefore combined when the shards are built, and
+    every shard ranks using the global statistics.
+    """
+
+    class ShardInvertedIndex(InvertedIndex):
+        """
+        The inverted index of a shard, which serves postings from the shard's own index but term
+        statistics that span all shards.
+        """
+
+        def __init__(self, inverted_index: InvertedIndex, dictionary: InMemoryDictionary, statistics: TermStatisticsTable):
+            self.__inverted_index = inverted_index
+            self.__dictionary = dictionary  # Maps terms to identifiers in the global statistics.
+            self.__statistics = statistics  # The global statistics.
+
+        def get_terms(self, buffer: str) -> Iterator[str]:
+            return self.__inverted_index.get_terms(buffer)
+
+        def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+            return self.__inverted_index.get_postings_iterator(term)
+
+        def get_document_frequency(self, term: str) -> int:
+            term_id = self.__dictionary.get_term_id(term)
+            return 0 if term_id is None else self.__statistics.get_document_frequency(term_id)
+
+        def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+            term_id = self.__dictionary.get_term_id(term)
+            return None if term_id is None else self.__statistics.get_term_statistics(term_id)
+
+        def is_positional(self) -> bool:
+            return self.__inverted_index.is_positional()
+
+        def get_vocabulary(self) -> Iterator[str]:
+            return self.__inverted_index.get_vocabulary()
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        fields: Iterable[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        shards: int = None,
+        **kwargs,
+    ):
+        """
+        Splits the corpus into the given number of shards, or one per CPU if not specified, and starts
+        a worker process per shard. Other keyword arguments are passed on to the InMemoryInvertedIndex
+        constructor of each shard, e.g., to enable compression.
+        """
+        shards = shards or multiprocessing.cpu_count()
+        assert shards > 0
+        self.__corpus = corpus
+        documents = list(corpus)
+        shard_size = max(1, math.ceil(len(documents) / shards))
+        self.__connections = []  # For talking to the worker processes, one per shard.
+        self.__workers = []
+        for i in range(0, len(documents), shard_size):
+            (connection, worker_connection) = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=__class__._serve,
+                args=(worker_connection, documents[i:i + shard_size], list(fields), normalizer, tokenizer, kwargs),
+                daemon=True,
+            )
+            worker.start()
+            worker_connection.close()
+            self.__connections.append(connection)
+            self.__workers.append(worker)
+        # Combine the statistics of the shards, and hand the global statistics back to the shards.
+        dictionary = InMemoryDictionary()
+        statistics = TermStatisticsTable()
+        for connection in self.__connections:
+            for (term, document_frequency, collection_frequency, maximum_term_frequency) in connection.recv():
+                term_id = dictionary.add_if_absent(term)
+                statistics.add_postings(term_id, document_frequency, collection_frequency, maximum_term_frequency)
+        statistics.finalize(len(documents))
+        for connection in self.__connections:
+            connection.send((dictionary, statistics))
+
+    @staticmethod
+    def _serve(
+        connection: multiprocessing.connection.Connection,
+        documents: List[Document],
+        fields: List[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        kwargs: Dict[str, Any],
+    ) -> None:
+        """
+        The body of a worker process. Indexes its shard, reports the shard's statistics, and then
+        evaluates queries until told to stop. If evaluating a query fails, the exception is sent back
+        instead of the results, and the worker carries on with the next query.
+
+        Not name-mangled, so that the worker process can look it up.
+        """
+        corpus = SubsetCorpus(documents)
+        shard = InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer, **kwargs)
+        statistics = (shard.get_term_statistics(term) for term in shard.get_vocabulary())
+        connection.send([
+            (term, s.document_frequency, s.collection_frequency, s.maximum_term_frequency)
+            for (term, s) in zip(shard.get_vocabulary(), statistics)
+        ])
+        inverted_index = ShardedSearchEngine.ShardInvertedIndex(shard, *connection.recv())
+        engine = SimpleSearchEngine(corpus, inverted_index)
+        request = connection.recv()
+        while request is not None:
+            (query, options, ranker_factory) = request
+            try:
+                ranker = ranker_factory(corpus, inverted_index)
+                response = (None, [(hit["score"], hit["document"].document_id) for hit in engine.evaluate(query, options, ranker)])
+            except Exception as e:
+                response = (e, None)
+            try:
+                connection.send(response)
+            except Exception as e:
+                # The exception couldn't be pickled, so send a description of it instead.
+                connection.send((RuntimeError(f"Shard failed to evaluate query '{query}': {e!r}"), None))
+            request = connection.recv()
+        connection.close()
+
+    def evaluate(self, query: str, options: dict, ranker_factory: Callable[[Corpus, InvertedIndex], Ranker]) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query against all shards in parallel, and yields the best matches across
+        all shards. See SimpleSearchEngine.evaluate for the query semantics and options.
+
+        Each shard needs its own ranker, so instead of a ranker we take a factory that creates one
+        given the shard's corpus and inverted index. The factory is sent to the worker processes and
+        must therefore be picklable, e.g., a ranker class such as BetterRanker or a module-level function.
+
+        If a shard fails to evaluate the query, the exception it raised is raised here once all shards
+        have responded, and the engine can still be used for other queries. Raises IOError if a worker
+        process has died.
+        """
+        try:
+            for connection in self.__connections:
+                connection.send((query, options, ranker_factory))
+            responses = [connection.recv() for connection in self.__connections]
+        except (EOFError, OSError) as e:
+            raise IOError(f"A shard's worker process is gone: {e!r}") from e
+        for (error, _) in responses:
+            if error is not None:
+                raise error
+        sieve = Sieve(options.get("hit_count"))
+        for (_, hits) in responses:
+            for (score, document_id) in hits:
+                sieve.sift(score, document_id)
+        for (score, document_id) in sieve.winners():
+            yield {"score": score, "document": self.__corpus.get_document(document_id)}
+
+    def close(self) -> None:
+        """
+        Stops the worker processes. The engine cannot be used afterwards. Workers that have already
+        died are ignored.
+        """
+        for connection in self.__connections:
+            try:
+                connection.send(None)
+            except OSError:
+                pass
+            connection.close()
+        for worker in self.__workers:
+            worker.join()
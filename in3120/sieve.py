@@ -1,50 +1,70 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-import heapq
-from typing import Iterator, Any, Union, Tuple
-
-
-Number = Union[int, float]
-
-
-class Sieve:
-    """
-    Implements a "sieve", i.e., a heap-based data structure through which
-    we can "sift" N scored items, and be left with the up to K (item, score)
-    pairs having the largest scores. Ties are resolved arbitrarily.
-
-    A sieve is an efficient way of selecting the "best" K items from a set of N
-    items, where K << N. An internal heap keeps track of "the worst of the best",
-    so that we immediately know if a candidate item makes the cut.
-
-    Candidate items can be of any type, as long as that type has an "<" operator
-    defined.
-    """
-
-    def __init__(self, size: int):
-        assert size > 0
-        self.__size = size
-        self.__heap = []
-
-    def sift(self, score: Number, item: Any) -> None:
-        """
-        Sifts a scored item through the sieve.
-        """
-        if len(self.__heap) < self.__size:
-            heapq.heappush(self.__heap, (score, item))
-        else:
-            root_score = self.__heap[0][0]
-            if root_score < score:
-                heapq.heapreplace(self.__heap, (score, item))
-
-    def winners(self) -> Iterator[Tuple[Number, Any]]:
-        """
-        Returns the highest-scoring items that have been sifted through the sieve, sorted
-        in descending order. The returned list iterator yields (score, item) tuples.
-
-        This implementation is currently not idempotent. Invoke only once.
-        """
-        # Since the internal heap tracks "the worst of the best" and we want the
-        # list sorted as "the best of the best", we reverse the internal heap ordering.
-        return reversed([heapq.heappop(self.__heap) for _ in range(len(self.__heap))])
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import math
+from typing import Iterator, Any, Union, Tuple
+
+
+Number = Union[int, float]
+
+
+class Sieve:
+    """
+    Implements a "sieve", i.e., a heap-based data structure through which
+    we can "sift" N scored items, and be left with the up to K (item, score)
+    pairs having the largest scores. Ties are resolved by comparing the items,
+    so that the (score, item) pairs are totally ordered and larger items win.
+
+    A sieve is an efficient way of selecting the "best" K items from a set of N
+    items, where K << N. An internal heap keeps track of "the worst of the best",
+    so that we immediately know if a candidate item makes the cut.
+
+    Candidate items can be of any type, as long as that type has an "<" operator
+    defined.
+
+    Optionally, only (score, item) pairs that come strictly after a given pair in
+    the descending order are let through. That way the sieve can produce the next
+    page of results, given the last result on the previous page, while holding no
+    more than a page's worth of items.
+    """
+
+    def __init__(self, size: int, after: Tuple[Number, Any] = None):
+        assert size > 0
+        self.__size = size
+        self.__heap = []
+        self.__after = after  # Only pairs less than this one make it through, if set.
+
+    def sift(self, score: Number, item: Any) -> bool:
+        """
+        Sifts a scored item through the sieve. Returns True iff the item made it through,
+        possibly pushing out the worst of the best.
+        """
+        if self.__after is not None and not (score, item) < self.__after:
+            return False
+        if len(self.__heap) < self.__size:
+            heapq.heappush(self.__heap, (score, item))
+            return True
+        if self.__heap[0] < (score, item):
+            heapq.heapreplace(self.__heap, (score, item))
+            return True
+        return False
+
+    def threshold(self) -> Number:
+        """
+        Returns the score that a candidate item needs to exceed in order to make it through
+        the sieve, or to match if the item is larger than the worst item in the sieve. Until
+        the sieve is full, any item makes it through.
+        """
+        return self.__heap[0][0] if len(self.__heap) == self.__size else -math.inf
+
+    def winners(self) -> Iterator[Tuple[Number, Any]]:
+        """
+        Returns the highest-scoring items that have been sifted through the sieve, sorted
+        in descending order. The returned list iterator yields (score, item) tuples.
+
+        This implementation is currently not idempotent. Invoke only once.
+        """
+        # Since the internal heap tracks "the worst of the best" and we want the
+        # list sorted as "the best of the best", we reverse the internal heap ordering.
+        return reversed([heapq.heappop(self.__heap) for _ in range(len(self.__heap))])
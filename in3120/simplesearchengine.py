@@ -1,95 +1,766 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-import itertools
-from .ranker import Ranker
-from .corpus import Corpus
-from .invertedindex import InvertedIndex
-from typing import Iterator, Dict, Any
-from .sieve import Sieve
-from collections import defaultdict
-from collections import Counter
-
-
-class SimpleSearchEngine:
-    """
-    A simple implementation of a search core based on an inverted index, suitable for small corpora.
-    """
-
-    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex):
-        self.__corpus = corpus
-        self.__inverted_index = inverted_index
-
-
-    def evaluate(self, query: str, options: dict, ranker: Ranker) -> Iterator[Dict[str, Any]]:
-        """
-        Evaluates the given query, doing N-out-of-M ranked retrieval. I.e., for a supplied query having M
-        unique terms, a document is considered to be a match if it contains at least N <= M of those terms.
-
-        The matching documents, if any, are ranked by the supplied ranker, and only the "best" matches are yielded
-        back to the client as dictionaries having the keys "score" (float) and "document" (Document).
-
-        The client can supply a dictionary of options that controls this query evaluation process: The value of
-        N is inferred from the query via the "match_threshold" (float) option, and the maximum number of documents
-        to return to the client is controlled via the "hit_count" (int) option.
-        """
-
-        terms_iter_count = Counter([term for term in self.__inverted_index.get_terms(query)])
-        terms = [t for t in terms_iter_count.keys()]
-        m = len(terms)
-        n = max(1, min(m, int(options.get('match_threshold') *m)))
-        postings = [self.__inverted_index.get_postings_iterator(i) for i in terms]
-
-        results = []
-        dict_postings = {i: next(posting, None) for i, posting in enumerate(postings)}
-        dict_postings = {key:value for key,value in dict_postings.items() if value is not None}
-
-        while len(dict_postings) >= n:
-            inv_dict = {}
-            for key, value in dict_postings.items():
-                inv_dict.setdefault(value.document_id, set()).add(key)
-            result = list(filter(lambda x: len(x) >= n, inv_dict.values()))
-
-            if len(result) > 0:
-                matches = list(result[0])
-            else:
-                matches = []
-
-            if len(matches) >= n:
-                intermediate_result = {key: dict_postings[key] for key in matches}
-                if len(results) > 0:
-                    if results[-1] != intermediate_result:
-                        results.append(intermediate_result)
-                else:
-                    results.append(intermediate_result)
-
-            doc_id= min(dict_postings, key=lambda x: dict_postings.get(x).document_id)
-            dict_postings[doc_id] = next(postings[doc_id], None)
-            dict_postings = {k: v for k, v in dict_postings.items() if v is not None}
-
-        results.sort(key=(lambda x: len(x)), reverse=True)
-
-        sieve = Sieve(options.get('hit_count'))
-        checked = []
-
-        for i in results:
-            current_document = i[list(i.keys())[0]].document_id
-            if current_document in checked:
-                pass
-            else:
-                checked.append(current_document)
-                ranker.reset(current_document)
-
-                for key, value in i.items():
-                    ranker.update(terms[key], terms_iter_count[terms[key]], value)
-                sieve.sift(ranker.evaluate(), current_document)
-
-        winners = list(sieve.winners())
-
-        for i in winners:
-            yield({'score': i[0], 'document': self.__corpus.get_document(i[1])})
-
-        debug = options.get("debug", False)
-
-        # Document-at-a-time!
-        #raise NotImplementedError("You need to implement this as part of the assignment.")
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import base64
+import heapq
+import itertools
+import math
+import re
+import struct
+import time
+from .ranker import Ranker
+from .corpus import Corpus
+from .invertedindex import InvertedIndex
+from concurrent.futures import Executor, ProcessPoolExecutor
+from .postingsmerger import PostingsMerger
+from .posting import Posting
+from typing import Callable, Iterable, Iterator, Dict, Any, List, Optional, Tuple
+from .querycache import QueryCache
+from .querytrace import QueryTrace
+from .sieve import Sieve
+from .wildcardexpander import WildcardExpander
+from collections import defaultdict
+from collections import Counter
+
+try:
+    import numpy
+except ImportError:  # Only needed for term-at-a-time evaluation.
+    numpy = None
+
+
+class SimpleSearchEngine:
+    """
+    A simple implementation of a search core based on an inverted index, suitable for small corpora.
+    """
+
+    class Cursor:
+        """
+        Tracks our position in the posting list of a single query term during document-at-a-time
+        traversal, and the upper bounds on the term's score contribution that dynamic pruning needs.
+        Posting iterators without block-max metadata get their upper bound from the term's maximum term
+        frequency, if known, and infinite upper bounds otherwise.
+        """
+
+        def __init__(
+            self, postings: Iterator[Posting], term: str, multiplicity: int, ranker: Ranker, maximum_term_frequency: Optional[int] = None
+        ):
+            self.postings = postings
+            self.term = term
+            self.multiplicity = multiplicity
+            self.posting = next(postings, None)
+            self.__ranker = ranker
+            self.__has_blocks = hasattr(postings, "next_shallow")
+            if self.__has_blocks:
+                self.max_score = postings.max_score(ranker, term, multiplicity)
+            elif maximum_term_frequency is not None:
+                self.max_score = ranker.upper_bound(term, multiplicity, maximum_term_frequency)
+            else:
+                self.max_score = math.inf
+
+        def next(self) -> None:
+            """
+            Moves to the next posting.
+            """
+            self.posting = next(self.postings, None)
+
+        def advance_to(self, document_id: int) -> None:
+            """
+            Moves to the first posting having a document identifier at least as large as the given one.
+            """
+            self.posting = PostingsMerger.advance(self.postings, document_id)
+
+        def block_max_score(self, document_id: int) -> Tuple[float, float]:
+            """
+            Inspects the block that would contain the given document identifier, and returns the block's
+            upper bound on the term's score contribution together with the block's largest document identifier.
+            """
+            if not self.__has_blocks:
+                return (math.inf, math.inf)
+            last_document_id = self.postings.next_shallow(document_id)
+            if last_document_id is None:
+                return (0.0, math.inf)
+            return (self.postings.block_max_score(self.__ranker, self.term, self.multiplicity), last_document_id)
+
+    # Matches the wildcard terms in a query, i.e., the whitespace-delimited tokens having asterisks.
+    __WILDCARD = re.compile(r"(\S*\*\S*)")
+
+    # The layout of a cursor, before it is base64 encoded. See get_cursor.
+    __CURSOR = struct.Struct("<dq")
+
+    # The engine that a worker process in our own pool evaluates queries against.
+    _worker_engine = None
+
+    def __init__(self, corpus: Corpus, inverted_index: InvertedIndex, cache: Optional[QueryCache] = None):
+        """
+        If a cache is given, the results of queries are cached and served from there when the same query is seen
+        again. Queries are considered to be the same if they have the same multiset of normalized query terms and
+        the same "match_threshold", "hit_count" and "strategy" options, and are ranked by rankers of the same type.
+        The other options, apart from "search_after", don't affect the results. Cached results are invalidated when the index changes.
+        """
+        self.__corpus = corpus
+        self.__inverted_index = inverted_index
+        self.__cache = cache  # Where query results are cached, if anywhere.
+        self.__expander = None  # Expands wildcard terms. Built on first use.
+        self.__expander_generation = None  # The generation of the index the expander was built from.
+        self.__executor = None  # Our own pool of worker processes, for batch evaluation. Started on first use.
+
+    def __getstate__(self):
+        # Our own worker processes stay with us.
+        state = self.__dict__.copy()
+        state["_SimpleSearchEngine__executor"] = None
+        return state
+
+
+    def evaluate(self, query: str, options: dict, ranker: Ranker) -> Iterator[Dict[str, Any]]:
+        """
+        Evaluates the given query, doing N-out-of-M ranked retrieval. I.e., for a supplied query having M
+        unique terms, a document is considered to be a match if it contains at least N <= M of those terms.
+
+        The matching documents, if any, are ranked by the supplied ranker, and only the "best" matches are yielded
+        back to the client as dictionaries having the keys "score" (float) and "document" (Document).
+
+        The client can supply a dictionary of options that controls this query evaluation process: The value of
+        N is inferred from the query via the "match_threshold" (float) option, and the maximum number of documents
+        to return to the client is controlled via the "hit_count" (int) option.
+
+        Setting the "pruning" (str) option to "wand", "maxscore" or "bmw" enables WAND, MaxScore or block-max WAND
+        dynamic pruning, respectively, which skips documents that can't make it into the top results without scoring
+        them. The results are the same as without pruning. This requires the ranker to implement upper_bound. WAND
+        and MaxScore use the per-term upper bounds, and block-max WAND is only effective for compressed posting lists
+        since these have block-max metadata.
+
+        If the inverted index keeps champion lists, see TieredInvertedIndex, the documents in the query terms' champion
+        lists are evaluated first, and the rest of the posting lists are only evaluated if the documents outside the
+        champion lists could still make it into the top results. This requires the ranker to implement upper_bound.
+        The results are the same as if all postings had been evaluated.
+
+        Setting the "strategy" (str) option to "taat" evaluates the query term-at-a-time instead of document-at-a-time.
+        The postings are then consumed in bulk into NumPy arrays and the scores are accumulated using vectorized
+        arithmetic, which pays off for short queries over long posting lists. This requires NumPy, and a ranker that
+        implements term_weight and static_score. The pruning option doesn't apply. Scores are accumulated in single
+        precision, and might differ from the document-at-a-time scores in the last few digits.
+
+        For paging through the results, the "search_after" (str) option can be set to the cursor of the last result
+        on the previous page, as given by get_cursor. Only the results that come after it are then considered, so
+        fetching a page costs the same regardless of how deep it is. The results are ordered by descending score, and
+        ties are broken by descending document identifier.
+
+        Parts of the query enclosed in double quotes are treated as phrases, if the inverted index is positional.
+        A phrase counts as a single one of the M query terms, and matches documents where its terms occur
+        consecutively. For non-positional indexes, the terms in the phrase are treated as ordinary query terms.
+
+        Query terms containing asterisks are wildcard terms, e.g., "data*" or "*base", where an asterisk matches
+        any sequence of characters. A wildcard term counts as a single one of the M query terms, and matches the
+        documents that contain any of the terms in the vocabulary that it expands to.
+
+        Setting the "debug" option to a callable traces the evaluation, see QueryTrace, which tells where the time went
+        and how much work was done. The callable is a sink that gets the trace as a dictionary when the results are
+        ready, also if there are none. Tracing slows the evaluation down somewhat, but when it's off nothing is
+        measured.
+        """
+
+        debug = options.get("debug")
+        if debug and not callable(debug):
+            raise ValueError(f"The debug option must be a callable, not {type(debug).__name__}")
+        trace = QueryTrace(query, options) if debug else None
+        if trace is None:
+            (query_terms, phrases) = self.__get_query_terms(query)
+        else:
+            start = time.perf_counter()
+            (query_terms, phrases) = self.__get_query_terms(query)
+            trace.add_time("term_processing", time.perf_counter() - start)
+        cached = False
+        if self.__cache is None:
+            winners = self.__evaluate(query_terms, phrases, options, ranker, trace)
+        else:
+            key = (
+                tuple(sorted(Counter(query_terms).items())),
+                options.get('match_threshold'),
+                options.get('hit_count'),
+                options.get("strategy"),
+                options.get("search_after"),
+                type(ranker),
+            )
+            generation = self.__inverted_index.get_generation()
+            winners = self.__cache.get(key, generation)
+            cached = winners is not None
+            if winners is None:
+                winners = list(self.__evaluate(query_terms, phrases, options, ranker, trace))
+                self.__cache.put(key, winners, generation)
+        if trace is None:
+            for (score, document_id) in winners:
+                yield({'score': score, 'document': self.__corpus.get_document(document_id)})
+            return
+        winners = list(winners)
+        trace.finish(len(winners), cached)
+        debug(trace.to_dict())
+        for (score, document_id) in winners:
+            yield({'score': score, 'document': self.__corpus.get_document(document_id)})
+
+    def __evaluate(
+        self, query_terms: List[str], phrases: Dict[str, List[str]], options: dict, ranker: Ranker, trace: Optional[QueryTrace]
+    ) -> Iterator[Tuple[float, int]]:
+        """
+        Evaluates the given query terms as described for evaluate, and yields the (score, document identifier) pairs
+        of the best matching documents in descending order of score. If a trace is given, the evaluation is traced.
+        """
+        if trace is not None:
+            ranker = trace.ranker(ranker)
+        after = self.__decode_cursor(options["search_after"]) if options.get("search_after") else None
+        terms_iter_count = Counter(query_terms)
+        terms = [t for t in terms_iter_count.keys()]
+        m = len(terms)
+        n = max(1, min(m, int(options.get('match_threshold') *m)))
+
+        if options.get("strategy") == "taat":
+            postings = self.__get_postings_iterators(terms, phrases, trace)
+            return self.__evaluate_term_at_a_time(terms, terms_iter_count, postings, n, ranker, options.get('hit_count'), after)
+
+        sieve = Sieve(options.get('hit_count'), after) if trace is None else trace.sieve(options.get('hit_count'), after)
+        pruning = options.get("pruning")
+        if hasattr(self.__inverted_index, "get_champions_iterator"):
+            self.__evaluate_champions_first(terms, terms_iter_count, phrases, n, ranker, sieve, pruning, trace, options.get('hit_count'), after)
+        else:
+            postings = self.__get_postings_iterators(terms, phrases, trace)
+            self.__evaluate_document_at_a_time(terms, terms_iter_count, postings, n, ranker, sieve, pruning)
+        return sieve.winners()
+
+    def __evaluate_document_at_a_time(
+        self, terms: List[str], multiplicities: Counter, postings: List[Iterator[Posting]], n: int, ranker: Ranker, sieve: Sieve, pruning: Optional[str]
+    ) -> None:
+        """
+        Does N-out-of-M document-at-a-time evaluation over the given posting lists, with the given kind of dynamic
+        pruning if any, and sifts the matching documents through the given sieve.
+        """
+        if pruning in ("wand", "bmw"):
+            self.__evaluate_wand(terms, multiplicities, postings, n, ranker, sieve, pruning == "bmw")
+        elif pruning == "maxscore":
+            self.__evaluate_max_score(terms, multiplicities, postings, n, ranker, sieve)
+        else:
+            self.__evaluate_exhaustive(terms, multiplicities, postings, n, ranker, sieve)
+
+    def __evaluate_champions_first(
+        self,
+        terms: List[str],
+        multiplicities: Counter,
+        phrases: Dict[str, List[str]],
+        n: int,
+        ranker: Ranker,
+        sieve: Sieve,
+        pruning: Optional[str],
+        trace: Optional[QueryTrace],
+        hit_count: int,
+        after: Optional[Tuple[float, int]],
+    ) -> None:
+        """
+        Does N-out-of-M document-at-a-time evaluation over an index with champion lists, see TieredInvertedIndex, and
+        sifts the matching documents through the given sieve.
+
+        First, only the documents in the query terms' champion lists are evaluated, using the whole posting lists so
+        that they get their proper scores. A document that isn't in any of the champion lists has a term frequency no
+        larger than the term's champion bound for each of the query terms, so its score is at most the sum of the upper
+        bounds of the query terms given their champion bounds, plus the ranker's static upper bound. Terms whose postings
+        are all in their champion lists contribute nothing. If that can't beat the threshold of the best champions, the
+        best champions are the best matches, and the rest of the posting lists are never touched. Otherwise, all of the
+        posting lists are evaluated as usual. Phrases and wildcard terms have no champion lists, so queries having them
+        are always evaluated as usual.
+        """
+        index = self.__inverted_index
+        if any(t in phrases or "*" in t for t in terms):
+            postings = self.__get_postings_iterators(terms, phrases, trace)
+            self.__evaluate_document_at_a_time(terms, multiplicities, postings, n, ranker, sieve, pruning)
+            return
+
+        # Evaluate the champions.
+        champions = [index.get_champions_iterator(t) for t in terms]
+        if trace is not None:
+            champions = [trace.postings(c) for c in champions]
+        candidates = sorted({p.document_id for c in champions for p in c})
+        postings = [self.__restrict(p, candidates) for p in self.__get_postings_iterators(terms, phrases, trace)]
+        best = Sieve(hit_count, after) if trace is None else trace.sieve(hit_count, after)
+        self.__evaluate_document_at_a_time(terms, multiplicities, postings, n, ranker, best, None)
+
+        # Can the other documents beat the champions?
+        bounds = [index.get_champion_bound(t) for t in terms]
+        bound = ranker.static_upper_bound() + sum(ranker.upper_bound(t, multiplicities[t], b) for (t, b) in zip(terms, bounds) if b > 0)
+        if sum(1 for b in bounds if b > 0) < n or not self.__exceeds(bound, best.threshold()):
+            for (score, document_id) in best.winners():
+                sieve.sift(score, document_id)
+            return
+        postings = self.__get_postings_iterators(terms, phrases, trace)
+        self.__evaluate_document_at_a_time(terms, multiplicities, postings, n, ranker, sieve, pruning)
+
+    @staticmethod
+    def __restrict(postings: Iterator[Posting], document_ids: List[int]) -> Iterator[Posting]:
+        """
+        Yields the postings for the given documents, sorted by document identifier, skipping through the given postings.
+        """
+        posting = None
+        for document_id in document_ids:
+            if posting is None or posting.document_id < document_id:
+                posting = PostingsMerger.advance(postings, document_id)
+                if posting is None:
+                    return
+            if posting.document_id == document_id:
+                yield posting
+
+    def _evaluate_hits(self, query: str, options: dict, ranker_factory: Callable[[Corpus, InvertedIndex], Ranker]) -> List[Tuple[float, int]]:
+        """
+        Evaluates the given query using a ranker made by the given factory, and returns the (score, document identifier)
+        pairs of the best matching documents. Used for batch evaluation, so that documents aren't sent between processes.
+
+        Not name-mangled, so that a worker process can look it up.
+        """
+        ranker = ranker_factory(self.__corpus, self.__inverted_index)
+        return [(hit["score"], hit["document"].document_id) for hit in self.evaluate(query, options, ranker)]
+
+    @staticmethod
+    def _start_worker(engine: "SimpleSearchEngine") -> None:
+        """
+        Runs once in each worker process in our own pool, and keeps the given copy of the engine around, so that the
+        index is warm and doesn't have to be sent along with every query.
+
+        Not name-mangled, so that the worker process can look it up.
+        """
+        SimpleSearchEngine._worker_engine = engine
+
+    @staticmethod
+    def _evaluate_in_worker(query: str, options: dict, ranker_factory: Callable[[Corpus, InvertedIndex], Ranker]) -> List[Tuple[float, int]]:
+        """
+        Evaluates the given query in a worker process in our own pool. See _evaluate_hits.
+
+        Not name-mangled, so that the worker process can look it up.
+        """
+        return SimpleSearchEngine._worker_engine._evaluate_hits(query, options, ranker_factory)
+
+    def get_executor(self, workers: Optional[int] = None) -> Executor:
+        """
+        Returns our own pool of worker processes, starting it with the given number of workers, or one per CPU if not
+        specified, if it hasn't been started already. Each worker holds its own copy of the engine, including the index.
+        """
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(workers, initializer=__class__._start_worker, initargs=(self,))
+        return self.__executor
+
+    def __submit(self, executor: Optional[Executor]) -> Tuple[Executor, Callable[..., List[Tuple[float, int]]]]:
+        """
+        Picks the executor to evaluate queries on, and the function that evaluates a query there.
+        """
+        if executor is None or executor is self.__executor:
+            return (self.get_executor(), __class__._evaluate_in_worker)
+        return (executor, self._evaluate_hits)
+
+    def evaluate_many(
+        self,
+        queries: Iterable[str],
+        options: dict,
+        ranker_factory: Callable[[Corpus, InvertedIndex], Ranker],
+        executor: Optional[Executor] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Evaluates the given queries concurrently, and returns the results of each query as a list like the ones
+        evaluate yields, in the same order as the queries. See evaluate for the query semantics and options.
+
+        Each query needs its own ranker, so instead of a ranker we take a factory that creates one given the corpus
+        and the inverted index, e.g., a ranker class such as BetterRanker.
+
+        By default the queries are evaluated in our own pool of worker processes, see get_executor, so throughput
+        scales with the number of CPUs. Other executors can be supplied, e.g., a thread pool, in which case the engine
+        is shared. Note that for other process pools the engine and its index is sent along with every query.
+        """
+        (executor, evaluate) = self.__submit(executor)
+        queries = list(queries)
+        batches = executor.map(evaluate, queries, itertools.repeat(options, len(queries)), itertools.repeat(ranker_factory, len(queries)))
+        return [self.__get_hits(hits) for hits in batches]
+
+    async def evaluate_async(
+        self,
+        queries: Iterable[str],
+        options: dict,
+        ranker_factory: Callable[[Corpus, InvertedIndex], Ranker],
+        executor: Optional[Executor] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Like evaluate_many, but doesn't block the event loop while the queries are being evaluated, so that other
+        requests can be served in the meantime. All the queries are in flight at once.
+        """
+        (executor, evaluate) = self.__submit(executor)
+        loop = asyncio.get_running_loop()
+        batches = await asyncio.gather(*(loop.run_in_executor(executor, evaluate, q, options, ranker_factory) for q in queries))
+        return [self.__get_hits(hits) for hits in batches]
+
+    def __get_hits(self, hits: List[Tuple[float, int]]) -> List[Dict[str, Any]]:
+        """
+        Turns (score, document identifier) pairs into results like the ones evaluate yields.
+        """
+        return [{'score': score, 'document': self.__corpus.get_document(document_id)} for (score, document_id) in hits]
+
+    def close(self) -> None:
+        """
+        Stops our own pool of worker processes, if it has been started. The engine can still be used afterwards.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    @staticmethod
+    def get_cursor(hit: Dict[str, Any]) -> str:
+        """
+        Returns an opaque cursor for the given result, to pass as the "search_after" option to evaluate in order to
+        get the results that come after it. The cursor encodes the result's score and document identifier.
+        """
+        return base64.urlsafe_b64encode(__class__.__CURSOR.pack(hit["score"], hit["document"].document_id)).decode("ascii")
+
+    @staticmethod
+    def __decode_cursor(cursor: str) -> Tuple[float, int]:
+        """
+        Returns the (score, document identifier) pair encoded in the given cursor. See get_cursor.
+        """
+        try:
+            return __class__.__CURSOR.unpack(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except (ValueError, struct.error) as e:
+            raise ValueError(f"Invalid cursor '{cursor}'") from e
+
+    def __get_query_terms(self, query: str) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Processes the query, and returns a pair comprised of the query terms and the phrases in the
+        query. A phrase is represented as a single query term, and the returned dictionary maps such
+        a query term to the terms making up the phrase.
+        """
+        query_terms = []
+        phrases = {}
+        for (i, part) in enumerate(query.split('"')):
+            terms = list(self.__inverted_index.get_terms(part))
+            if i % 2 == 1 and len(terms) > 1 and self.__inverted_index.is_positional():
+                phrase = " ".join(terms)
+                phrases[phrase] = terms
+                query_terms.append(phrase)
+            elif i % 2 == 1:
+                query_terms.extend(terms)
+            else:
+                query_terms.extend(self.__get_wildcard_terms(part))
+        return (query_terms, phrases)
+
+    def __get_wildcard_terms(self, buffer: str) -> Iterator[str]:
+        """
+        Yields the query terms in the given buffer, where wildcard terms are kept as single query terms. The
+        parts of a wildcard term between its asterisks are normalized like any other query terms are.
+        """
+        for (i, part) in enumerate(self.__WILDCARD.split(buffer)):
+            if i % 2 == 0:
+                yield from self.__inverted_index.get_terms(part)
+                continue
+            pattern = "*".join("".join(self.__inverted_index.get_terms(s)) for s in part.split("*"))
+            if pattern.strip("*"):
+                yield pattern
+
+    def __get_expander(self) -> WildcardExpander:
+        """
+        Returns the expander for wildcard terms, building it from the vocabulary on first use, and rebuilding it
+        whenever the index has changed since. Raises ValueError if the index can't list its vocabulary.
+        """
+        generation = self.__inverted_index.get_generation()
+        if self.__expander is None or generation != self.__expander_generation:
+            vocabulary = self.__inverted_index.get_vocabulary()
+            if vocabulary is None:
+                raise ValueError("Wildcard terms need an inverted index that can list its vocabulary")
+            self.__expander = WildcardExpander(vocabulary)
+            self.__expander_generation = generation
+        return self.__expander
+
+    def __get_postings_iterators(self, terms: List[str], phrases: Dict[str, List[str]], trace: Optional[QueryTrace]) -> List[Iterator[Posting]]:
+        """
+        Returns iterators over the postings for the given query terms, see __get_postings_iterator. If a trace is
+        given, the iterators are traced, and the time it takes to look them up counts as term processing.
+        """
+        if trace is None:
+            return [self.__get_postings_iterator(t, phrases) for t in terms]
+        start = time.perf_counter()
+        postings = [trace.postings(self.__get_postings_iterator(t, phrases)) for t in terms]
+        trace.add_time("term_processing", time.perf_counter() - start)
+        return postings
+
+    def __get_postings_iterator(self, term: str, phrases: Dict[str, List[str]]) -> Iterator[Posting]:
+        """
+        Returns an iterator over the postings for the given query term, which might be a phrase or a wildcard term.
+        """
+        if term in phrases:
+            return PostingsMerger.phrase([self.__inverted_index.get_postings_iterator(t) for t in phrases[term]])
+        if "*" in term:
+            expansions = self.__get_expander().expand(term)
+            return PostingsMerger.union_many([self.__inverted_index.get_postings_iterator(t) for t in expansions])
+        return self.__inverted_index.get_postings_iterator(term)
+
+    def __evaluate_exhaustive(
+        self, terms: List[str], multiplicities: Counter, postings: List[Iterator[Posting]], n: int, ranker: Ranker, sieve: Sieve
+    ) -> None:
+        """
+        Does N-out-of-M document-at-a-time evaluation, and sifts every matching document through the given
+        sieve. The cursors are kept in a min-heap keyed on their current document identifiers, so that each
+        step costs O(log M) rather than O(M).
+
+        The cursors at the smallest document identifier are popped off the heap together. If there are at least
+        N of them, the document is a match. If not, no document before the next smallest document identifier
+        in the heap can be a match either, since only these fewer than N cursors can reach such documents. They
+        can thus skip straight to that document identifier.
+        """
+        cursors = [self.Cursor(p, t, multiplicities[t], ranker) for (t, p) in zip(terms, postings)]
+        heap = [(c.posting.document_id, i, c) for (i, c) in enumerate(cursors) if c.posting]
+        heapq.heapify(heap)
+
+        while len(heap) >= n:
+            document_id = heap[0][0]
+            matches = []
+            while heap and heap[0][0] == document_id:
+                matches.append(heapq.heappop(heap))
+            if len(matches) >= n:
+                ranker.reset(document_id)
+                for (_, _, cursor) in matches:
+                    ranker.update(cursor.term, cursor.multiplicity, cursor.posting)
+                sieve.sift(ranker.evaluate(), document_id)
+                for (_, _, cursor) in matches:
+                    cursor.next()
+            elif heap:
+                for (_, _, cursor) in matches:
+                    cursor.advance_to(heap[0][0])
+            else:
+                break
+            for (_, i, cursor) in matches:
+                if cursor.posting:
+                    heapq.heappush(heap, (cursor.posting.document_id, i, cursor))
+
+    def __get_cursors(self, terms: List[str], multiplicities: Counter, postings: List[Iterator[Posting]], ranker: Ranker) -> List[Cursor]:
+        """
+        Returns cursors over the given posting lists, with upper bounds for dynamic pruning. Query terms that
+        aren't plain terms, e.g., phrases, have no term statistics and hence get infinite upper bounds.
+        """
+        maximum_term_frequencies = self.__get_maximum_term_frequencies(terms)
+        return [
+            self.Cursor(p, t, multiplicities[t], ranker, f)
+            for (t, p, f) in zip(terms, postings, maximum_term_frequencies)
+        ]
+
+    def __get_maximum_term_frequencies(self, terms: List[str]) -> List[Optional[int]]:
+        """
+        Returns the maximum term frequency of each of the given query terms across the whole index, as kept in the
+        term statistics. None if unknown, e.g., for phrases or if the index doesn't keep term statistics.
+        """
+        statistics = (self.__inverted_index.get_term_statistics(t) for t in terms)
+        return [s and s.maximum_term_frequency for s in statistics]
+
+    def __evaluate_wand(
+        self,
+        terms: List[str],
+        multiplicities: Counter,
+        postings: List[Iterator[Posting]],
+        n: int,
+        ranker: Ranker,
+        sieve: Sieve,
+        block_max: bool,
+    ) -> None:
+        """
+        Does N-out-of-M document-at-a-time evaluation with WAND or block-max WAND dynamic pruning, and sifts the
+        matching documents that might make it into the top results through the given sieve. See Broder et al.,
+        "Efficient Query Evaluation using a Two-Level Retrieval Process", CIKM 2003, and Ding and Suel, "Faster
+        Top-k Document Retrieval Using Block-Max Indexes", SIGIR 2011.
+
+        Candidates need to be matched by at least N cursors, in addition to having upper bounds that beat
+        the sieve's threshold.
+        """
+        cursors = [c for c in self.__get_cursors(terms, multiplicities, postings, ranker) if c.posting]
+        static_upper_bound = ranker.static_upper_bound()
+        positions = {t: i for (i, t) in enumerate(terms)}  # Where each term is in the query.
+
+        while len(cursors) >= n:
+            cursors.sort(key=lambda c: c.posting.document_id)
+            threshold = sieve.threshold()
+
+            # Find the pivot, i.e., the first document that could possibly beat the threshold. Every
+            # document before it is covered by too few cursors, or by cursors whose bounds are too low.
+            bound = static_upper_bound
+            pivot = None
+            for (i, cursor) in enumerate(cursors):
+                bound += cursor.max_score
+                if i + 1 >= n and self.__exceeds(bound, threshold):
+                    pivot = i
+                    break
+            if pivot is None:
+                break
+            document_id = cursors[pivot].posting.document_id
+            end = pivot + 1
+            while end < len(cursors) and cursors[end].posting.document_id == document_id:
+                end += 1
+
+            # Refine the bound for the pivot document using the block-max metadata, if we have that.
+            blocks = [c.block_max_score(document_id) for c in cursors[:end]] if block_max else None
+            if blocks is None or self.__exceeds(static_upper_bound + sum(b[0] for b in blocks), threshold):
+                if cursors[0].posting.document_id == document_id:
+                    # Update in query term order, so that the scores add up exactly like without pruning.
+                    ranker.reset(document_id)
+                    for cursor in sorted(cursors[:end], key=lambda c: positions[c.term]):
+                        ranker.update(cursor.term, cursor.multiplicity, cursor.posting)
+                    sieve.sift(ranker.evaluate(), document_id)
+                    for cursor in cursors[:end]:
+                        cursor.next()
+                else:
+                    for cursor in cursors[:pivot]:
+                        if cursor.posting.document_id < document_id:
+                            cursor.advance_to(document_id)
+            else:
+                # No document before the end of the shortest of these blocks can beat the threshold, unless
+                # some other cursor comes into play first.
+                target = min(b[1] for b in blocks) + 1
+                if end < len(cursors):
+                    target = min(target, cursors[end].posting.document_id)
+                for cursor in cursors[:end]:
+                    if cursor.posting.document_id < target:
+                        cursor.advance_to(target)
+
+            cursors = [c for c in cursors if c.posting]
+
+    def __evaluate_max_score(
+        self, terms: List[str], multiplicities: Counter, postings: List[Iterator[Posting]], n: int, ranker: Ranker, sieve: Sieve
+    ) -> None:
+        """
+        Does N-out-of-M document-at-a-time evaluation with MaxScore dynamic pruning, and sifts the matching
+        documents that might make it into the top results through the given sieve. See Turtle and Flood,
+        "Query Evaluation: Strategies and Optimizations", Information Processing & Management, 1995.
+
+        The cursors are ordered by their upper bounds. The non-essential cursors are the longest prefix of
+        these whose upper bounds taken together can't beat the sieve's threshold, so a document that only
+        these cursors reach can't make it into the top results. Candidates are therefore drawn only from the
+        essential cursors, using a min-heap as in __evaluate_exhaustive. The non-essential cursors are then
+        probed for each candidate, largest upper bound first, until the candidate can no longer beat the
+        threshold or be matched by N cursors. The bound for a candidate uses the term frequencies of the
+        postings found so far, so that only the candidates that survive are scored by the ranker.
+        """
+        cursors = self.__get_cursors(terms, multiplicities, postings, ranker)
+        order = sorted((i for (i, c) in enumerate(cursors) if c.posting), key=lambda i: cursors[i].max_score)
+        static_upper_bound = ranker.static_upper_bound()
+
+        # The sum of the upper bounds of the first j cursors in the order is bounds[j].
+        bounds = list(itertools.accumulate((cursors[i].max_score for i in order), initial=0.0))
+        heap = [(cursors[i].posting.document_id, j) for (j, i) in enumerate(order)]
+        heapq.heapify(heap)
+        essential = 0  # The cursors before this position in the order are non-essential.
+
+        while heap:
+            threshold = sieve.threshold()
+            while essential < len(order) and not self.__exceeds(static_upper_bound + bounds[essential + 1], threshold):
+                essential += 1
+            while heap and heap[0][1] < essential:
+                heapq.heappop(heap)
+            if not heap:
+                break
+
+            document_id = heap[0][0]
+            essentials = []
+            while heap and heap[0][0] == document_id:
+                (_, j) = heapq.heappop(heap)
+                if j >= essential:
+                    essentials.append(j)
+            matches = list(essentials)
+            bound = static_upper_bound
+            for j in matches:
+                cursor = cursors[order[j]]
+                bound += ranker.upper_bound(cursor.term, cursor.multiplicity, cursor.posting.term_frequency)
+
+            # Probe the non-essential cursors, and give up on the candidate as soon as we can.
+            for j in range(essential - 1, -1, -1):
+                if len(matches) + j + 1 < n or not self.__exceeds(bound + bounds[j + 1], threshold):
+                    break
+                cursor = cursors[order[j]]
+                if cursor.posting and cursor.posting.document_id < document_id:
+                    cursor.advance_to(document_id)
+                if cursor.posting and cursor.posting.document_id == document_id:
+                    matches.append(j)
+                    bound += ranker.upper_bound(cursor.term, cursor.multiplicity, cursor.posting.term_frequency)
+            else:
+                if len(matches) >= n and self.__exceeds(bound, threshold):
+                    ranker.reset(document_id)
+                    for i in sorted(order[j] for j in matches):
+                        ranker.update(cursors[i].term, cursors[i].multiplicity, cursors[i].posting)
+                    sieve.sift(ranker.evaluate(), document_id)
+
+            for j in essentials:
+                cursor = cursors[order[j]]
+                cursor.next()
+                if cursor.posting:
+                    heapq.heappush(heap, (cursor.posting.document_id, j))
+
+    def __evaluate_term_at_a_time(
+        self,
+        terms: List[str],
+        multiplicities: Counter,
+        postings: List[Iterator[Posting]],
+        n: int,
+        ranker: Ranker,
+        hit_count: int,
+        after: Optional[Tuple[float, int]],
+    ) -> Iterator[Tuple[float, int]]:
+        """
+        Does N-out-of-M term-at-a-time evaluation, and yields the (score, document identifier) pairs of the best
+        matching documents in descending order, optionally only those that come after the given pair. See Section 7.1.2 in https://nlp.stanford.edu/IR-book/pdf/07system.pdf.
+
+        Each term's postings are consumed in bulk, and its weighted term frequencies are added into a dense array of
+        score accumulators indexed by document identifier, while a parallel array counts how many query terms each
+        document matches. The documents matching at least N terms then get their static scores added, and the best
+        ones are selected using a partial sort.
+        """
+        if numpy is None:
+            raise ImportError("Term-at-a-time evaluation requires NumPy")
+        assert hit_count > 0
+        columns = [self.__get_columns(p) for p in postings]
+        size = 1 + max((int(d[-1]) for (d, _) in columns if len(d)), default=-1)
+        accumulators = numpy.zeros(size, dtype=numpy.float32)
+        counts = numpy.zeros(size, dtype=numpy.uint8 if len(terms) < 256 else numpy.uint16)
+        for (term, (document_ids, term_frequencies)) in zip(terms, columns):
+            weight = ranker.term_weight(term, multiplicities[term])
+            accumulators[document_ids] += numpy.float32(weight) * term_frequencies
+            counts[document_ids] += 1
+        candidates = numpy.flatnonzero(counts >= n)
+        scores = accumulators[candidates].astype(numpy.float64)
+        scores += numpy.fromiter((ranker.static_score(int(d)) for d in candidates), dtype=numpy.float64, count=len(candidates))
+        if after is not None:
+            admitted = (scores < after[0]) | ((scores == after[0]) & (candidates < after[1]))
+            (candidates, scores) = (candidates[admitted], scores[admitted])
+        # Break ties on the document identifiers like the sieve does, also for ties with the worst of the best.
+        best = numpy.arange(len(candidates))
+        if len(candidates) > hit_count:
+            worst = scores[numpy.argpartition(-scores, hit_count - 1)[hit_count - 1]]
+            best = numpy.flatnonzero(scores >= worst)
+        best = best[numpy.lexsort((-candidates[best], -scores[best]))][:hit_count]
+        for i in best:
+            yield (float(scores[i]), int(candidates[i]))
+
+    @staticmethod
+    def __get_columns(postings: Iterator[Posting]) -> Tuple[Any, Any]:
+        """
+        Consumes the given postings, and returns their document identifiers and term frequencies as a pair of NumPy
+        arrays. Posting iterators that support it are consumed a batch at a time, and other ones a posting at a time.
+        """
+        document_ids = []
+        term_frequencies = []
+        if hasattr(postings, "next_batch"):
+            (batch_document_ids, batch_term_frequencies) = postings.next_batch()
+            while len(batch_document_ids):
+                document_ids.append(numpy.asarray(batch_document_ids, dtype=numpy.int64))
+                term_frequencies.append(numpy.asarray(batch_term_frequencies, dtype=numpy.float32))
+                (batch_document_ids, batch_term_frequencies) = postings.next_batch()
+        else:
+            pairs = [(p.document_id, p.term_frequency) for p in postings]
+            document_ids.append(numpy.fromiter((d for (d, _) in pairs), dtype=numpy.int64, count=len(pairs)))
+            term_frequencies.append(numpy.fromiter((f for (_, f) in pairs), dtype=numpy.float32, count=len(pairs)))
+        if not document_ids:
+            return (numpy.zeros(0, dtype=numpy.int64), numpy.zeros(0, dtype=numpy.float32))
+        return (numpy.concatenate(document_ids), numpy.concatenate(term_frequencies))
+
+    @staticmethod
+    def __exceeds(bound: float, threshold: float) -> bool:
+        """
+        Returns True iff a document with the given upper bound on its score might make it past the given threshold,
+        which documents can also do by tying with it. Leaves some slack, since the ranker might sum up floating-point
+        numbers in a different order than we do.
+        """
+        return bound + 1e-9 * abs(bound) >= threshold
@@ -0,0 +1,155 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+import itertools
+import mmap
+import os
+import tempfile
+from array import array
+from collections import Counter
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+from .corpus import Corpus
+from .invertedindex import DiskInvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .tokenizer import Tokenizer
+from .variablebytecodec import VariableByteCodec
+
+
+class SpimiIndexBuilder:
+    """
+    Builds an index segment for corpora whose postings don't fit in memory, using single-pass
+    in-memory indexing (SPIMI). See https://nlp.stanford.edu/IR-book/pdf/04const.pdf for details.
+
+    Postings are accumulated in memory until the memory budget is exhausted, at which point the
+    accumulated block is written to a temporary file as a run sorted by term. When all documents
+    have been processed, the runs are merged into a single compressed index segment that can be
+    opened by a DiskInvertedIndex. Only one block and one posting list per run are ever held in
+    memory at the same time.
+
+    The memory use of a block is estimated, not measured. The estimate errs on the side of caution.
+
+    The terms in the resulting segment are in sorted order, and the term identifiers are assigned
+    accordingly.
+    """
+
+    # Estimated bytes per unique term in a block, i.e., the term itself, the dictionary entry and the
+    # two arrays, not counting the characters in the term.
+    __BYTES_PER_TERM = 256
+
+    # Estimated bytes per posting in a block, i.e., one array entry each for the document identifier
+    # and the term frequency, including some slack for array over-allocation.
+    __BYTES_PER_POSTING = 10
+
+    def __init__(self, normalizer: Normalizer, tokenizer: Tokenizer, memory_budget: int = 64 * 1024 * 1024):
+        assert memory_budget > 0
+        self.__normalizer = normalizer
+        self.__tokenizer = tokenizer
+        self.__memory_budget = memory_budget  # Flush a block to disk when its estimated size exceeds this.
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        """
+        Processes the given text buffer and returns an iterator that yields normalized terms,
+        identically to how a DiskInvertedIndex serving the segment processes its queries.
+        """
+        tokens = self.__tokenizer.strings(self.__normalizer.canonicalize(buffer))
+        return (self.__normalizer.normalize(t) for t in tokens)
+
+    def build(self, corpus: Corpus, fields: Iterable[str], filename: str, compressed: str = "vb") -> int:
+        """
+        Indexes the named fields in the document collection and writes the index segment to the
+        named file, with the posting lists compressed using the named codec. The documents must be
+        ordered by document identifier. Returns the number of runs that were merged.
+
+        The temporary run files are placed next to the output file, and removed afterwards.
+        """
+        fields = list(fields)
+        directory = os.path.dirname(os.path.abspath(filename))
+        with tempfile.TemporaryDirectory(prefix="spimi", dir=directory) as temporary:
+            runs = []
+            block = {}
+            size = 0
+            documents = 0
+            for document in corpus:
+                documents += 1
+                terms = itertools.chain.from_iterable(self.get_terms(document.get_field(f, "")) for f in fields)
+                for (term, frequency) in Counter(terms).items():
+                    postings = block.get(term)
+                    if postings is None:
+                        postings = block[term] = (array("I"), array("I"))
+                        size += self.__BYTES_PER_TERM + len(term)
+                    postings[0].append(document.document_id)
+                    postings[1].append(frequency)
+                    size += self.__BYTES_PER_POSTING
+                if size >= self.__memory_budget:
+                    runs.append(self.__flush(block, os.path.join(temporary, f"{len(runs)}.run")))
+                    block = {}
+                    size = 0
+            if block or not runs:
+                runs.append(self.__flush(block, os.path.join(temporary, f"{len(runs)}.run")))
+            self.__merge(runs, filename, documents, compressed)
+            return len(runs)
+
+    @staticmethod
+    def __flush(block: Dict[str, Tuple[array, array]], filename: str) -> str:
+        """
+        Writes the block to the named file as a run sorted by term. Each term is written as
+
+            <term length> <term> <posting count> (<gap> <term frequency>)*
+
+        with all integers variable-byte encoded, and with the gaps relative to the previous
+        document identifier in the run.
+        """
+        with open(filename, mode="wb") as f:
+            for term in sorted(block):
+                (document_ids, term_frequencies) = block[term]
+                encoded = term.encode("utf-8")
+                data = bytearray()
+                VariableByteCodec.encode_many((len(encoded),), data)
+                data.extend(encoded)
+                VariableByteCodec.encode_many((len(document_ids),), data)
+                gaps = (b - a for (a, b) in zip(itertools.chain((0,), document_ids), document_ids))
+                VariableByteCodec.encode_many((n for pair in zip(gaps, term_frequencies) for n in pair), data)
+                f.write(data)
+        return filename
+
+    @staticmethod
+    def __read(f: BinaryIO, run: int) -> Iterator[Tuple[str, int, array, array]]:
+        """
+        Reads back a run, one term at a time. The run number is included in what is yielded, so
+        that equal terms from different runs are merged in run order, and hence in document
+        identifier order.
+        """
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            position = 0
+            while position < size:
+                (header, n) = VariableByteCodec.decode_many(buffer, position, 1)
+                position += n
+                term = str(buffer[position:position + header[0]], "utf-8")
+                position += header[0]
+                (header, n) = VariableByteCodec.decode_many(buffer, position, 1)
+                position += n
+                (document_ids, term_frequencies, n) = VariableByteCodec.decode_postings(buffer, position, header[0])
+                position += n
+                yield (term, run, document_ids, term_frequencies)
+
+    @staticmethod
+    def __merge(runs: List[str], filename: str, document_count: int, compressed: str) -> None:
+        """
+        Merges the sorted runs into a single index segment, using a k-way merge over the runs.
+        """
+        files = [open(run, mode="rb") for run in runs]
+        try:
+            merged = heapq.merge(*(__class__.__read(f, i) for (i, f) in enumerate(files)))
+            posting_lists = (
+                (term, itertools.chain.from_iterable(map(Posting, d, t) for (_, _, d, t) in group))
+                for (term, group) in itertools.groupby(merged, key=lambda entry: entry[0])
+            )
+            DiskInvertedIndex.write(filename, posting_lists, document_count, compressed)
+        finally:
+            for f in files:
+                f.close()
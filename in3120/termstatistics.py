@@ -0,0 +1,165 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+import math
+import sys
+from array import array
+from typing import BinaryIO, Sequence
+
+
+class TermStatistics:
+    """
+    Corpus-level statistics for a single term in an inverted index. See Section 6.2 in
+    https://nlp.stanford.edu/IR-book/pdf/06vect.pdf for how these are used for ranking.
+
+    The inverse document frequency is the natural logarithm of N/df, where N is the number
+    of documents in the indexed corpus.
+    """
+
+    __slots__ = ("document_frequency", "collection_frequency", "maximum_term_frequency", "inverse_document_frequency")
+
+    def __init__(
+        self,
+        document_frequency: int,
+        collection_frequency: int,
+        maximum_term_frequency: int,
+        inverse_document_frequency: float,
+    ):
+        self.document_frequency = document_frequency
+        self.collection_frequency = collection_frequency
+        self.maximum_term_frequency = maximum_term_frequency
+        self.inverse_document_frequency = inverse_document_frequency
+
+    def __repr__(self):
+        return str({
+            "document_frequency": self.document_frequency,
+            "collection_frequency": self.collection_frequency,
+            "maximum_term_frequency": self.maximum_term_frequency,
+            "inverse_document_frequency": self.inverse_document_frequency,
+        })
+
+
+class TermStatisticsTable:
+    """
+    A compact table of term statistics, indexed by term identifier. The statistics are stored
+    column-wise in arrays rather than as one object per term, so that the table stays small
+    and can be read from or written to disk as is.
+
+    The table is filled one posting at a time while the index is built, and the inverse document
+    frequencies are computed once the number of documents is known, when the table is finalized.
+    """
+
+    def __init__(self):
+        self.__document_frequencies = array("I")  # The number of postings per term.
+        self.__collection_frequencies = array("Q")  # The sum of the term frequencies per term.
+        self.__maximum_term_frequencies = array("I")  # The largest term frequency per term.
+        self.__inverse_document_frequencies = array("d")  # Filled at finalize time.
+        self.__document_count = 0
+
+    def __len__(self):
+        return len(self.__document_frequencies)
+
+    def add_posting(self, term_id: int, term_frequency: int) -> None:
+        """
+        Accounts for a posting with the given term frequency in the identified term's posting list.
+        Term identifiers are assumed to be assigned in the range {0, ..., N - 1}.
+        """
+        self.add_postings(term_id, 1, term_frequency, term_frequency)
+
+    def add_postings(self, term_id: int, document_frequency: int, collection_frequency: int, maximum_term_frequency: int) -> None:
+        """
+        Accounts for several postings in the identified term's posting list at once, summarized by
+        their statistics. Useful for combining the statistics of several partial indexes.
+        """
+        if term_id >= len(self.__document_frequencies):
+            missing = term_id - len(self.__document_frequencies) + 1
+            self.__document_frequencies.extend(0 for _ in range(missing))
+            self.__collection_frequencies.extend(0 for _ in range(missing))
+            self.__maximum_term_frequencies.extend(0 for _ in range(missing))
+        self.__document_frequencies[term_id] += document_frequency
+        self.__collection_frequencies[term_id] += collection_frequency
+        if maximum_term_frequency > self.__maximum_term_frequencies[term_id]:
+            self.__maximum_term_frequencies[term_id] = maximum_term_frequency
+
+    def reorder(self, order: Sequence[int]) -> None:
+        """
+        Reassigns term identifiers, so that the statistics for term identifier i become those that
+        were previously associated with term identifier order[i].
+        """
+        assert len(order) == len(self.__document_frequencies)
+        self.__document_frequencies = array("I", (self.__document_frequencies[i] for i in order))
+        self.__collection_frequencies = array("Q", (self.__collection_frequencies[i] for i in order))
+        self.__maximum_term_frequencies = array("I", (self.__maximum_term_frequencies[i] for i in order))
+        if self.__inverse_document_frequencies:
+            self.__inverse_document_frequencies = array("d", (self.__inverse_document_frequencies[i] for i in order))
+
+    def finalize(self, document_count: int) -> None:
+        """
+        Computes the inverse document frequencies, given the number of documents in the indexed corpus.
+        """
+        self.__document_count = document_count
+        self.__inverse_document_frequencies = array("d", (math.log(document_count / df) for df in self.__document_frequencies))
+
+    def get_document_count(self) -> int:
+        """
+        Returns the number of documents in the indexed corpus, as given when the table was finalized.
+        """
+        return self.__document_count
+
+    def get_document_frequency(self, term_id: int) -> int:
+        """
+        Returns the number of documents that contain the identified term.
+        """
+        return self.__document_frequencies[term_id]
+
+    def get_term_statistics(self, term_id: int) -> TermStatistics:
+        """
+        Returns all the statistics for the identified term.
+        """
+        return TermStatistics(
+            self.__document_frequencies[term_id],
+            self.__collection_frequencies[term_id],
+            self.__maximum_term_frequencies[term_id],
+            self.__inverse_document_frequencies[term_id],
+        )
+
+    def write(self, destination: BinaryIO) -> int:
+        """
+        Writes the finalized table to the given file, one little-endian column after the other.
+        Returns the number of bytes written.
+        """
+        columns = (
+            self.__collection_frequencies,
+            self.__inverse_document_frequencies,
+            self.__document_frequencies,
+            self.__maximum_term_frequencies,
+        )
+        written = 0
+        for column in columns:
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            written += destination.write(column.tobytes())
+        return written
+
+    @staticmethod
+    def read(source: bytes, start: int, size: int, document_count: int) -> TermStatisticsTable:
+        """
+        Reads back a finalized table with the given number of terms, as written by write().
+        """
+        table = TermStatisticsTable()
+        columns = (
+            table.__collection_frequencies,
+            table.__inverse_document_frequencies,
+            table.__document_frequencies,
+            table.__maximum_term_frequencies,
+        )
+        for column in columns:
+            end = start + size * column.itemsize
+            column.frombytes(source[start:end])
+            if sys.byteorder != "little":
+                column.byteswap()
+            start = end
+        table.__document_count = document_count
+        return table
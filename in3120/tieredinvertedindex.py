@@ -0,0 +1,91 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import heapq
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .corpus import Corpus
+from .document import Document
+from .invertedindex import InvertedIndex, InMemoryInvertedIndex
+from .normalizer import Normalizer
+from .posting import Posting
+from .termstatistics import TermStatistics
+from .tokenizer import Tokenizer
+
+
+class TieredInvertedIndex(InvertedIndex):
+    """
+    An inverted index where the posting list of each term is divided into two tiers: The term's champion list, i.e.,
+    the postings having the largest term frequencies, and the rest. Among postings having the same term frequency,
+    the ones for documents having better static quality scores are preferred. See Sections 7.1.3 and 7.2.1 in
+    https://nlp.stanford.edu/IR-book/pdf/07system.pdf.
+
+    A search engine can then first evaluate a query over the documents in the query terms' champion lists, and stop
+    there if the documents that aren't in any of the champion lists can't beat the results it already has. A term's
+    contribution to the score of such a document is bounded by the largest term frequency outside the champion list,
+    so head queries, whose posting lists are long, can typically be served from the champion lists alone. If not,
+    the whole posting lists are evaluated. See SimpleSearchEngine.evaluate.
+
+    Seen as a whole, the index behaves like an ordinary inverted index.
+    """
+
+    def __init__(
+        self,
+        corpus: Corpus,
+        fields: Iterable[str],
+        normalizer: Normalizer,
+        tokenizer: Tokenizer,
+        champions: int = 100,
+        static_quality_score: Callable[[Document], float] = lambda d: d.get_field("static_quality_score", 0.0),
+        **kwargs,
+    ):
+        """
+        Builds the index, where each term's champion list holds up to the given number of postings. The static
+        quality score of a document defaults to its "static_quality_score" field, like in BetterRanker. Other
+        keyword arguments are passed on to the InMemoryInvertedIndex constructor.
+        """
+        assert champions > 0
+        self.__inverted_index = InMemoryInvertedIndex(corpus, fields, normalizer, tokenizer, **kwargs)
+        qualities = {document.document_id: static_quality_score(document) for document in corpus}
+        self.__champions: Dict[str, Tuple[List[Posting], int]] = {}  # The champion lists, and the largest term frequency outside them.
+        for term in self.__inverted_index.get_vocabulary():
+            if self.__inverted_index.get_document_frequency(term) <= champions:
+                continue
+            postings = list(self.__inverted_index.get_postings_iterator(term))
+            best = heapq.nlargest(champions, range(len(postings)), key=lambda i: (postings[i].term_frequency, qualities[postings[i].document_id]))
+            chosen = set(best)
+            remaining = max(p.term_frequency for (i, p) in enumerate(postings) if i not in chosen)
+            self.__champions[term] = ([postings[i] for i in sorted(best)], remaining)
+
+    def get_champions_iterator(self, term: str) -> Iterator[Posting]:
+        """
+        Returns an iterator over the postings in the term's champion list, sorted by document identifier. Short posting
+        lists are their own champion lists.
+        """
+        champions = self.__champions.get(term)
+        return self.__inverted_index.get_postings_iterator(term) if champions is None else iter(champions[0])
+
+    def get_champion_bound(self, term: str) -> int:
+        """
+        Returns an upper bound on the term frequencies of the term's postings that are not in its champion list. Zero if
+        all its postings are.
+        """
+        champions = self.__champions.get(term)
+        return 0 if champions is None else champions[1]
+
+    def get_terms(self, buffer: str) -> Iterator[str]:
+        return self.__inverted_index.get_terms(buffer)
+
+    def get_postings_iterator(self, term: str) -> Iterator[Posting]:
+        return self.__inverted_index.get_postings_iterator(term)
+
+    def get_document_frequency(self, term: str) -> int:
+        return self.__inverted_index.get_document_frequency(term)
+
+    def get_term_statistics(self, term: str) -> Optional[TermStatistics]:
+        return self.__inverted_index.get_term_statistics(term)
+
+    def is_positional(self) -> bool:
+        return self.__inverted_index.is_positional()
+
+    def get_vocabulary(self) -> Iterator[str]:
+        return self.__inverted_index.get_vocabulary()
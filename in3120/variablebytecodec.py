@@ -1,52 +1,175 @@
-#!/usr/bin/python
-# -*- coding: utf-8 -*-
-
-from struct import pack
-from typing import Tuple
-
-
-class VariableByteCodec:
-    """
-    A simple encoder/decoder for variable-byte encoding. See Figure 5.8 in
-    https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
-    """
-
-    @staticmethod
-    def encode(number: int, destination: bytearray) -> int:
-        """
-        Encodes the given number, and appends the resulting bytes to the given
-        destination buffer. Returns the number of bytes that were appended.
-        """
-        assert destination is not None
-        assert number >= 0
-        values = []
-        while True:
-            values.append(number % 128)
-            if number < 128:
-                break
-            number = number // 128
-        values.reverse()
-        values[-1] += 128
-        destination.extend(pack("%dB" % len(values), *values))
-        return len(values)
-
-    @staticmethod
-    def decode(source: bytearray, start: int) -> Tuple[int, int]:
-        """
-        Starting at the given position in the source buffer, decodes the next number.
-        Returns a pair comprised of the decoded number, and the number of bytes
-        read from the source buffer.
-        """
-        assert source is not None
-        assert start >= 0
-        assert start == 0 or source[start - 1] >= 128
-        number = 0
-        where = start
-        while True:
-            byte = source[where]
-            where += 1
-            if byte < 128:
-                number = 128 * number + byte
-            else:
-                number = 128 * number + (byte - 128)
-                return (number, where - start)
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+from array import array
+from itertools import accumulate
+from struct import pack
+from typing import Iterable, Tuple
+
+
+class VariableByteCodec:
+    """
+    A simple encoder/decoder for variable-byte encoding. See Figure 5.8 in
+    https://nlp.stanford.edu/IR-book/pdf/05comp.pdf for details.
+
+    Besides the single-number entry points there are bulk entry points that process
+    many numbers per invocation. These work on any buffer that supports the buffer
+    protocol (e.g., bytes, bytearray, mmap or memoryview objects) and produce compact
+    arrays instead of lists of Python objects.
+    """
+
+    # Maps a terminating byte to the number it encodes, for the single-byte fast path.
+    __SINGLE_BYTE_TABLE = bytes((b - 128) % 256 for b in range(256))
+
+    @staticmethod
+    def encode(number: int, destination: bytearray) -> int:
+        """
+        Encodes the given number, and appends the resulting bytes to the given
+        destination buffer. Returns the number of bytes that were appended.
+        """
+        assert destination is not None
+        assert number >= 0
+        values = []
+        while True:
+            values.append(number % 128)
+            if number < 128:
+                break
+            number = number // 128
+        values.reverse()
+        values[-1] += 128
+        destination.extend(pack("%dB" % len(values), *values))
+        return len(values)
+
+    @staticmethod
+    def decode(source: bytearray, start: int) -> Tuple[int, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next number.
+        Returns a pair comprised of the decoded number, and the number of bytes
+        read from the source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert start == 0 or source[start - 1] >= 128
+        number = 0
+        where = start
+        while True:
+            byte = source[where]
+            where += 1
+            if byte < 128:
+                number = 128 * number + byte
+            else:
+                number = 128 * number + (byte - 128)
+                return (number, where - start)
+
+    @staticmethod
+    def encode_many(numbers: Iterable[int], destination: bytearray) -> int:
+        """
+        Encodes the given numbers in sequence, and appends the resulting bytes to the
+        given destination buffer. Returns the number of bytes that were appended.
+
+        Produces exactly the same bytes as invoking encode once per number, but without
+        building intermediate lists.
+        """
+        assert destination is not None
+        size = len(destination)
+        append = destination.append
+        for number in numbers:
+            assert number >= 0
+            if number < 128:
+                # By far the most common case for gaps and term frequencies.
+                append(number | 128)
+                continue
+            shift = 7 * ((number.bit_length() - 1) // 7)
+            while shift:
+                append((number >> shift) & 127)
+                shift -= 7
+            append((number & 127) | 128)
+        return len(destination) - size
+
+    @staticmethod
+    def decode_many(source: bytes, start: int, count: int) -> Tuple[array, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next count numbers.
+        Returns a pair comprised of an array holding the decoded numbers, and the number of
+        bytes read from the source buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        numbers = array("I")
+        if count == 0:
+            return (numbers, 0)
+        # Fast path: If all the numbers are small, we can decode them all with a few calls
+        # that stay inside C code.
+        chunk = source[start : start + count]
+        if len(chunk) == count and min(chunk) >= 128:
+            numbers.extend(bytes(chunk).translate(__class__.__SINGLE_BYTE_TABLE))
+            return (numbers, count)
+        append = numbers.append
+        remaining = count
+        number = 0
+        where = start
+        for byte in memoryview(source)[start:]:
+            where += 1
+            if byte < 128:
+                number = (number << 7) | byte
+            else:
+                append((number << 7) | (byte - 128))
+                number = 0
+                remaining -= 1
+                if not remaining:
+                    break
+        assert not remaining, "Buffer holds fewer numbers than requested"
+        return (numbers, where - start)
+
+    @staticmethod
+    def decode_postings(source: bytes, start: int, count: int, document_id: int = 0) -> Tuple[array, array, int]:
+        """
+        Starting at the given position in the source buffer, decodes the next count postings.
+        The postings are assumed encoded as interleaved (gap, term frequency) pairs, where the
+        gaps are relative to the given document identifier.
+
+        Returns a triple comprised of an array holding the decoded document identifiers, an array
+        holding the decoded term frequencies, and the number of bytes read from the source buffer.
+        Fuses the number decoding and the gap accumulation into a single pass over the buffer.
+        """
+        assert source is not None
+        assert start >= 0
+        assert count >= 0
+        document_ids = array("I")
+        term_frequencies = array("I")
+        if count == 0:
+            return (document_ids, term_frequencies, 0)
+        # Fast path: If all gaps and frequencies are small, we can decode them all with a few calls
+        # that stay inside C code.
+        chunk = source[start : start + 2 * count]
+        if len(chunk) == 2 * count and min(chunk) >= 128:
+            numbers = bytes(chunk).translate(__class__.__SINGLE_BYTE_TABLE)
+            document_ids.extend(accumulate(numbers[0::2], initial=document_id))
+            document_ids.pop(0)
+            term_frequencies.extend(numbers[1::2])
+            return (document_ids, term_frequencies, 2 * count)
+        append_document_id = document_ids.append
+        append_term_frequency = term_frequencies.append
+        remaining = count
+        is_gap = True
+        number = 0
+        where = start
+        for byte in memoryview(source)[start:]:
+            where += 1
+            if byte < 128:
+                number = (number << 7) | byte
+                continue
+            number = (number << 7) | (byte - 128)
+            if is_gap:
+                document_id += number
+                append_document_id(document_id)
+            else:
+                append_term_frequency(number)
+                remaining -= 1
+                if not remaining:
+                    break
+            is_gap = not is_gap
+            number = 0
+        assert not remaining, "Buffer holds fewer postings than requested"
+        return (document_ids, term_frequencies, where - start)
@@ -0,0 +1,67 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List
+
+
+class WildcardExpander:
+    """
+    Expands wildcard terms like "data*", "*base" or "d*ta*e" into the vocabulary terms they
+    match, without scanning the whole vocabulary. An asterisk matches any sequence of characters,
+    including the empty one.
+
+    The vocabulary is kept as a sorted term array, so that the terms having a given prefix form
+    a contiguous range that can be found by binary search. For patterns that need more than a
+    prefix, a k-gram index maps each k-gram of each term to the terms containing it, with $ marking
+    the term boundaries. Intersecting the lists of the pattern's k-grams yields a small candidate
+    set, and the candidates are then checked against the pattern since not every term having all
+    the k-grams matches. See Section 3.2.2 in https://nlp.stanford.edu/IR-book/pdf/03dict.pdf for
+    details.
+    """
+
+    def __init__(self, terms: Iterable[str], k: int = 3):
+        assert k > 1
+        self.__k = k  # The length of the k-grams.
+        self.__terms = sorted(set(terms))  # The vocabulary, sorted.
+        self.__grams: Dict[str, array] = {}  # Maps a k-gram to the sorted term array positions of the terms having it.
+        for (i, term) in enumerate(self.__terms):
+            for gram in set(self.__get_grams(f"${term}$")):
+                self.__grams.setdefault(gram, array("I")).append(i)
+
+    def __get_grams(self, buffer: str) -> Iterator[str]:
+        """
+        Yields the k-grams of the given buffer, if any.
+        """
+        return (buffer[i:i + self.__k] for i in range(len(buffer) - self.__k + 1))
+
+    def __get_range(self, prefix: str) -> range:
+        """
+        Returns the range of positions in the sorted term array that holds the terms having the
+        given prefix.
+        """
+        if not prefix:
+            return range(len(self.__terms))
+        return range(bisect_left(self.__terms, prefix), bisect_left(self.__terms, prefix + "\U0010ffff"))
+
+    def expand(self, pattern: str) -> Iterator[str]:
+        """
+        Yields the vocabulary terms that match the given wildcard pattern, in sorted order. A pattern
+        without asterisks matches only itself, if present in the vocabulary.
+        """
+        segments = pattern.split("*")
+        candidates = self.__get_range(segments[0])
+        if len(segments) == 1:
+            return (self.__terms[i] for i in candidates if self.__terms[i] == pattern)
+        if len(segments) == 2 and not segments[1]:
+            return (self.__terms[i] for i in candidates)
+        pieces = [f"${segments[0]}", *segments[1:-1], f"{segments[-1]}$"]
+        grams = {g for piece in pieces for g in self.__get_grams(piece)}
+        if grams:
+            lists: List[array] = sorted((self.__grams.get(g, array("I")) for g in grams), key=len)
+            matches = set(lists[0]).intersection(*lists[1:])
+            candidates = sorted(i for i in matches if i in candidates)
+        regex = re.compile(".*".join(map(re.escape, segments)), re.DOTALL)
+        return (self.__terms[i] for i in candidates if regex.fullmatch(self.__terms[i]))
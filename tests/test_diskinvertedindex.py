@@ -0,0 +1,44 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+import unittest
+from in3120 import InMemoryCorpus, InMemoryDocument, InMemoryInvertedIndex, DiskInvertedIndex
+from in3120 import BrainDeadNormalizer, BrainDeadTokenizer
+
+
+class TestDiskInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = InMemoryCorpus()
+        for i in range(200):
+            self.corpus.add_document(InMemoryDocument(i, {"body": " ".join(f"t{j}" for j in range(i % 17, i % 17 + 1 + i % 5))}))
+        self.index = InMemoryInvertedIndex(self.corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer())
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "segment")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_same_postings_as_in_memory_index(self):
+        for compressed in ["vb", "block"]:
+            self.index.save(self.filename, compressed)
+            disk = DiskInvertedIndex(self.filename, BrainDeadNormalizer(), BrainDeadTokenizer(), cache_size=3)
+            self.assertEqual(list(self.index.get_vocabulary()), list(disk.get_vocabulary()))
+            # Twice over, so that some posting lists come from the cache and some have been evicted from it.
+            for term in 2 * list(self.index.get_vocabulary()) + ["t99"]:
+                expected = [(p.document_id, p.term_frequency) for p in self.index.get_postings_iterator(term)]
+                self.assertEqual(expected, [(p.document_id, p.term_frequency) for p in disk.get_postings_iterator(term)])
+                self.assertEqual(len(expected), disk.get_document_frequency(term))
+            disk.close()
+
+    def test_rejects_other_files(self):
+        with open(self.filename, "wb") as f:
+            f.write(b"not a segment, but long enough to have a header")
+        with self.assertRaises(IOError):
+            DiskInvertedIndex(self.filename, BrainDeadNormalizer(), BrainDeadTokenizer())
+
+
+if __name__ == "__main__":
+    unittest.main()
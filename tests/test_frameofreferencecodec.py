@@ -0,0 +1,53 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from itertools import accumulate
+from in3120 import FrameOfReferenceCodec, BlockCompressedPostingList, Posting
+
+
+class TestFrameOfReferenceCodec(unittest.TestCase):
+
+    def test_round_trip(self):
+        rng = random.Random(1)
+        blocks = [[0], [5] * 10, [2**32 - 1, 0], list(range(128))]
+        # Blocks of small numbers with a few exceptions, at every width.
+        for width in [1, 2, 4, 8, 16, 32]:
+            for count in [1, 7, 128]:
+                block = [rng.randint(0, 2**width - 1) for _ in range(count)]
+                block[rng.randrange(count)] = rng.randint(0, 2**32 - 1)
+                blocks.append(block)
+        for block in blocks:
+            buffer = bytearray(b"prefix")
+            length = FrameOfReferenceCodec.encode(block, buffer)
+            buffer.extend(b"suffix")
+            (decoded, n) = FrameOfReferenceCodec.decode(buffer, 6, len(block))
+            self.assertEqual((block, length), (list(decoded), n))
+
+    def test_postings_round_trip(self):
+        rng = random.Random(2)
+        gaps = [rng.choice([1, 1, 2, 3, 1000]) for _ in range(100)]
+        term_frequencies = [rng.choice([1, 1, 2, 70000]) for _ in range(100)]
+        document_ids = [7 + d for d in accumulate(gaps)]
+        buffer = bytearray()
+        length = FrameOfReferenceCodec.encode_postings(document_ids, term_frequencies, 7, buffer)
+        (decoded_document_ids, decoded_term_frequencies, n) = FrameOfReferenceCodec.decode_postings(buffer, 0, 100, 7)
+        self.assertEqual(document_ids, list(decoded_document_ids))
+        self.assertEqual(term_frequencies, list(decoded_term_frequencies))
+        self.assertEqual(length, n)
+
+    def test_block_compressed_posting_list(self):
+        rng = random.Random(3)
+        for count in [1, 127, 128, 129, 1000]:
+            postings = list(zip(sorted(rng.sample(range(10 * count), count)), (rng.randint(1, 50) for _ in range(count))))
+            posting_list = BlockCompressedPostingList(block_size=128)
+            for (document_id, term_frequency) in postings:
+                posting_list.append_posting(Posting(document_id, term_frequency))
+            posting_list.finalize_postings()
+            self.assertEqual(count, posting_list.get_length())
+            self.assertEqual(postings, [(p.document_id, p.term_frequency) for p in posting_list.get_iterator()])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from in3120 import FrozenDictionary, PerfectHashDictionary, InMemoryCorpus, InMemoryDocument, InMemoryInvertedIndex
+from in3120 import BrainDeadNormalizer, BrainDeadTokenizer
+
+
+class TestPerfectHashDictionary(unittest.TestCase):
+
+    def test_maps_terms_onto_slots(self):
+        terms = [f"term{i}" for i in range(1000)]
+        dictionary = PerfectHashDictionary(FrozenDictionary(terms))
+        self.assertEqual(1000, len(dictionary))
+        self.assertEqual(list(range(1000)), sorted(dictionary[term] for term in terms))
+        self.assertEqual(sorted(terms), [term for (term, _) in dictionary])
+        self.assertTrue(all(dictionary[term] == term_id for (term, term_id) in dictionary))
+
+    def test_rejects_unknown_terms(self):
+        dictionary = PerfectHashDictionary(FrozenDictionary(f"term{i}" for i in range(1000)))
+        self.assertFalse(any(f"other{i}" in dictionary for i in range(1000)))
+        with self.assertRaises(ValueError):
+            dictionary.add_if_absent("other")
+        self.assertIsNone(PerfectHashDictionary(FrozenDictionary([])).get_term_id("term0"))
+
+    def test_index_lookups(self):
+        corpus = InMemoryCorpus()
+        for (i, body) in enumerate(["a b", "b c", "a c", "a a b", "c d", "d"]):
+            corpus.add_document(InMemoryDocument(i, {"body": body}))
+        index = InMemoryInvertedIndex(corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer())
+        expected = {term: [(p.document_id, p.term_frequency) for p in index.get_postings_iterator(term)] for term in "abcdx"}
+        index.freeze_dictionary(perfect_hash=True)
+        self.assertEqual(["a", "b", "c", "d"], list(index.get_vocabulary()))
+        for term in "abcdx":
+            self.assertEqual(expected[term], [(p.document_id, p.term_frequency) for p in index.get_postings_iterator(term)])
+            self.assertEqual(len(expected[term]), index.get_document_frequency(term))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from in3120 import PositionalPosting, PositionalPostingList, PostingsMerger
+
+
+class TestPositionalPostingList(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.documents = [[rng.choice("abc") for _ in range(rng.randint(1, 40))] for _ in range(100)]
+        self.posting_lists = {}
+        for term in "abc":
+            posting_list = PositionalPostingList()
+            for (document_id, words) in enumerate(self.documents):
+                positions = [i for (i, word) in enumerate(words) if word == term]
+                if positions:
+                    posting_list.append_posting(PositionalPosting(document_id, len(positions), positions))
+            self.posting_lists[term] = posting_list
+
+    def test_positions_round_trip(self):
+        for (term, posting_list) in self.posting_lists.items():
+            for posting in posting_list:
+                words = self.documents[posting.document_id]
+                self.assertEqual([i for (i, word) in enumerate(words) if word == term], list(posting.positions))
+                self.assertEqual(posting.term_frequency, len(posting.positions))
+
+    def test_phrase(self):
+        postings = [iter(self.posting_lists[term]) for term in "abca"]
+        expected = {}
+        for (document_id, words) in enumerate(self.documents):
+            starts = [i for i in range(len(words) - 3) if words[i:i + 4] == list("abca")]
+            if starts:
+                expected[document_id] = starts
+        self.assertEqual(expected, {p.document_id: list(p.positions) for p in PostingsMerger.phrase(postings)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import io
+import random
+import unittest
+from bisect import bisect_left
+from in3120 import Posting, InMemoryPostingList, CompressedInMemoryPostingList, BlockCompressedPostingList, DiskPostingList
+
+
+class TestPostingList(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        self.postings = [
+            list(zip(sorted(rng.sample(range(1, 20 * count), count)), (rng.randint(1, 50) for _ in range(count))))
+            for count in [1, 2, 7, 128, 129, 1000]
+        ]
+
+    def __create(self, factory, postings):
+        posting_list = factory()
+        for (document_id, term_frequency) in postings:
+            posting_list.append_posting(Posting(document_id, term_frequency))
+        posting_list.finalize_postings()
+        return posting_list
+
+    def __write(self, postings, codec, block_size):
+        """
+        Writes the postings as a disk posting list into a buffer, in between some other bytes, and returns a
+        posting list that reads them back.
+        """
+        stream = io.BytesIO()
+        stream.write(b"before")
+        length = DiskPostingList.write((Posting(d, f) for (d, f) in postings), stream, codec, block_size)
+        stream.write(b"after")
+        self.assertEqual(len(stream.getvalue()) - len(b"before") - len(b"after"), length)
+        return DiskPostingList(stream.getvalue(), len(b"before"), length)
+
+    def __factories(self):
+        return [
+            InMemoryPostingList,
+            CompressedInMemoryPostingList,
+            lambda: CompressedInMemoryPostingList(skip_interval=4),
+            BlockCompressedPostingList,
+            lambda: BlockCompressedPostingList(block_size=4),
+        ]
+
+    def __check_advance_to(self, posting_list, postings, seed):
+        """
+        Interleaves random calls to advance_to and next on the posting list, and checks them against a linear
+        scan over the postings.
+        """
+        rng = random.Random(seed)
+        document_ids = [document_id for (document_id, _) in postings]
+        iterator = posting_list.get_iterator()
+        index = 0
+        while True:
+            if rng.random() < 0.3:
+                expected = postings[index] if index < len(postings) else None
+                posting = next(iterator, None)
+                index += 1
+            else:
+                # Mostly short skips, but also ones that go backwards or past the end.
+                nearby = document_ids[min(index, len(document_ids) - 1)] + rng.randint(0, 40)
+                target = rng.randint(0, document_ids[-1] + 2) if rng.random() < 0.2 else nearby
+                index = bisect_left(document_ids, target, index)
+                expected = postings[index] if index < len(postings) else None
+                posting = iterator.advance_to(target)
+                index += 1
+            self.assertEqual(expected, None if posting is None else (posting.document_id, posting.term_frequency))
+            if posting is None:
+                break
+
+    def test_iteration(self):
+        for factory in self.__factories():
+            for postings in self.postings:
+                posting_list = self.__create(factory, postings)
+                self.assertEqual(len(postings), posting_list.get_length())
+                self.assertEqual(postings, [(p.document_id, p.term_frequency) for p in posting_list.get_iterator()])
+
+    def test_advance_to_matches_linear_scan(self):
+        for factory in self.__factories():
+            for postings in self.postings:
+                for seed in range(20):
+                    self.__check_advance_to(self.__create(factory, postings), postings, seed)
+
+    def test_disk_posting_list_round_trip(self):
+        for codec in ["vb", "block"]:
+            for block_size in [4, 128]:
+                for postings in self.postings + [[]]:
+                    posting_list = self.__write(postings, codec, block_size)
+                    self.assertEqual(len(postings), posting_list.get_length())
+                    self.assertEqual(postings, [(p.document_id, p.term_frequency) for p in posting_list.get_iterator()])
+                    if postings:
+                        for seed in range(5):
+                            self.__check_advance_to(posting_list, postings, seed)
+
+    def test_disk_posting_list_is_read_only(self):
+        with self.assertRaises(ValueError):
+            DiskPostingList.write([Posting(1, 1)], io.BytesIO(), "gzip")
+        with self.assertRaises(NotImplementedError):
+            self.__write(self.postings[0], "vb", 128).append_posting(Posting(1000000, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
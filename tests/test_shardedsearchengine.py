@@ -0,0 +1,28 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from in3120 import InMemoryCorpus, InMemoryDocument, ShardedSearchEngine, BrainDeadNormalizer, BrainDeadTokenizer, BetterRanker
+
+
+class TestShardedSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = InMemoryCorpus()
+        for (i, body) in enumerate(["a b", "b c", "a c", "a a b", "c d", "d"]):
+            self.corpus.add_document(InMemoryDocument(i, {"body": body}))
+        self.engine = ShardedSearchEngine(self.corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer(), shards=2)
+
+    def tearDown(self):
+        self.engine.close()
+
+    def test_bad_query_leaves_engine_usable(self):
+        options = {"match_threshold": 0.5, "hit_count": 10}
+        with self.assertRaises(ValueError):
+            list(self.engine.evaluate("a", {**options, "search_after": "not a cursor"}, BetterRanker))
+        hits = list(self.engine.evaluate("a", options, BetterRanker))
+        self.assertEqual({0, 2, 3}, {hit["document"].document_id for hit in hits})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from in3120 import InMemoryCorpus, InMemoryDocument, InMemoryInvertedIndex, SimpleSearchEngine
+from in3120 import BrainDeadNormalizer, BrainDeadTokenizer, BrainDeadRanker, BetterRanker
+
+
+class TestSimpleSearchEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = InMemoryCorpus()
+        for (i, body) in enumerate(["a b", "b c", "a c", "a a b", "c d", "d"]):
+            self.corpus.add_document(InMemoryDocument(i, {"body": body}))
+        self.index = InMemoryInvertedIndex(self.corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer())
+        self.engine = SimpleSearchEngine(self.corpus, self.index)
+        self.ranker = BetterRanker(self.corpus, self.index)
+
+    def __check_pruning(self, prunings, **kwargs):
+        """
+        Checks that evaluating random queries with the given kinds of dynamic pruning gives the same results as
+        exhaustive evaluation, over a random corpus with a skewed vocabulary and an index built with the given
+        keyword arguments.
+        """
+        rng = random.Random(1)
+        vocabulary = [f"w{i}" for i in range(100)]
+        weights = [1 / (i + 1) for i in range(100)]
+        corpus = InMemoryCorpus()
+        for i in range(1000):
+            body = " ".join(rng.choices(vocabulary, weights, k=rng.randint(1, 30)))
+            corpus.add_document(InMemoryDocument(i, {"body": body, "static_quality_score": rng.random()}))
+        index = InMemoryInvertedIndex(corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer(), **kwargs)
+        engine = SimpleSearchEngine(corpus, index)
+        for _ in range(100):
+            query = " ".join(rng.choices(vocabulary, weights, k=rng.randint(1, 5)))
+            options = {"match_threshold": rng.choice([0.2, 0.5, 1.0]), "hit_count": rng.choice([1, 10])}
+            for ranker in [lambda: BrainDeadRanker(), lambda: BetterRanker(corpus, index)]:
+                expected = [(hit["score"], hit["document"].document_id) for hit in engine.evaluate(query, options, ranker())]
+                for pruning in prunings:
+                    hits = engine.evaluate(query, {**options, "pruning": pruning}, ranker())
+                    self.assertEqual(expected, [(hit["score"], hit["document"].document_id) for hit in hits], (query, options, pruning))
+
+    def test_pruning_gives_exhaustive_results(self):
+        self.__check_pruning(["wand", "maxscore"])
+
+    def test_block_max_pruning_gives_exhaustive_results(self):
+        # Block-max metadata is only recorded for compressed posting lists.
+        for compressed in ["vb", "block"]:
+            self.__check_pruning(["bmw", "wand", "maxscore"], compressed=compressed)
+
+    def test_debug_traces_query(self):
+        traces = []
+        hits = list(self.engine.evaluate("a", {"match_threshold": 0.5, "hit_count": 10, "debug": traces.append}, self.ranker))
+        self.assertEqual({0, 2, 3}, {hit["document"].document_id for hit in hits})
+        self.assertEqual(1, len(traces))
+        self.assertEqual("a", traces[0]["query"])
+        self.assertEqual(3, traces[0]["results"])
+        self.assertEqual(3, traces[0]["counts"]["postings_decoded"])
+        self.assertNotIn("debug", traces[0]["options"])
+
+    def test_debug_traces_query_without_results(self):
+        traces = []
+        hits = list(self.engine.evaluate("x y", {"match_threshold": 0.5, "hit_count": 10, "debug": traces.append}, self.ranker))
+        self.assertEqual([], hits)
+        self.assertEqual(1, len(traces))
+        self.assertEqual("x y", traces[0]["query"])
+        self.assertEqual(0, traces[0]["results"])
+        self.assertEqual(0, traces[0]["counts"]["postings_decoded"])
+
+    def test_debug_requires_callable(self):
+        with self.assertRaises(ValueError):
+            list(self.engine.evaluate("a", {"match_threshold": 0.5, "hit_count": 10, "debug": True}, self.ranker))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import unittest
+from in3120 import InMemoryCorpus, InMemoryDocument, InMemoryInvertedIndex, TieredInvertedIndex, SimpleSearchEngine
+from in3120 import BrainDeadNormalizer, BrainDeadTokenizer, BetterRanker
+
+
+class TestTieredInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.corpus = InMemoryCorpus()
+        for i in range(300):
+            # The head term "a" is in most documents, and is frequent in a few of them.
+            a = 6 if i % 50 == 0 else 0 if i % 7 == 6 else 1
+            body = " ".join(["a"] * a + (["b"] if i % 3 == 0 else []) + [f"c{i % 20}"])
+            self.corpus.add_document(InMemoryDocument(i, {"body": body}))
+        self.plain = InMemoryInvertedIndex(self.corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer())
+        self.tiered = TieredInvertedIndex(self.corpus, ["body"], BrainDeadNormalizer(), BrainDeadTokenizer(), champions=10)
+
+    def __evaluate(self, index, query, options):
+        traces = []
+        engine = SimpleSearchEngine(self.corpus, index)
+        hits = engine.evaluate(query, {**options, "debug": traces.append}, BetterRanker(self.corpus, index))
+        results = [(hit["score"], hit["document"].document_id) for hit in hits]
+        return (results, traces[0]["counts"]["postings_decoded"])
+
+    def test_same_results_as_plain_index(self):
+        for query in ["a", "a b", "b c3", "c7", "a b c1"]:
+            for pruning in [None, "wand", "maxscore"]:
+                options = {"match_threshold": 0.5, "hit_count": 5, "pruning": pruning}
+                (expected, _) = self.__evaluate(self.plain, query, options)
+                (actual, _) = self.__evaluate(self.tiered, query, options)
+                self.assertEqual(expected, actual)
+
+    def test_head_query_decodes_fewer_postings(self):
+        options = {"match_threshold": 0.5, "hit_count": 3}
+        (expected, full) = self.__evaluate(self.plain, "a", options)
+        (actual, decoded) = self.__evaluate(self.tiered, "a", options)
+        self.assertEqual(expected, actual)
+        self.assertLess(decoded, full // 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
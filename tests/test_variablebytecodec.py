@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+import random
+import unittest
+from itertools import accumulate
+from in3120 import VariableByteCodec
+
+
+class TestVariableByteCodec(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1)
+        # Mostly small numbers, like gaps and term frequencies, with some at the extremes.
+        self.numbers = [rng.choice([rng.randint(0, 127), rng.randint(0, 2**14), rng.randint(0, 2**32 - 1)]) for _ in range(1000)]
+        self.numbers[:4] = [0, 127, 128, 2**32 - 1]
+
+    def test_encode_many_matches_encode(self):
+        expected = bytearray()
+        for number in self.numbers:
+            VariableByteCodec.encode(number, expected)
+        actual = bytearray(b"prefix")
+        self.assertEqual(len(expected), VariableByteCodec.encode_many(self.numbers, actual))
+        self.assertEqual(b"prefix" + expected, actual)
+
+    def test_decode_many_round_trip(self):
+        for numbers in [self.numbers, [n % 128 for n in self.numbers], []]:
+            buffer = bytearray(b"prefix")
+            length = VariableByteCodec.encode_many(numbers, buffer)
+            buffer.extend(b"suffix")
+            (decoded, n) = VariableByteCodec.decode_many(buffer, 6, len(numbers))
+            self.assertEqual((numbers, length), (list(decoded), n))
+            # Decoding just a prefix of the numbers stops where they end.
+            (prefix, n) = VariableByteCodec.decode_many(buffer, 6, len(numbers) // 2)
+            self.assertEqual(numbers[:len(numbers) // 2], list(prefix))
+            self.assertEqual(numbers[len(numbers) // 2:], list(VariableByteCodec.decode_many(buffer, 6 + n, len(numbers) - len(numbers) // 2)[0]))
+
+    def test_decode_postings_round_trip(self):
+        rng = random.Random(2)
+        for large in [False, True]:
+            gaps = [rng.randint(1, 2**20 if large else 100) for _ in range(500)]
+            term_frequencies = [rng.randint(1, 1000 if large else 100) for _ in range(500)]
+            buffer = bytearray()
+            VariableByteCodec.encode_many((x for pair in zip(gaps, term_frequencies) for x in pair), buffer)
+            (document_ids, frequencies, length) = VariableByteCodec.decode_postings(buffer, 0, 500, 7)
+            self.assertEqual([7 + d for d in accumulate(gaps)], list(document_ids))
+            self.assertEqual(term_frequencies, list(frequencies))
+            self.assertEqual(len(buffer), length)
+
+
+if __name__ == "__main__":
+    unittest.main()